@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark the process and thread executors of run_all_ultra.py.
+
+Each workload is run end to end (a fresh interpreter per run, as a user
+would start it) with --executor process and --executor thread, and the
+median wall-clock time of the repeats is reported. The process executor
+pays for spawning its workers (each re-imports Polars) and for pickling
+every result back; the thread executor pays for the GIL in the Python
+parts of the analysis. Small runs are dominated by the former, large runs
+by the latter.
+
+Workloads: the latest day of the data (what --today analyzes during the
+day) and the whole range.
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from lib.config import load_config, get_default_config
+from lib.manifest import load_manifest
+
+RUNNER = Path(__file__).parent / "run_all_ultra.py"
+
+
+def run_once(args):
+    """Wall-clock seconds of one analyzer run (output discarded)."""
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, str(RUNNER), *args],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"run_all_ultra.py {' '.join(args)} failed:\n{completed.stderr}")
+    return elapsed
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Compare the process and thread executors",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Latest day and whole range, 3 runs each
+  python benchmark_executors.py --data-path /data/market_data
+
+  # Same worker count for both executors, with extra analyzer options
+  python benchmark_executors.py --repeats 5 --workers 4 -- --resample 1s
+        """
+    )
+    parser.add_argument("--data-path", type=str, default=None,
+                        help="Market data directory (default: from config)")
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="Runs per executor and workload; the median is reported (default: 3)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Workers (processes or threads) for both executors (default: each chooses)")
+    parser.add_argument("--config", type=str, default=None,
+                        help="Path to config file (default: config.yaml in script directory)")
+    parser.add_argument("extra", nargs='*',
+                        help="Further run_all_ultra.py arguments, after --")
+
+    args = parser.parse_args()
+
+    try:
+        config = load_config(Path(args.config)) if args.config else load_config()
+    except FileNotFoundError:
+        print("WARNING: config.yaml not found, using defaults")
+        config = get_default_config()
+    data_path = args.data_path or config.data_directory
+
+    dates = load_manifest(data_path).files['date'].drop_nulls()
+    if dates.is_empty():
+        print(f"ERROR: No dated files in {data_path}")
+        exit(1)
+    latest = dates.max()
+
+    common = ['--data-path', data_path, *args.extra]
+    if args.config:
+        common += ['--config', args.config]
+    if args.workers:
+        common += ['--workers', str(args.workers)]
+    workloads = [(f"latest day ({latest})", ['--date', latest]), ("whole range", [])]
+
+    print(f"{'Workload':<28} {'process (s)':>12} {'thread (s)':>12}  Faster")
+    print('-' * 68)
+    for name, workload in workloads:
+        medians = {}
+        for executor in ('process', 'thread'):
+            times = [run_once(common + workload + ['--executor', executor]) for _ in range(args.repeats)]
+            medians[executor] = statistics.median(times)
+        faster = min(medians, key=medians.get)
+        slower = max(medians, key=medians.get)
+        print(f"{name:<28} {medians['process']:>12.2f} {medians['thread']:>12.2f}  "
+              f"{faster} ({medians[slower] / medians[faster]:.2f}x)")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Offline compaction of hourly collector files into sorted daily parquet.
+
+Rewrites every closed day (strictly before today, UTC) of every
+exchange/symbol into date=YYYY-MM-DD/compacted.parquet: sorted by
+timestamp, prices already Float64, zstd-compressed, fixed-size row groups
+with statistics. The analyzer then opens one file per day instead of one
+per hour and skips Decimal decoding and re-sorting.
+
+The current day is never compacted; the loader keeps reading its raw
+hourly files. A compacted day whose raw files change afterwards is
+detected as stale and re-compacted on the next run.
+"""
+
+from pathlib import Path
+
+from lib.config import load_config, get_default_config
+from lib.manifest import load_manifest
+from lib.compaction import compact_tree
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Compact hourly collector files into sorted daily parquet",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Compact every closed day
+  python compact.py
+
+  # Compact closed days of two exchanges, then drop the hourly files
+  python compact.py --exchanges Binance Bybit --delete-raw
+
+  # Only compact days before a given date
+  python compact.py --before 2025-11-01
+        """
+    )
+    parser.add_argument("--data-path", type=str, default=None,
+                        help="Path to the market data directory (overrides config)")
+    parser.add_argument("--exchanges", type=str, nargs='+', default=None,
+                        help="Only compact these exchanges (e.g., Binance Bybit)")
+    parser.add_argument("--before", type=str, default=None,
+                        help="Only compact days strictly before this date (YYYY-MM-DD, default: today UTC)")
+    parser.add_argument("--row-group-size", type=int, default=None,
+                        help="Rows per row group (default from config)")
+    parser.add_argument("--delete-raw", action="store_true",
+                        help="Remove the raw hour= directories after successful compaction")
+    parser.add_argument("--force", action="store_true",
+                        help="Rewrite days even if their compacted file is up to date")
+    parser.add_argument("--config", type=str, default=None,
+                        help="Path to config file (default: config.yaml in script directory)")
+
+    args = parser.parse_args()
+
+    try:
+        if args.config:
+            config = load_config(Path(args.config))
+        else:
+            config = load_config()
+    except FileNotFoundError:
+        print("WARNING: config.yaml not found, using defaults")
+        config = get_default_config()
+
+    data_path = args.data_path if args.data_path else config.data_directory
+
+    if not Path(data_path).exists():
+        print(f"ERROR: Data path does not exist: {data_path}")
+        exit(1)
+
+    print(f"--- Compacting closed days in: {data_path} ---")
+    manifest = load_manifest(data_path, config.manifest_directory)
+
+    summary = compact_tree(
+        data_path,
+        manifest=manifest,
+        exchanges=args.exchanges if args.exchanges else config.exchanges,
+        before_date=args.before,
+        row_group_size=args.row_group_size if args.row_group_size else config.compaction_row_group_size,
+        delete_raw=args.delete_raw or config.compaction_delete_raw,
+        force=args.force
+    )
+
+    # Pick up the new files so the next analyzer run starts from a fresh manifest
+    load_manifest(data_path, config.manifest_directory)
+
+    print(f"\n--- Compaction Finished ---")
+    print(f"[OK] Days compacted: {summary['days_compacted']} ({summary['files_merged']} files, "
+          f"{summary['rows_written']} rows)")
+    print(f"[ -] Days skipped (up to date): {summary['days_skipped']}")
+    print(f"[!!] Errors: {summary['errors']}")
@@ -13,11 +13,25 @@ from .config import AnalyzerConfig, load_config
 from .data_loader import load_exchange_symbol_data
 from .analysis import analyze_pair_fast
 from .discovery import discover_data
+from .manifest import PartitionManifest, load_manifest
+from .frame_cache import FrameCache
+from .summary import DeviationSummary
+from .summary_store import SummaryStore
+from .batch import analyze_pairs, stack_pairs
+from .pair_state import PairState
 
 __all__ = [
     'AnalyzerConfig',
     'load_config',
     'load_exchange_symbol_data',
     'analyze_pair_fast',
-    'discover_data'
+    'discover_data',
+    'PartitionManifest',
+    'load_manifest',
+    'FrameCache',
+    'DeviationSummary',
+    'SummaryStore',
+    'analyze_pairs',
+    'stack_pairs',
+    'PairState'
 ]
@@ -5,7 +5,55 @@ Implements mean-reversion analysis for price ratio deviations between exchanges.
 """
 
 import polars as pl
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+
+from .summary import DeviationSummary, summarize_deviation, summarize_deviations, complete_cycles
+
+
+# Loaded price columns each metric family reads. The runner loads only the
+# union over the requested metrics, so unused columns are never decoded or joined.
+METRIC_COLUMNS = {
+    # Bid/bid ratio deviation: extremes, asymmetry, zero crossings, cycles
+    'deviation': ('bestBid',),
+    # All four bid/ask directional paths (see PATHS), from the same aligned frame
+    'paths': ('bestBid', 'bestAsk'),
+}
+
+# Directional paths: name -> (numerator, denominator) as (exchange 1 or 2, price column).
+# The deviation of a path is numerator / denominator - 1 (in %). bid1_ask2 and
+# bid2_ask1 are the executable ones: sell at one exchange's bid, buy at the other's ask.
+PATHS = {
+    'bid_bid': ((1, 'bestBid'), (2, 'bestBid')),
+    'ask_ask': ((1, 'bestAsk'), (2, 'bestAsk')),
+    'bid1_ask2': ((1, 'bestBid'), (2, 'bestAsk')),
+    'bid2_ask1': ((2, 'bestBid'), (1, 'bestAsk')),
+}
+
+# Per-path metrics that do not depend on the path (reported once, unprefixed)
+_SHARED_METRICS = ('data_points', 'duration_hours')
+
+DEFAULT_METRICS = ('deviation',)
+
+
+def required_price_columns(metrics: Optional[List[str]] = None) -> List[str]:
+    """
+    Price columns needed to compute the given metric families.
+
+    Args:
+        metrics: Metric family names (keys of METRIC_COLUMNS, default: all computed metrics)
+
+    Returns:
+        Loaded column names (e.g., ['bestBid']) in a stable order
+
+    Raises:
+        ValueError: If a metric family is unknown
+    """
+    columns = []
+    for metric in metrics or DEFAULT_METRICS:
+        if metric not in METRIC_COLUMNS:
+            raise ValueError(f"Unknown metric '{metric}'. Available: {', '.join(METRIC_COLUMNS)}")
+        columns.extend(c for c in METRIC_COLUMNS[metric] if c not in columns)
+    return columns
 
 
 def count_complete_cycles(above_threshold_series, in_neutral_series) -> int:
@@ -25,21 +73,10 @@ def count_complete_cycles(above_threshold_series, in_neutral_series) -> int:
     Returns:
         Number of complete cycles
     """
-    above = above_threshold_series.to_numpy()
-    neutral = in_neutral_series.to_numpy()
-
-    cycles = 0
-    was_above = False
-
-    for i in range(len(above)):
-        if above[i]:
-            was_above = True
-        elif neutral[i] and was_above:
-            # Completed a cycle: was above threshold, now returned to neutral
-            cycles += 1
-            was_above = False
-
-    return cycles
+    flags = pl.DataFrame({'above': above_threshold_series, 'neutral': in_neutral_series})
+    # Vectorized state machine (see complete_cycles): a neutral row completes
+    # a cycle when the latest above/neutral event before it was "above"
+    return flags.select(complete_cycles(pl.col('above'), pl.col('neutral'))).item()
 
 
 def analyze_pair_fast(
@@ -60,9 +97,10 @@ def analyze_pair_fast(
         symbol: Symbol name (e.g., "BTC/USDT")
         ex1: First exchange name
         ex2: Second exchange name
-        data1: DataFrame for first exchange (columns: timestamp, bestBid, bestAsk)
-        data2: DataFrame for second exchange (columns: timestamp, bestBid, bestAsk)
-        thresholds: List of profitability thresholds in % (default: [0.3, 0.5, 0.4])
+        data1: DataFrame for first exchange (columns: timestamp, bestBid; other columns ignored).
+            Float32 prices and Int64 timestamps (compact mode) are accepted.
+        data2: DataFrame for second exchange (same layout as data1)
+        thresholds: List of profitability thresholds in %, any number (default: [0.3, 0.5, 0.4])
         zero_threshold: Neutral zone threshold in % (default: 0.05)
 
     Returns:
@@ -76,168 +114,315 @@ def analyze_pair_fast(
         - zero_crossings_per_hour: Zero crossings normalized per hour
         - zero_crossings_per_minute: Zero crossings normalized per minute
         - opportunity_cycles_XXXbp: Number of complete cycles for each threshold
+          (XXXbp = threshold in basis points, see threshold_label)
         - cycles_XXXbp_per_hour: Cycles per hour for each threshold
         - pct_time_above_XXXbp: % of time deviation > threshold
         - avg_cycle_duration_XXXbp_sec: Average cycle duration in seconds
         - pattern_break_XXXbp: True if last deviation > threshold (pattern breaking)
         - data_points: Number of data points analyzed
         - duration_hours: Analysis duration in hours
+
+    The metrics are computed as align_pair -> summarize_deviation ->
+    DeviationSummary.to_metrics; summarize_pair_stream produces the same
+    summary chunk by chunk for long ranges.
     """
-    # Synchronize data using join_asof (backward strategy - no look-ahead bias)
     try:
-        joined = data1.rename({
-            'bestBid': 'bid_ex1',
-            'bestAsk': 'ask_ex1'
-        }).join_asof(
-            data2.rename({
-                'bestBid': 'bid_ex2',
-                'bestAsk': 'ask_ex2'
-            }),
-            on='timestamp'
-        )
-
-        if joined.is_empty():
-            return None
+        aligned = align_pair(data1, data2)
+    except Exception as e:
+        print(f"Error in analyze_pair_fast: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+    return analyze_deviation(aligned, thresholds, zero_threshold)
+
+
+def analyze_deviation(
+    aligned: pl.DataFrame,
+    thresholds: Optional[List[float]] = None,
+    zero_threshold: float = 0.05
+) -> Optional[Dict[str, Any]]:
+    """
+    Pair metrics of an aligned deviation series (see analyze_pair_fast).
 
-        # OPTIMIZATION #4: Pure Polars operations (1.5-2x faster, zero-copy)
-        # Calculate ratio and statistics in Polars
-        joined = joined.with_columns([
-            (pl.col('bid_ex1') / pl.col('bid_ex2')).alias('ratio')
-        ])
-
-        # CRITICAL FIX: Calculate deviation from 1.0, NOT from mean!
-        # For arbitrage, we need to know deviation from PRICE EQUALITY, not from average
-        # deviation = 0 means prices are equal → can close position at break-even
-        # If we used mean_ratio, deviation = 0 would NOT guarantee break-even close!
-        joined = joined.with_columns([
-            ((pl.col('ratio') - 1.0) / 1.0 * 100).alias('deviation')
-        ])
-
-        # All aggregations in pure Polars (no NumPy conversion)
-        max_deviation_pct = float(joined['deviation'].max())
-        min_deviation_pct = float(joined['deviation'].min())
-        mean_deviation_pct = float(joined['deviation'].mean())
-
-        # Calculate asymmetry (directional bias indicator)
-        # Now using deviation from 1.0 (price equality)
-        # asymmetry = average deviation from zero
-        # For symmetric oscillation around parity: asymmetry ≈ 0
-        # For persistent bias (e.g., always +0.3%): |asymmetry| > 0.2
-        asymmetry = mean_deviation_pct
-
-        # Zero crossings in pure Polars
-        # FIXED: Use multiplication to detect true sign flips (+1 to -1 or vice versa)
-        # This prevents counting transitions through exactly 0.0 as two separate events
-        # sign[i] * sign[i-1] < 0 only when crossing from positive to negative (or vice versa)
-        deviation_sign = pl.col('deviation').sign()
-        zero_crossings = int(
-            joined.with_columns([
-                (deviation_sign * deviation_sign.shift(1) < 0).alias('crossed')
-            ])['crossed'].sum()
-        )
-
-        # Time range
-        min_timestamp = joined['timestamp'].min()
-        max_timestamp = joined['timestamp'].max()
-        duration_hours = (max_timestamp - min_timestamp).total_seconds() / 3600
-
-        # Calculate zero crossings per time
-        zero_crossings_per_hour = zero_crossings / duration_hours if duration_hours > 0 else 0
-        zero_crossings_per_minute = zero_crossings_per_hour / 60 if duration_hours > 0 else 0
-
-        # BATCH OPTIMIZATION: Calculate all thresholds in one pass
-        # CORRECTED LOGIC: Count only COMPLETE cycles that return to ZERO
-        #
-        # A cycle = movement from ~zero → above threshold → back to ~zero
-        # This ensures we only count tradeable opportunities (can close position at break-even)
+    Args:
+        aligned: Frame with timestamp and deviation (%) columns (align_pair / pair_deviation)
+        thresholds: List of profitability thresholds in % (default: [0.3, 0.5, 0.4])
+        zero_threshold: Neutral zone threshold in % (default: 0.05)
+
+    Returns:
+        Dictionary with analysis metrics or None if analysis fails
+    """
+    try:
+        if aligned.is_empty():
+            return None
 
         # Use provided thresholds or defaults
         if thresholds is None:
             thresholds = [0.3, 0.5, 0.4]
 
-        joined_with_thresholds = joined.with_columns([
-            # Above threshold flags
-            (pl.col('deviation').abs() > thresholds[0]).alias('above_030bp'),
-            (pl.col('deviation').abs() > thresholds[1]).alias('above_050bp'),
-            (pl.col('deviation').abs() > thresholds[2]).alias('above_040bp'),
-            # In neutral zone flag
-            (pl.col('deviation').abs() < zero_threshold).alias('in_neutral')
-        ])
-
-        # Count COMPLETE cycles using correct logic
-        # Cycle = return to neutral AFTER being above threshold
-        cycles_030bp = count_complete_cycles(
-            joined_with_thresholds['above_030bp'],
-            joined_with_thresholds['in_neutral']
-        )
-        cycles_050bp = count_complete_cycles(
-            joined_with_thresholds['above_050bp'],
-            joined_with_thresholds['in_neutral']
-        )
-        cycles_040bp = count_complete_cycles(
-            joined_with_thresholds['above_040bp'],
-            joined_with_thresholds['in_neutral']
-        )
-
-        # Calculate percentage of time above thresholds
-        threshold_metrics = joined_with_thresholds.select([
-            (pl.col('above_030bp').mean() * 100).alias('pct_030bp'),
-            (pl.col('above_050bp').mean() * 100).alias('pct_050bp'),
-            (pl.col('above_040bp').mean() * 100).alias('pct_040bp')
-        ])
-
-        # Extract results
-        metrics = threshold_metrics.row(0, named=True)
-
-        pct_030bp = float(metrics['pct_030bp'])
-        pct_050bp = float(metrics['pct_050bp'])
-        pct_040bp = float(metrics['pct_040bp'])
-
-        # Average duration per cycle (in seconds)
-        avg_duration_030bp_sec = (duration_hours * pct_030bp / 100 * 3600) / cycles_030bp if cycles_030bp > 0 else 0
-        avg_duration_050bp_sec = (duration_hours * pct_050bp / 100 * 3600) / cycles_050bp if cycles_050bp > 0 else 0
-        avg_duration_040bp_sec = (duration_hours * pct_040bp / 100 * 3600) / cycles_040bp if cycles_040bp > 0 else 0
-
-        # Pattern break detection: check if last cycle is incomplete (didn't return below threshold)
-        # If deviation ends above threshold, pattern may be breaking
-        last_deviation = float(joined['deviation'][-1])
-        pattern_break_030bp = abs(last_deviation) > thresholds[0]
-        pattern_break_050bp = abs(last_deviation) > thresholds[1]
-        pattern_break_040bp = abs(last_deviation) > thresholds[2]
-
-        threshold_stats = {
-            'opportunity_cycles_030bp': cycles_030bp,
-            'cycles_030bp_per_hour': cycles_030bp / duration_hours if duration_hours > 0 else 0,
-            'pct_time_above_030bp': pct_030bp,
-            'avg_cycle_duration_030bp_sec': avg_duration_030bp_sec,
-            'pattern_break_030bp': pattern_break_030bp,
-
-            'opportunity_cycles_050bp': cycles_050bp,
-            'cycles_050bp_per_hour': cycles_050bp / duration_hours if duration_hours > 0 else 0,
-            'pct_time_above_050bp': pct_050bp,
-            'avg_cycle_duration_050bp_sec': avg_duration_050bp_sec,
-            'pattern_break_050bp': pattern_break_050bp,
-
-            'opportunity_cycles_040bp': cycles_040bp,
-            'cycles_040bp_per_hour': cycles_040bp / duration_hours if duration_hours > 0 else 0,
-            'pct_time_above_040bp': pct_040bp,
-            'avg_cycle_duration_040bp_sec': avg_duration_040bp_sec,
-            'pattern_break_040bp': pattern_break_040bp
-        }
-
-        return {
-            'max_deviation_pct': max_deviation_pct,
-            'min_deviation_pct': min_deviation_pct,
-            'deviation_asymmetry': asymmetry,
-            'zero_crossings': zero_crossings,
-            'zero_crossings_per_hour': zero_crossings_per_hour,
-            'zero_crossings_per_minute': zero_crossings_per_minute,
-            **threshold_stats,
-            'data_points': len(joined),
-            'duration_hours': duration_hours
-        }
+        return summarize_deviation(aligned, thresholds, zero_threshold).to_metrics()
     except Exception as e:
-        print(f"Error in analyze_pair_fast: {e}")
+        print(f"Error in analyze_deviation: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def align_pair(data1: pl.DataFrame, data2: pl.DataFrame) -> pl.DataFrame:
+    """
+    Align two exchanges and compute the ratio deviation.
+
+    Each ex1 quote is paired with the latest ex2 quote at or before it
+    (join_asof, backward strategy - no look-ahead bias). ex1 rows before the
+    first ex2 quote get a null deviation.
+
+    Args:
+        data1: First exchange (timestamp, bestBid), sorted by timestamp
+        data2: Second exchange (timestamp, bestBid), sorted by timestamp
+
+    Returns:
+        DataFrame with columns: timestamp, deviation (% from price parity)
+    """
+    # Only the columns the metrics need are carried through the join
+    joined = data1.select([
+        'timestamp', pl.col('bestBid').alias('bid_ex1')
+    ]).join_asof(
+        data2.select([
+            'timestamp', pl.col('bestBid').alias('bid_ex2')
+        ]),
+        on='timestamp'
+    )
+    # Against a one-row ex2 frame (the carried quote of summarize_pair_chunk)
+    # join_asof returns bid_ex2 in a form polars divides by via the reciprocal,
+    # off by the last bit; a plain Series keeps every ratio an exact division
+    joined = joined.with_columns(joined.get_column('bid_ex2'))
+
+    return joined.select([
+        'timestamp',
+        deviation_expr('bid_ex1', 'bid_ex2')
+    ])
+
+
+def deviation_expr(price1: str, price2: str) -> pl.Expr:
+    """Ratio deviation (%) of two price columns, named 'deviation'."""
+    # OPTIMIZATION #4: Pure Polars operations (1.5-2x faster, zero-copy)
+    # Ratio is always computed in Float64, also for Float32 prices (compact mode)
+    #
+    # CRITICAL FIX: Calculate deviation from 1.0, NOT from mean!
+    # For arbitrage, we need to know deviation from PRICE EQUALITY, not from average
+    # deviation = 0 means prices are equal → can close position at break-even
+    # If we used mean_ratio, deviation = 0 would NOT guarantee break-even close!
+    ratio = pl.col(price1).cast(pl.Float64) / pl.col(price2).cast(pl.Float64)
+    return ((ratio - 1.0) / 1.0 * 100).alias('deviation')
+
+
+def quote_column(exchange: str, column: str = 'bestBid') -> str:
+    """Name of an exchange's price column in align_exchanges output."""
+    return f'{exchange}.{column}'
+
+
+def align_exchanges(
+    data: Dict[str, pl.DataFrame],
+    columns: Iterable[str] = ('bestBid',)
+) -> Dict[str, pl.DataFrame]:
+    """
+    Align the quotes of all exchanges of a symbol in one pass.
+
+    Each exchange's rows get the as-of prices (latest quote at or before the
+    row's timestamp, no look-ahead) of every exchange after it in sorted
+    order, so every pair (ex1 < ex2) is a column ratio on ex1's frame. All
+    as-of joins are planned lazily and collected together: polars runs them
+    in parallel and reads every exchange's frame once per query instead of
+    once per pair call.
+
+    Args:
+        data: Exchange -> frame (timestamp, price columns), sorted by timestamp
+        columns: Price columns to align (all from the same quote row)
+
+    Returns:
+        Exchange -> frame with timestamp, its own prices and each later
+        exchange's as-of prices, named quote_column(exchange, column)
+        (null before that exchange's first quote).
+        Pair deviations come from pair_deviation() / pair_paths().
+    """
+    names = sorted(data)
+    columns = list(columns)
+    quotes = {
+        name: data[name].lazy().select(['timestamp', *[pl.col(c).alias(quote_column(name, c)) for c in columns]])
+        for name in names
+    }
+
+    plans = []
+    for i, name in enumerate(names):
+        plan = quotes[name]
+        for other in names[i + 1:]:
+            plan = plan.join_asof(quotes[other], on='timestamp')
+        plans.append(plan)
+
+    aligned = {}
+    for name, frame in zip(names, pl.collect_all(plans)):
+        # Materialize joined columns (exact division against a one-row exchange), see align_pair
+        joined = frame.columns[1 + len(columns):]
+        aligned[name] = frame.with_columns([frame.get_column(c) for c in joined])
+    return aligned
+
+
+def pair_deviation(aligned: Dict[str, pl.DataFrame], ex1: str, ex2: str) -> pl.DataFrame:
+    """
+    Ratio deviation of a pair from align_exchanges output.
+
+    Same rows and values as align_pair(data[ex1], data[ex2]); ex1 must
+    sort before ex2, as in combinations(sorted(exchanges), 2).
+
+    Returns:
+        DataFrame with columns: timestamp, deviation (% from price parity)
+    """
+    return aligned[ex1].select(['timestamp', deviation_expr(quote_column(ex1), quote_column(ex2))])
+
+
+def pair_paths(aligned: Dict[str, pl.DataFrame], ex1: str, ex2: str) -> pl.DataFrame:
+    """
+    Deviations of all four directional paths of a pair (see PATHS).
+
+    Needs align_exchanges(data, columns=('bestBid', 'bestAsk')) output. The
+    rows are ex1's quotes, as in pair_deviation; the bid_bid column equals
+    its deviation.
+
+    Returns:
+        DataFrame with columns: timestamp and one deviation (%) column per path
+    """
+    exchanges = {1: ex1, 2: ex2}
+    return aligned[ex1].select(['timestamp', *[
+        deviation_expr(quote_column(exchanges[ex_a], column_a), quote_column(exchanges[ex_b], column_b)).alias(path)
+        for path, ((ex_a, column_a), (ex_b, column_b)) in PATHS.items()
+    ]])
+
+
+def analyze_paths(
+    paths: pl.DataFrame,
+    thresholds: Optional[List[float]] = None,
+    zero_threshold: float = 0.05
+) -> Optional[Dict[str, Any]]:
+    """
+    Full pair metrics of every directional path, from one pass over the frame.
+
+    Args:
+        paths: pair_paths() output
+        thresholds: List of profitability thresholds in % (default: [0.3, 0.5, 0.4])
+        zero_threshold: Neutral zone threshold in % (default: 0.05)
+
+    Returns:
+        The bid_bid metrics unprefixed (identical to analyze_deviation), plus
+        every other path's metrics prefixed with its name (e.g.
+        'bid1_ask2_opportunity_cycles_040bp'; a path without a deviation at
+        the last row has None values); None if the bid_bid series has no metrics
+    """
+    try:
+        if paths.is_empty():
+            return None
+
+        if thresholds is None:
+            thresholds = [0.3, 0.5, 0.4]
+
+        summaries = summarize_deviations(paths, list(PATHS), thresholds, zero_threshold)
+        metrics = summaries['bid_bid'].to_metrics()
+        if metrics is None:
+            return None
+
+        for path in PATHS:
+            if path == 'bid_bid':
+                continue
+            path_metrics = summaries[path].to_metrics() or dict.fromkeys(metrics)
+            metrics.update({
+                f'{path}_{key}': value for key, value in path_metrics.items() if key not in _SHARED_METRICS
+            })
+        return metrics
+    except Exception as e:
+        print(f"Error in analyze_paths: {e}")
         import traceback
         traceback.print_exc()
         return None
+
+
+def summarize_pair_chunk(
+    data1: pl.DataFrame,
+    data2: Optional[pl.DataFrame],
+    carry: Optional[Tuple[Any, float]],
+    thresholds: List[float],
+    zero_threshold: float
+) -> Tuple[DeviationSummary, DeviationSummary]:
+    """
+    Summarize one time slice of a pair, split at ex2's first quote in the slice.
+
+    The head (ex1 rows before that quote) is aligned with `carry`, the last
+    ex2 quote of earlier slices; the body depends on the slice alone. Merging
+    head and body into the summary of the earlier slices gives the summary
+    of the whole range.
+
+    Args:
+        data1: First exchange slice (timestamp, bestBid), sorted
+        data2: Second exchange slice, or None if it has no quotes in the slice
+        carry: (timestamp, bestBid) of ex2's last earlier quote, or None
+        thresholds: Profitability thresholds in %
+        zero_threshold: Neutral zone threshold in %
+
+    Returns:
+        (head, body) summaries
+    """
+    split = 0 if data2 is None or data2.is_empty() else data2['timestamp'][0]
+    cut = data1.height if data2 is None or data2.is_empty() else data1['timestamp'].search_sorted(split, side='left')
+    head_rows, body_rows = data1[:cut], data1[cut:]
+
+    if carry is None:
+        # No ex2 quote yet: rows count, deviation unknown
+        head = head_rows.select(['timestamp', pl.lit(None, dtype=pl.Float64).alias('deviation')])
+    else:
+        schema = data1.select(['timestamp', 'bestBid']).schema
+        head = align_pair(head_rows, pl.DataFrame({'timestamp': [carry[0]], 'bestBid': [carry[1]]}, schema=schema))
+
+    body = align_pair(body_rows, data2) if body_rows.height else body_rows.select('timestamp')
+    return (
+        summarize_deviation(head, thresholds, zero_threshold),
+        summarize_deviation(body, thresholds, zero_threshold)
+    )
+
+
+def last_quote(data: pl.DataFrame) -> Tuple[Any, float]:
+    """(timestamp, bestBid) of the last row - the as-of join carry into the next slice."""
+    return data['timestamp'][-1], data['bestBid'][-1]
+
+
+def summarize_pair_stream(
+    chunks: Iterable[Tuple[pl.DataFrame, pl.DataFrame]],
+    thresholds: Optional[List[float]] = None,
+    zero_threshold: float = 0.05
+) -> DeviationSummary:
+    """
+    Summarize a pair chunk by chunk, with memory bounded by the chunk size.
+
+    Chunks must be consecutive, non-overlapping time slices of both
+    exchanges. The last ex2 quote of earlier chunks is carried into the
+    as-of join of the next one, and chunk summaries are merged, so
+    `summarize_pair_stream(...).to_metrics()` equals analyze_pair_fast()
+    over the whole range.
+
+    Args:
+        chunks: Iterable of (data1, data2) slices in time order
+        thresholds: Profitability thresholds in % (default: [0.3, 0.5, 0.4])
+        zero_threshold: Neutral zone threshold in %
+
+    Returns:
+        Merged DeviationSummary
+    """
+    if thresholds is None:
+        thresholds = [0.3, 0.5, 0.4]
+
+    summary = DeviationSummary.empty(thresholds, zero_threshold)
+    carry = None  # last ex2 quote seen so far
+    for data1, data2 in chunks:
+        if not data1.is_empty():
+            head, body = summarize_pair_chunk(data1, data2, carry, thresholds, zero_threshold)
+            summary = summary.merge(head).merge(body)
+        if not data2.is_empty():
+            carry = last_quote(data2)
+    return summary
@@ -0,0 +1,252 @@
+"""
+Batched analysis of many pairs in one query.
+
+Per-pair analysis pays a fixed overhead (frame construction, several
+select round-trips, the metrics dict) that dominates for the many
+low-volume pairs. Here the aligned deviation series of many pairs are
+stacked into one long frame keyed by pair_id, every summary aggregation
+runs as a grouped expression in a single group_by, and the metrics are
+derived as columns of the result - one row per pair, the same values
+analyze_deviation() returns for each pair on its own.
+"""
+
+from typing import List, Dict, Any, Hashable, Optional, Tuple
+
+import numpy as np
+import polars as pl
+
+from .analysis import analyze_deviation
+from .summary import threshold_event, exact_sums, exact_sum_to_float, threshold_label
+from .stationarity import StatsSpec, STAT_COLUMNS, pair_statistics, deviation_statistics
+
+# Stacked rows after which PairBatch is analyzed (about 16 bytes per row)
+DEFAULT_BATCH_ROWS = 5_000_000
+# Pairs longer than this are analyzed on their own: their per-call overhead is negligible
+DEFAULT_MAX_PAIR_ROWS = 200_000
+
+
+def stack_pairs(deviations: List[pl.DataFrame]) -> pl.DataFrame:
+    """
+    Stack aligned pair series into one long frame.
+
+    Args:
+        deviations: Frames with timestamp and deviation columns, each in time order
+
+    Returns:
+        DataFrame with columns: pair_id (position in `deviations`), timestamp, deviation
+    """
+    lengths = [df.height for df in deviations]
+    stacked = pl.concat([df.select(['timestamp', 'deviation']) for df in deviations])
+    pair_id = np.repeat(np.arange(len(deviations), dtype=np.uint32), lengths)
+    return stacked.select([pl.Series('pair_id', pair_id), pl.all()])
+
+
+def analyze_pairs(
+    stacked: pl.DataFrame,
+    thresholds: Optional[List[float]] = None,
+    zero_threshold: float = 0.05
+) -> pl.DataFrame:
+    """
+    Metrics of every pair of a stacked frame (see stack_pairs) in one query.
+
+    Row-level flags are computed over the whole frame at once, with the
+    shifts and forward fills reset at each pair's first row; the group_by
+    then only needs plain sums, extremes and first/last values.
+
+    Args:
+        stacked: Frame with pair_id, timestamp and deviation columns, pairs contiguous
+        thresholds: List of profitability thresholds in % (default: [0.3, 0.5, 0.4])
+        zero_threshold: Neutral zone threshold in % (default: 0.05)
+
+    Returns:
+        DataFrame with pair_id and the analyze_deviation metric columns, one
+        row per pair that has metrics (pairs without a valid deviation, or
+        ending without one, are left out), in pair_id order
+    """
+    if thresholds is None:
+        thresholds = [0.3, 0.5, 0.4]
+
+    deviation = pl.col('deviation')
+    timestamp = pl.col('timestamp')
+    if stacked.schema['timestamp'] != pl.Int64:
+        # Whole microseconds, as duration_hours gets them from Python datetimes (any time unit)
+        timestamp = timestamp.dt.cast_time_unit('us')
+    pair_start = (pl.col('pair_id') != pl.col('pair_id').shift(1)).fill_null(True)
+    sign = deviation.sign()
+    abs_deviation = deviation.abs()
+    neutral = abs_deviation < zero_threshold
+
+    flags = [((sign * sign.shift(1) < 0) & ~pair_start).alias('crossing')]
+    for i, threshold in enumerate(thresholds):
+        above = abs_deviation > threshold
+        # complete_cycles with the carried state reset to "no event" (0) at each pair start
+        event = threshold_event(above, neutral).otherwise(pl.when(pair_start).then(0))
+        flags += [
+            above.alias(f'above_{i}'),
+            ((event == -1) & (event.forward_fill().shift(1) == 1) & ~pair_start).alias(f'completes_{i}'),
+        ]
+
+    stats = stacked.lazy().with_columns(flags).group_by('pair_id', maintain_order=True).agg([
+        pl.len().alias('rows'),
+        deviation.count().alias('valid'),
+        deviation.min().alias('min'),
+        deviation.max().alias('max'),
+        timestamp.first().alias('first_ts'),
+        timestamp.last().alias('last_ts'),
+        pl.col('crossing').sum().alias('crossings'),
+        deviation.last().alias('last_deviation'),
+        *[pl.col(f'above_{i}').sum() for i in range(len(thresholds))],
+        *[pl.col(f'completes_{i}').sum().alias(f'cycles_{i}') for i in range(len(thresholds))],
+    ]).filter((pl.col('valid') > 0) & pl.col('last_deviation').is_not_null()).collect()
+
+    # Means from exact per-pair sums, as DeviationSummary.mean
+    n_pairs = int(stacked['pair_id'].max()) + 1 if stacked.height else 0
+    valid = stacked.filter(deviation.is_not_null())
+    values = valid['deviation'].to_numpy()
+    groups = valid['pair_id'].to_numpy()
+    finite = np.isfinite(values)
+    totals = exact_sums(values[finite], groups[finite], n_pairs)
+    special = np.bincount(groups[~finite], weights=values[~finite], minlength=n_pairs)
+    pair_ids = stats['pair_id'].to_numpy()
+    mean = np.array([exact_sum_to_float(totals[i]) + special[i] for i in pair_ids]) / stats['valid'].to_numpy()
+
+    # Same formulas and operation order as DeviationSummary.to_metrics (in numpy:
+    # polars divides by a literal as a multiplication with its reciprocal)
+    span = (stats['last_ts'] - stats['first_ts']).to_physical().to_numpy()
+    if stacked.schema['timestamp'] == pl.Int64:
+        hours = span / 3_600_000_000  # compact mode: epoch microseconds
+    else:
+        hours = span / 1e6 / 3600
+    positive = hours > 0
+    safe_hours = np.where(positive, hours, 1.0)
+    crossings = stats['crossings'].to_numpy()
+    per_hour = np.where(positive, crossings / safe_hours, 0.0)
+    last_deviation = stats['last_deviation'].to_numpy()
+
+    columns = {
+        'pair_id': stats['pair_id'],
+        'max_deviation_pct': stats['max'],
+        'min_deviation_pct': stats['min'],
+        'deviation_asymmetry': mean,
+        'zero_crossings': stats['crossings'],
+        'zero_crossings_per_hour': per_hour,
+        'zero_crossings_per_minute': np.where(positive, per_hour / 60, 0.0),
+    }
+    valid_rows = stats['valid'].to_numpy()
+    for i, threshold in enumerate(thresholds):
+        label = threshold_label(threshold)
+        cycles = stats[f'cycles_{i}'].to_numpy()
+        pct = stats[f'above_{i}'].to_numpy() / valid_rows * 100
+        columns.update({
+            f'opportunity_cycles_{label}': stats[f'cycles_{i}'],
+            f'cycles_{label}_per_hour': np.where(positive, cycles / safe_hours, 0.0),
+            f'pct_time_above_{label}': pct,
+            f'avg_cycle_duration_{label}_sec': np.where(
+                cycles > 0, (hours * pct / 100 * 3600) / np.maximum(cycles, 1), 0.0),
+            f'pattern_break_{label}': np.abs(last_deviation) > threshold,
+        })
+    columns['data_points'] = stats['rows']
+    columns['duration_hours'] = hours
+    return pl.DataFrame(columns)
+
+
+class PairBatch:
+    """
+    Collects pairs' aligned series and analyzes them together.
+
+    Callers add pairs under any hashable key; analyze() stacks everything
+    added since the last call, runs analyze_pairs once and returns the
+    metrics by key. Pairs longer than max_pair_rows gain nothing from
+    batching and are analyzed on their own when added. `full` tells when
+    the stacked rows reach the max_rows budget. With a StatsSpec, the
+    stationarity statistics (see pair_statistics) are added to each pair's
+    metrics, from the same stacked frame; pairs whose metrics are computed
+    elsewhere (add_statistics) are stacked with them for the statistics only.
+    """
+
+    def __init__(self, thresholds: Optional[List[float]] = None, zero_threshold: float = 0.05,
+                 max_rows: int = DEFAULT_BATCH_ROWS, max_pair_rows: int = DEFAULT_MAX_PAIR_ROWS,
+                 statistics: Optional[StatsSpec] = None):
+        self.thresholds = thresholds
+        self.zero_threshold = zero_threshold
+        self.statistics = statistics
+        self.max_rows = max_rows
+        self.max_pair_rows = max_pair_rows
+        self.keys: List[Hashable] = []
+        self.deviations: List[pl.DataFrame] = []
+        # Pairs with metrics of their own, waiting for statistics: (key, metrics), deviations
+        self.known: List[Tuple[Hashable, Dict[str, Any]]] = []
+        self.known_deviations: List[pl.DataFrame] = []
+        self.done: Dict[Hashable, Optional[Dict[str, Any]]] = {}
+        self.rows = 0
+
+    def add(self, key: Hashable, deviation: pl.DataFrame) -> None:
+        if deviation.height > self.max_pair_rows:
+            metrics = analyze_deviation(deviation, self.thresholds, self.zero_threshold)
+            if metrics is not None and self.statistics is not None:
+                metrics.update(deviation_statistics(deviation, self.statistics) or dict.fromkeys(STAT_COLUMNS))
+            self.done[key] = metrics
+            return
+        self.keys.append(key)
+        self.deviations.append(deviation)
+        self.rows += deviation.height
+
+    def add_statistics(self, key: Hashable, deviation: pl.DataFrame, metrics: Dict[str, Any]) -> None:
+        """
+        Add a pair whose metrics were computed elsewhere (e.g. analyze_paths):
+        analyze() returns them with the pair's statistics added.
+        """
+        if self.statistics is None or deviation.height > self.max_pair_rows:
+            if self.statistics is not None:
+                metrics.update(deviation_statistics(deviation, self.statistics) or dict.fromkeys(STAT_COLUMNS))
+            self.done[key] = metrics
+            return
+        self.known.append((key, metrics))
+        self.known_deviations.append(deviation)
+        self.rows += deviation.height
+
+    @property
+    def full(self) -> bool:
+        return self.rows >= self.max_rows
+
+    def analyze(self) -> Dict[Hashable, Optional[Dict[str, Any]]]:
+        """
+        Metrics of every pair added since the last call (None where
+        analyze_deviation returns None), keyed as added.
+        """
+        keys, deviations, metrics = self.keys, self.deviations, self.done
+        known, known_deviations = self.known, self.known_deviations
+        self.keys, self.deviations, self.done, self.rows = [], [], {}, 0
+        self.known, self.known_deviations = [], []
+        if not keys and not known:
+            return metrics
+
+        metrics.update(dict.fromkeys(keys))
+        # Known pairs keep their metrics even if the batched query fails
+        metrics.update({key: {**given, **dict.fromkeys(STAT_COLUMNS)} for key, given in known})
+        try:
+            # Metric pairs first, then the known pairs (pair_id len(keys) onwards)
+            stacked = stack_pairs(deviations + known_deviations)
+            statistics = pair_statistics(stacked, self.statistics) if self.statistics is not None else None
+            results = None
+            if keys:
+                results = analyze_pairs(stacked.head(sum(df.height for df in deviations)),
+                                        self.thresholds, self.zero_threshold)
+                if statistics is not None:
+                    # Pairs without metrics are dropped by the left join
+                    results = results.join(statistics, on='pair_id', how='left')
+        except Exception as e:
+            print(f"Error in analyze_pairs ({len(keys) + len(known)} pairs): {e}")
+            import traceback
+            traceback.print_exc()
+            return metrics
+
+        if results is not None:
+            for row in results.iter_rows(named=True):
+                metrics[keys[row.pop('pair_id')]] = row
+        if known:
+            stat_rows = {row.pop('pair_id'): row for row in statistics.iter_rows(named=True)}
+            for i, (key, given) in enumerate(known):
+                given.update(stat_rows.get(len(keys) + i) or dict.fromkeys(STAT_COLUMNS))
+                metrics[key] = given
+        return metrics
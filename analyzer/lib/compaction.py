@@ -0,0 +1,146 @@
+"""
+Offline compaction of hourly collector files into one sorted parquet per day.
+
+For every closed day of every exchange/symbol, the raw files under
+date=/hour=/ are merged into date=YYYY-MM-DD/compacted.parquet:
+- sorted by Timestamp (flagged as sorting column in the footer)
+- BestBid/BestAsk stored as Float64 (no Decimal decoding at load time)
+- zstd-compressed, fixed-size row groups with statistics (time pruning)
+
+The loader prefers a fresh compacted file automatically; see
+PartitionManifest.select_files and load_exchange_symbol_data.
+"""
+
+import os
+import shutil
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+
+import polars as pl
+
+from .data_loader import COMPACTED_FILENAME
+from .manifest import PartitionManifest
+from .timerange import today_utc
+
+
+DEFAULT_ROW_GROUP_SIZE = 131072
+PRICE_COLUMNS = ('BestBid', 'BestAsk')
+
+
+def compact_day(
+    files: List[str],
+    output_path: str,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE
+) -> int:
+    """
+    Merge raw hourly files of one exchange/symbol/day into a single sorted file.
+
+    The file is written to a temporary name and renamed into place, so a
+    reader never sees a partially written compacted file.
+
+    Args:
+        files: Raw parquet files of the day
+        output_path: Target path (date=.../compacted.parquet)
+        row_group_size: Rows per row group
+
+    Returns:
+        Number of rows written
+    """
+    import pyarrow.parquet as pq
+
+    lf = pl.scan_parquet(files)
+    schema = lf.collect_schema()
+    df = lf.with_columns([
+        pl.col(c).cast(pl.Float64) for c in PRICE_COLUMNS if c in schema
+    ]).sort('Timestamp').collect()
+
+    table = df.to_arrow()
+    tmp_path = f"{output_path}.tmp"
+    pq.write_table(
+        table,
+        tmp_path,
+        compression='zstd',
+        row_group_size=row_group_size,
+        write_statistics=True,
+        sorting_columns=[pq.SortingColumn(table.schema.get_field_index('Timestamp'))]
+    )
+    os.replace(tmp_path, output_path)
+    return df.height
+
+
+def compact_tree(
+    data_path: str,
+    manifest: Optional[PartitionManifest] = None,
+    exchanges: Optional[List[str]] = None,
+    before_date: Optional[str] = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    delete_raw: bool = False,
+    force: bool = False
+) -> Dict[str, Any]:
+    """
+    Compact every closed exchange/symbol/day that is not already compacted.
+
+    Args:
+        data_path: Path to the market data directory
+        manifest: Partition manifest (refreshed from disk if None)
+        exchanges: Only compact these exchanges (None = all)
+        before_date: Only compact days strictly before this date (default: today UTC)
+        row_group_size: Rows per row group of the compacted files
+        delete_raw: Remove the raw hour= directories after a successful compaction
+        force: Rewrite days even if their compacted file is up to date
+
+    Returns:
+        Summary dict: days_compacted, days_skipped, files_merged, rows_written, errors
+    """
+    if manifest is None:
+        manifest = PartitionManifest(data_path).refresh()
+
+    cutoff = before_date or today_utc()
+    files = manifest.files
+    if exchanges:
+        files = files.filter(pl.col('exchange').is_in(exchanges))
+
+    summary = {'days_compacted': 0, 'days_skipped': 0, 'files_merged': 0, 'rows_written': 0, 'errors': 0}
+    days = files.filter(pl.col('date') < cutoff) \
+        .group_by(['exchange', 'symbol_dir', 'date'], maintain_order=True) \
+        .agg([
+            pl.col('path').filter(~pl.col('compacted')).alias('raw_paths'),
+            pl.col('mtime_ns').filter(~pl.col('compacted')).max().alias('raw_mtime_ns'),
+            pl.col('mtime_ns').filter(pl.col('compacted')).max().alias('compacted_mtime_ns'),
+        ]) \
+        .sort(['exchange', 'symbol_dir', 'date'])
+
+    for day in days.iter_rows(named=True):
+        raw_paths = day['raw_paths']
+        if not raw_paths:
+            summary['days_skipped'] += 1
+            continue
+        if (not force and day['compacted_mtime_ns'] is not None
+                and day['compacted_mtime_ns'] >= day['raw_mtime_ns']):
+            summary['days_skipped'] += 1
+            continue
+
+        date_dir = Path(data_path) / f"exchange={day['exchange']}" / f"symbol={day['symbol_dir']}" / f"date={day['date']}"
+        try:
+            rows = compact_day(
+                [str(Path(data_path) / p) for p in raw_paths],
+                str(date_dir / COMPACTED_FILENAME),
+                row_group_size
+            )
+        except Exception as e:
+            print(f"[!!] {day['exchange']} {day['symbol_dir']} {day['date']}: {e}")
+            summary['errors'] += 1
+            continue
+
+        print(f"[OK] {day['exchange']} {day['symbol_dir']} {day['date']}: "
+              f"{len(raw_paths)} files -> {rows} rows")
+        summary['days_compacted'] += 1
+        summary['files_merged'] += len(raw_paths)
+        summary['rows_written'] += rows
+
+        if delete_raw:
+            for hour_dir in date_dir.glob("hour=*"):
+                if hour_dir.is_dir():
+                    shutil.rmtree(hour_dir)
+
+    return summary
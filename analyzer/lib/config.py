@@ -5,7 +5,7 @@ Loads configuration from config.yaml file.
 """
 
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Dict
 from dataclasses import dataclass
 import yaml
 
@@ -17,14 +17,51 @@ class AnalyzerConfig:
     # Paths
     data_directory: str
     output_directory: str
+    manifest_directory: Optional[str]
+    cache_directory: Optional[str]
+    summary_directory: Optional[str]
+    cycle_directory: Optional[str]
+    journal_directory: Optional[str]
+    journal_keep_runs: int
 
     # Analysis parameters
     zero_threshold: float
     thresholds: List[float]
+    resample: Optional[str]
+    sweep_thresholds: List[str]
+    sweep_zero_thresholds: List[str]
+    metrics: List[str]
+    window: Optional[str]
+    window_period: Optional[str]
+    store_cycles: bool
+    stats: bool
+    stats_every: str
+    adf_lags: int
 
     # Performance
     workers: Optional[int]
+    threads: Optional[int]
+    max_memory_gb: Optional[float]
+    executor: str
     chunk_size: int
+    use_manifest: bool
+    use_cache: bool
+    cache_max_size_gb: float
+    compact_mode: bool
+    stream_chunk: Optional[str]
+    use_summary_store: bool
+    use_journal: bool
+    io_workers: int
+    read_ahead: int
+
+    # Trade simulation
+    simulation_thresholds: List[str]
+    simulation_slippage_pct: float
+    fee_schedules: Dict[str, Dict[str, float]]
+
+    # Compaction
+    compaction_row_group_size: int
+    compaction_delete_raw: bool
 
     # Filters
     exchanges: Optional[List[str]]
@@ -63,19 +100,58 @@ def load_config(config_path: Optional[Path] = None) -> AnalyzerConfig:
     analysis = config_data.get('analysis', {})
     performance = config_data.get('performance', {})
     date_range = config_data.get('date_range', {})
+    compaction = config_data.get('compaction', {})
+    simulation = config_data.get('simulation', {})
 
     return AnalyzerConfig(
         # Paths
         data_directory=paths.get('data_directory', 'C:/visual projects/arb1/data/market_data'),
         output_directory=paths.get('output_directory', 'C:/visual projects/arb1/analyzer/summary_stats'),
+        manifest_directory=paths.get('manifest_directory'),
+        cache_directory=paths.get('cache_directory'),
+        summary_directory=paths.get('summary_directory'),
+        cycle_directory=paths.get('cycle_directory'),
+        journal_directory=paths.get('journal_directory'),
+        journal_keep_runs=paths.get('journal_keep_runs', 10),
 
         # Analysis parameters
         zero_threshold=analysis.get('zero_threshold', 0.05),
         thresholds=analysis.get('thresholds', [0.3, 0.5, 0.4]),
+        resample=analysis.get('resample'),
+        sweep_thresholds=[str(v) for v in analysis.get('sweep_thresholds', ['0.1:1.0:0.05'])],
+        sweep_zero_thresholds=[str(v) for v in analysis.get('sweep_zero_thresholds', ['0.02:0.1:0.02'])],
+        metrics=analysis.get('metrics', ['deviation']),
+        window=analysis.get('window'),
+        window_period=analysis.get('window_period'),
+        store_cycles=analysis.get('store_cycles', False),
+        stats=analysis.get('stats', False),
+        stats_every=analysis.get('stats_every', '1s'),
+        adf_lags=analysis.get('adf_lags', 1),
 
         # Performance
         workers=performance.get('workers'),
+        threads=performance.get('threads'),
+        max_memory_gb=performance.get('max_memory_gb'),
+        executor=performance.get('executor', 'process'),
         chunk_size=performance.get('chunk_size', 1),
+        use_manifest=performance.get('use_manifest', True),
+        use_cache=performance.get('use_cache', True),
+        cache_max_size_gb=performance.get('cache_max_size_gb', 10.0),
+        compact_mode=performance.get('compact_mode', False),
+        stream_chunk=performance.get('stream_chunk'),
+        use_summary_store=performance.get('use_summary_store', False),
+        use_journal=performance.get('use_journal', False),
+        io_workers=performance.get('io_workers', 4),
+        read_ahead=performance.get('read_ahead', 2),
+
+        # Trade simulation
+        simulation_thresholds=[str(v) for v in simulation.get('thresholds', ['0.1:1.0:0.05'])],
+        simulation_slippage_pct=simulation.get('slippage_pct', 0.0),
+        fee_schedules=simulation.get('fee_schedules', {'taker': {'default': 0.1}}),
+
+        # Compaction
+        compaction_row_group_size=compaction.get('row_group_size', 131072),
+        compaction_delete_raw=compaction.get('delete_raw', False),
 
         # Filters
         exchanges=config_data.get('exchanges'),
@@ -96,10 +172,43 @@ def get_default_config() -> AnalyzerConfig:
     return AnalyzerConfig(
         data_directory='C:/visual projects/arb1/data/market_data',
         output_directory='C:/visual projects/arb1/analyzer/summary_stats',
+        manifest_directory=None,
+        cache_directory=None,
+        summary_directory=None,
+        cycle_directory=None,
+        journal_directory=None,
+        journal_keep_runs=10,
         zero_threshold=0.05,
         thresholds=[0.3, 0.5, 0.4],
+        resample=None,
+        sweep_thresholds=['0.1:1.0:0.05'],
+        sweep_zero_thresholds=['0.02:0.1:0.02'],
+        metrics=['deviation'],
+        window=None,
+        window_period=None,
+        store_cycles=False,
+        stats=False,
+        stats_every='1s',
+        adf_lags=1,
         workers=None,
+        threads=None,
+        max_memory_gb=None,
+        executor='process',
         chunk_size=1,
+        use_manifest=True,
+        use_cache=True,
+        cache_max_size_gb=10.0,
+        compact_mode=False,
+        stream_chunk=None,
+        use_summary_store=False,
+        use_journal=False,
+        io_workers=4,
+        read_ahead=2,
+        simulation_thresholds=['0.1:1.0:0.05'],
+        simulation_slippage_pct=0.0,
+        fee_schedules={'taker': {'default': 0.1}},
+        compaction_row_group_size=131072,
+        compaction_delete_raw=False,
         exchanges=None,
         start_date=None,
         end_date=None
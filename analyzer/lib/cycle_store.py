@@ -0,0 +1,145 @@
+"""
+Persistent, queryable store of extracted cycles (see extract_cycles).
+
+Cycles are partitioned by the UTC day of their entry:
+<store>/date=YYYY-MM-DD/cycles.parquet. Each day file is sorted by
+symbol, pair, threshold and entry time and written in small row groups,
+so a query opens only the days of its time range and the row-group
+statistics skip the symbols, pairs and thresholds it does not ask for -
+questions like "all 0.5% cycles shorter than 10 s in the last week" are
+answered from the stored rows without re-analysis.
+
+A cycle is identified by its pair, resolution, neutral zone, threshold and
+entry time; writing the same cycle again (re-running an analyzed range)
+replaces the stored row.
+"""
+
+import os
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional, List
+
+import polars as pl
+
+from .timerange import parse_time_bound, TimeBound
+
+KEY_COLUMNS = ['symbol', 'exchange1', 'exchange2', 'resolution', 'zero_threshold', 'threshold', 'entry_ts']
+TIME_COLUMNS = ('entry_ts', 'peak_ts', 'exit_ts')
+CYCLES_FILENAME = 'cycles.parquet'
+# Small row groups keep the statistics selective for symbol/pair filters
+ROW_GROUP_SIZE = 16384
+
+
+class CycleStore:
+    """Directory of day-partitioned cycle parquet files."""
+
+    def __init__(self, store_dir: str):
+        self.root = Path(store_dir)
+
+    def _day_path(self, date: str) -> Path:
+        return self.root / f"date={date}" / CYCLES_FILENAME
+
+    def dates(self) -> List[str]:
+        """Days with stored cycles."""
+        if not self.root.exists():
+            return []
+        return sorted(p.parent.name[len('date='):] for p in self.root.glob(f"date=*/{CYCLES_FILENAME}"))
+
+    def write(self, cycles: pl.DataFrame) -> int:
+        """
+        Add cycles to the store, replacing stored rows with the same key.
+
+        Args:
+            cycles: Frame with KEY_COLUMNS and the other extract_cycles columns
+
+        Returns:
+            Number of day files written
+        """
+        if cycles.is_empty():
+            return 0
+        cycles = _normalize(cycles)
+        days = cycles.with_columns(pl.col('entry_ts').dt.strftime('%Y-%m-%d').alias('_date'))
+
+        written = 0
+        for (date,), day in days.partition_by('_date', as_dict=True, include_key=False).items():
+            path = self._day_path(date)
+            if path.exists():
+                day = pl.concat([pl.read_parquet(path), day], how='diagonal_relaxed')
+            day = day.unique(subset=KEY_COLUMNS, keep='last', maintain_order=True) \
+                .sort(['symbol', 'exchange1', 'exchange2', 'threshold', 'entry_ts'])
+
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            os.makedirs(path.parent, exist_ok=True)
+            day.write_parquet(tmp_path, compression='zstd', row_group_size=ROW_GROUP_SIZE, statistics=True)
+            os.replace(tmp_path, path)
+            written += 1
+        return written
+
+    def query(
+        self,
+        start: TimeBound = None,
+        end: TimeBound = None,
+        symbol: Optional[str] = None,
+        exchanges: Optional[List[str]] = None,
+        threshold: Optional[float] = None,
+        min_duration: Optional[float] = None,
+        max_duration: Optional[float] = None
+    ) -> pl.DataFrame:
+        """
+        Stored cycles matching every given filter.
+
+        Args:
+            start: Earliest entry time, inclusive (YYYY-MM-DD, a datetime string or datetime)
+            end: Latest entry time: YYYY-MM-DD (whole day, inclusive) or a datetime (exclusive)
+            symbol: Canonical symbol name
+            exchanges: Only pairs whose two exchanges are both in this list
+            threshold: Threshold in %
+            min_duration: Shortest duration in seconds, inclusive
+            max_duration: Longest duration in seconds, exclusive
+
+        Returns:
+            Matching cycles, ordered by entry time
+        """
+        start = parse_time_bound(start)
+        end = parse_time_bound(end, is_end=True)
+        paths = [
+            self._day_path(date) for date in self.dates()
+            if (start is None or date >= start.strftime('%Y-%m-%d'))
+            and (end is None or date <= (end - timedelta(microseconds=1)).strftime('%Y-%m-%d'))
+        ]
+        if not paths:
+            return pl.DataFrame()
+
+        filters = []
+        if start is not None:
+            filters.append(pl.col('entry_ts') >= start)
+        if end is not None:
+            filters.append(pl.col('entry_ts') < end)
+        if symbol is not None:
+            filters.append(pl.col('symbol') == symbol)
+        if exchanges is not None:
+            filters.append(pl.col('exchange1').is_in(exchanges) & pl.col('exchange2').is_in(exchanges))
+        if threshold is not None:
+            filters.append(pl.col('threshold') == threshold)
+        if min_duration is not None:
+            filters.append(pl.col('duration_sec') >= min_duration)
+        if max_duration is not None:
+            filters.append(pl.col('duration_sec') < max_duration)
+
+        lf = pl.scan_parquet([str(p) for p in paths])
+        if filters:
+            lf = lf.filter(pl.all_horizontal(filters))
+        return lf.sort('entry_ts').collect()
+
+
+def _normalize(cycles: pl.DataFrame) -> pl.DataFrame:
+    """Store timestamps as naive UTC microseconds, whatever the source resolution or zone."""
+    columns = []
+    for column in TIME_COLUMNS:
+        dtype = cycles.schema[column]
+        expr = pl.col(column)
+        if getattr(dtype, 'time_zone', None):
+            expr = expr.dt.convert_time_zone('UTC').dt.replace_time_zone(None)
+        columns.append(expr.cast(pl.Datetime('us')))
+    return cycles.with_columns(columns)
+
@@ -0,0 +1,77 @@
+"""
+Cycle events: every complete cycle of a pair as one row.
+
+The summary counts cycles (complete_cycles); here each one is extracted
+with its entry, peak and exit. Per threshold, the rows with a cycle event
+(above the threshold: 1, in the neutral zone: -1; see threshold_event) are
+split into runs of equal events with a run-length id. Runs alternate, so
+every "above" run followed by a neutral run is one complete cycle: it is
+entered at the run's first row, peaks at its largest |deviation| and ends
+at the first row of the neutral run. A trailing "above" run never returned
+to neutral and is not a cycle - the same rule complete_cycles counts by, so
+the number of rows per threshold equals opportunity_cycles_XXXbp.
+"""
+
+from typing import List, Optional
+
+import polars as pl
+
+from .summary import threshold_event
+
+CYCLE_COLUMNS = ('threshold', 'entry_ts', 'peak_deviation', 'peak_ts', 'exit_ts', 'duration_sec')
+
+
+def extract_cycles(
+    aligned: pl.DataFrame,
+    thresholds: Optional[List[float]] = None,
+    zero_threshold: float = 0.05
+) -> pl.DataFrame:
+    """
+    Every complete cycle of an aligned pair series, for each threshold.
+
+    Args:
+        aligned: Frame with timestamp and deviation (%) columns, in time order
+        thresholds: List of profitability thresholds in % (default: [0.3, 0.5, 0.4])
+        zero_threshold: Neutral zone threshold in % (default: 0.05)
+
+    Returns:
+        DataFrame with one row per cycle (CYCLE_COLUMNS): threshold, entry_ts
+        (first row above the threshold), peak_deviation (signed deviation with
+        the largest magnitude) and peak_ts, exit_ts (first neutral row after
+        it) and duration_sec (exit - entry); ordered by threshold, then entry
+    """
+    if thresholds is None:
+        thresholds = [0.3, 0.5, 0.4]
+
+    timestamp = pl.col('timestamp')
+    if aligned.schema['timestamp'] == pl.Int64:
+        timestamp = timestamp.cast(pl.Datetime('us'))  # compact mode: epoch microseconds
+    deviation = pl.col('deviation')
+    abs_deviation = deviation.abs()
+    # NaN counts as above every threshold (Polars ordering) but never as a peak
+    peak = abs_deviation.fill_nan(None).arg_max()
+    base = aligned.lazy().select([timestamp.alias('timestamp'), deviation])
+
+    queries = []
+    for threshold in thresholds:
+        event = pl.col('event')
+        queries.append(
+            base.with_columns(threshold_event(abs_deviation > threshold, abs_deviation < zero_threshold).alias('event'))
+            .filter(event.is_not_null())
+            .with_columns((event != event.shift(1)).fill_null(True).cum_sum().alias('run'))
+            .group_by('run', maintain_order=True).agg([
+                event.first(),
+                timestamp.first().alias('entry_ts'),
+                deviation.get(peak).alias('peak_deviation'),
+                timestamp.get(peak).alias('peak_ts'),
+            ])
+            # The next run of an "above" run is neutral: its first row closes the cycle
+            .with_columns(pl.col('entry_ts').shift(-1).alias('exit_ts'))
+            .filter((event == 1) & pl.col('exit_ts').is_not_null())
+            .select([
+                pl.lit(threshold, dtype=pl.Float64).alias('threshold'),
+                'entry_ts', 'peak_deviation', 'peak_ts', 'exit_ts',
+                ((pl.col('exit_ts') - pl.col('entry_ts')).dt.total_microseconds() / 1e6).alias('duration_sec'),
+            ])
+        )
+    return pl.concat(pl.collect_all(queries))
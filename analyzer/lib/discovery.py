@@ -10,12 +10,34 @@ from collections import defaultdict
 from typing import Dict, Set
 
 
-def discover_data(data_path: str) -> Dict[str, Set[str]]:
+def normalize_symbol(raw_symbol: str) -> str:
+    """
+    Convert an on-disk symbol directory name to the canonical "BASE/QUOTE" form.
+
+    Args:
+        raw_symbol: Symbol as stored in the partition name (e.g., "VIRTUAL_USDT")
+
+    Returns:
+        Canonical symbol name (e.g., "VIRTUAL/USDT")
+    """
+    # Convert SYMBOL_USDT -> SYMBOL/USDT for consistency
+    if '_USDT' in raw_symbol:
+        return raw_symbol.replace('_USDT', '/USDT')
+    elif '_USDC' in raw_symbol:
+        return raw_symbol.replace('_USDC', '/USDC')
+    else:
+        # Fallback: legacy format with # separator
+        return raw_symbol.replace('#', '/')
+
+
+def discover_data(data_path: str, manifest=None) -> Dict[str, Set[str]]:
     """
     Scan data directory and group symbols by exchanges.
 
     Args:
         data_path: Path to the market data directory
+        manifest: Optional PartitionManifest. When given, symbols are answered
+            from the manifest instead of walking the directory tree.
 
     Returns:
         Dictionary mapping symbol names to sets of exchange names.
@@ -30,30 +52,25 @@ def discover_data(data_path: str) -> Dict[str, Set[str]]:
     print(f"--- Scanning for data in: {data_path} ---")
     symbol_map = defaultdict(set)
 
-    if not Path(data_path).exists():
-        print(f"ERROR: Data path does not exist: {data_path}")
-        return {}
-
-    for item in os.scandir(data_path):
-        if item.is_dir() and item.name.startswith('exchange='):
-            exchange_name = item.name.split('=')[1]
-            exchange_path = Path(item.path)
-
-            for symbol_item in os.scandir(exchange_path):
-                if symbol_item.is_dir() and symbol_item.name.startswith('symbol='):
-                    # Collections saves as "VIRTUAL_USDT", we convert back to "VIRTUAL/USDT"
-                    raw_symbol = symbol_item.name.split('=')[1]
-                    
-                    # Convert SYMBOL_USDT -> SYMBOL/USDT for consistency
-                    if '_USDT' in raw_symbol:
-                        symbol_name = raw_symbol.replace('_USDT', '/USDT')
-                    elif '_USDC' in raw_symbol:
-                        symbol_name = raw_symbol.replace('_USDC', '/USDC')
-                    else:
-                        # Fallback: legacy format with # separator
-                        symbol_name = raw_symbol.replace('#', '/')
-                    
-                    symbol_map[symbol_name].add(exchange_name)
+    if manifest is not None:
+        # Answered from the partition manifest - no directory walk
+        for symbol_name, exchanges in manifest.symbol_map().items():
+            symbol_map[symbol_name].update(exchanges)
+    else:
+        if not Path(data_path).exists():
+            print(f"ERROR: Data path does not exist: {data_path}")
+            return {}
+
+        for item in os.scandir(data_path):
+            if item.is_dir() and item.name.startswith('exchange='):
+                exchange_name = item.name.split('=')[1]
+                exchange_path = Path(item.path)
+
+                for symbol_item in os.scandir(exchange_path):
+                    if symbol_item.is_dir() and symbol_item.name.startswith('symbol='):
+                        # Collections saves as "VIRTUAL_USDT", we convert back to "VIRTUAL/USDT"
+                        symbol_name = normalize_symbol(symbol_item.name.split('=')[1])
+                        symbol_map[symbol_name].add(exchange_name)
 
     print("--- Discovery Complete ---")
     valid_symbols = {s: e for s, e in symbol_map.items() if len(e) >= 2}
@@ -0,0 +1,175 @@
+"""
+Local cache of preprocessed exchange/symbol/day frames as Arrow IPC files.
+
+Each entry holds the loaded frame of one exchange/symbol/day (timestamp plus
+the projected price columns) - already cast, null-filtered, renamed and
+sorted. Column projection and compact dtypes are separate key variants. Entries
+are written uncompressed so they can be memory-mapped on read: a cache hit
+costs a file open, not a parquet decode and sort.
+
+The key is a fingerprint of the source file list (path, size, mtime), so any
+change to the underlying parquet files is a miss. Eviction is size-bounded
+LRU, using file mtime as the last-access time (touched on every hit).
+"""
+
+import os
+import threading
+import hashlib
+from pathlib import Path
+from typing import Optional, List
+
+import polars as pl
+
+from .data_loader import source_fingerprint
+
+
+# Bump when the cached frame layout or the loading pipeline changes
+CACHE_FORMAT_VERSION = 1
+ENTRY_SUFFIX = '.arrow'
+
+
+class FrameCache:
+    """
+    Size-bounded LRU cache of memory-mapped Arrow IPC frames.
+
+    Safe to share between worker processes: entries are written to a
+    temporary file and renamed into place, and a vanished entry is a miss.
+    Threads of one process share an instance: its counters and eviction are
+    guarded by a lock (each pickled copy gets its own).
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        """
+        Args:
+            cache_dir: Directory holding the cache entries
+            max_bytes: Total size budget; least recently used entries are evicted beyond it
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._written_since_evict = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def key(self, exchange: str, symbol: str, date: str, files: List, variant: str = '') -> str:
+        """
+        Fingerprint of one exchange/symbol/day and its source files.
+
+        Args:
+            exchange: Exchange name
+            symbol: Canonical symbol name
+            date: Day (YYYY-MM-DD)
+            files: SourceFile entries of that day (stat'ed here if size/mtime unknown)
+            variant: Extra discriminator for differently shaped frames of the same day
+
+        Returns:
+            Hex digest used as the entry file name
+        """
+        digest = hashlib.sha1()
+        digest.update(f"v{CACHE_FORMAT_VERSION}|{exchange}|{symbol}|{date}|{variant}|".encode())
+        digest.update(source_fingerprint(files).encode())
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{ENTRY_SUFFIX}"
+
+    def get(self, key: str) -> Optional[pl.DataFrame]:
+        """
+        Memory-map a cached frame.
+
+        Returns:
+            The cached DataFrame, or None on a miss
+        """
+        import pyarrow as pa
+
+        path = self._entry_path(key)
+        try:
+            # pyarrow maps the file directly; polars wraps the buffers without copying
+            with pa.memory_map(str(path)) as source:
+                df = pl.from_arrow(pa.ipc.open_file(source).read_all())
+            os.utime(path)  # LRU: mark as recently used
+        except Exception:
+            # Missing, half-evicted or unreadable entry
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return df
+
+    def put(self, key: str, df: pl.DataFrame) -> None:
+        """
+        Store a frame (uncompressed, so it can be memory-mapped later).
+
+        Write errors (full disk, read-only cache dir) are ignored: the cache
+        is an optimization, never a requirement.
+        """
+        path = self._entry_path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            df.write_ipc(tmp_path, compression='uncompressed')
+            os.replace(tmp_path, path)
+            size = path.stat().st_size
+        except OSError:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return
+
+        # Amortize the directory scan: evict after every ~10% of the budget written
+        with self._lock:
+            self._written_since_evict += size
+            due = self._written_since_evict > self.max_bytes // 10
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache fits its size budget.
+
+        Returns:
+            Number of bytes freed
+        """
+        # One scan at a time: threads past the threshold together would each delete the same entries
+        with self._lock:
+            self._written_since_evict = 0
+            return self._evict()
+
+    def _evict(self) -> int:
+        if not self.cache_dir.exists():
+            return 0
+
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(ENTRY_SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                    total += stat.st_size
+
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total - freed <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                freed += size
+            except OSError:
+                # Still mapped by a reader (Windows) or already removed by another worker
+                continue
+        return freed
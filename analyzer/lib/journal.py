@@ -0,0 +1,177 @@
+"""
+Run journal: checkpoint and resume of long analyzer runs.
+
+Every task group's ResultBatch is written to the run's journal directory as
+soon as it arrives: one parquet file per frame (pairs, stats, sweep,
+windows, cycles, simulation), then one line in journal.jsonl that commits
+them. A line names the group's symbols with their input key - a digest of
+the run settings and of the symbol's source files (path, size, mtime) - so
+a symbol is done only while its inputs are unchanged. A crash can leave
+shard files without a line, or a truncated last line; both are ignored.
+
+The final report is read back from the journal, so the parent does not
+hold the results of a run. A resumed run (--resume <run id>) appends to
+the same journal and analyzes only the symbols without a valid entry;
+when a symbol appears in several entries, the latest one counts.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import polars as pl
+
+from .data_loader import SourceFile, source_fingerprint
+from .results import PAIR_KEY, ResultBatch, ResultCollector
+
+# Bump when the shard layout or the entry format change
+JOURNAL_FORMAT_VERSION = 1
+
+ENTRIES_FILE = 'journal.jsonl'
+RUN_ID_PATTERN = re.compile(r'\d{8}_\d{6}(_\d+)?')
+
+
+def symbol_key(settings: str, files_by_exchange: Dict[str, List[SourceFile]]) -> str:
+    """
+    Input key of a symbol: run settings plus the source fingerprint of every
+    exchange. Any change to the settings or to an exchange's files changes it.
+    """
+    digest = hashlib.sha1(settings.encode())
+    for exchange, files in sorted(files_by_exchange.items()):
+        digest.update(f"|{exchange}:{source_fingerprint(files)}".encode())
+    return digest.hexdigest()
+
+
+class RunJournal:
+    """
+    Directory of one run: <journal dir>/<run id>/journal.jsonl plus
+    batch_<n>_<frame>.parquet shards.
+    """
+
+    def __init__(self, journal_dir: str, run_id: str):
+        self.run_id = run_id
+        self.root = Path(journal_dir) / run_id
+        self._written = len(self.entries())
+
+    @classmethod
+    def create(cls, journal_dir: str) -> 'RunJournal':
+        """New journal whose run id is the start time (YYYYmmdd_HHMMSS)."""
+        run_id = base = datetime.now().strftime('%Y%m%d_%H%M%S')
+        suffix = 1
+        while (Path(journal_dir) / run_id).exists():
+            suffix += 1
+            run_id = f"{base}_{suffix}"
+        os.makedirs(Path(journal_dir) / run_id)
+        return cls(journal_dir, run_id)
+
+    def exists(self) -> bool:
+        return self.root.is_dir()
+
+    def entries(self) -> List[dict]:
+        """Committed entries, in write order (a torn last line is skipped)."""
+        try:
+            with open(self.root / ENTRIES_FILE, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return []
+        entries = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get('version') == JOURNAL_FORMAT_VERSION:
+                entries.append(entry)
+        return entries
+
+    def completed(self, keys: Dict[str, str]) -> Dict[str, int]:
+        """
+        Symbols whose latest entry has their current input key.
+
+        Args:
+            keys: Symbol -> symbol_key of this run
+
+        Returns:
+            Symbol -> index of the entry that holds its results
+        """
+        latest = {}
+        for index, entry in enumerate(self.entries()):
+            for symbol, key in entry['symbols'].items():
+                latest[symbol] = (index, key)
+        return {symbol: index for symbol, (index, key) in latest.items() if keys.get(symbol) == key}
+
+    def record(self, batch: ResultBatch, keys: Dict[str, str]) -> None:
+        """
+        Write a batch's frames and commit them with one journal line.
+
+        Raises:
+            OSError: If the journal cannot be written (the run's results would be lost)
+        """
+        name = f"batch_{self._written:06d}"
+        frames = {'pairs': batch.pairs, **batch.frames}
+        if batch.stats is not None:
+            frames['stats'] = batch.stats
+        for kind, frame in frames.items():
+            frame.write_parquet(self.root / f"{name}_{kind}.parquet")
+        entry = {
+            'version': JOURNAL_FORMAT_VERSION,
+            'name': name,
+            'symbols': {symbol: keys[symbol] for symbol in batch.symbols},
+            'frames': sorted(frames),
+            'frame_pairs': batch.frame_pairs,
+        }
+        with open(self.root / ENTRIES_FILE, 'ab+') as f:
+            # A line torn by a crash is ended first, so this entry stays readable
+            f.seek(0, os.SEEK_END)
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+            f.write((json.dumps(entry) + '\n').encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        self._written += 1
+
+    def load(self, entry: dict, symbols: Optional[List[str]] = None) -> ResultBatch:
+        """ResultBatch of one entry, restricted to `symbols` (None = all of its symbols)."""
+        frames = {}
+        for kind in entry['frames']:
+            frames[kind] = pl.read_parquet(self.root / f"{entry['name']}_{kind}.parquet")
+        frame_pairs = {kind: entry['frame_pairs'][kind] for kind in frames if kind in entry['frame_pairs']}
+        if symbols is not None:
+            frames = {kind: frame.filter(pl.col('symbol').is_in(symbols)) for kind, frame in frames.items()}
+            frame_pairs = {kind: frames[kind].select(PAIR_KEY).n_unique() for kind in frame_pairs}
+        pairs, stats = frames.pop('pairs'), frames.pop('stats', None)
+        return ResultBatch(pairs, stats, frames, frame_pairs)
+
+    def collect(self, keys: Dict[str, str]) -> ResultCollector:
+        """Results of every symbol with a valid entry, merged for the report."""
+        completed = self.completed(keys)
+        collector = ResultCollector()
+        for index, entry in enumerate(self.entries()):
+            symbols = [symbol for symbol in entry['symbols'] if completed.get(symbol) == index]
+            if symbols:
+                collector.add(self.load(entry, None if len(symbols) == len(entry['symbols']) else symbols))
+        return collector
+
+
+def prune_runs(journal_dir: str, keep: int, current: str) -> List[str]:
+    """
+    Delete the oldest run journals beyond `keep` (never `current`).
+
+    Returns:
+        Run ids deleted
+    """
+    root = Path(journal_dir)
+    if not root.is_dir():
+        return []
+    runs = sorted(p.name for p in root.iterdir() if p.is_dir() and RUN_ID_PATTERN.fullmatch(p.name))
+    stale = [run_id for run_id in runs if run_id != current][:max(0, len(runs) - max(keep, 1))]
+    for run_id in stale:
+        shutil.rmtree(root / run_id, ignore_errors=True)
+    return stale
@@ -0,0 +1,424 @@
+"""
+Persistent partition manifest for the market_data tree.
+
+Records one row per parquet file with its exchange, symbol, date, hour, size,
+mtime, row count and min/max timestamp (read from the parquet footer), so that
+discovery, date filtering and file selection are answered without walking the
+directory tree on every run.
+
+The manifest refreshes incrementally: a directory is only re-listed when its
+mtime changed since the previous refresh, and a footer is only re-read when the
+file's size or mtime changed.
+"""
+
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from collections import defaultdict
+from typing import Dict, Set, List, Optional, Tuple
+
+import polars as pl
+
+from .discovery import normalize_symbol
+from .data_loader import symbol_formats, COMPACTED_FILENAME, SourceFile
+from .timerange import TimeWindow, TimeBound
+
+
+MANIFEST_DIRNAME = "_manifest"
+FILES_FILENAME = "files.parquet"
+DIRS_FILENAME = "dirs.parquet"
+
+# Partition levels below the data root, in tree order
+PARTITION_PREFIXES = ('exchange=', 'symbol=', 'date=', 'hour=')
+DATE_DEPTH = PARTITION_PREFIXES.index('hour=')  # walk depth of a date= directory
+
+FILES_SCHEMA = {
+    'path': pl.String,
+    'exchange': pl.String,
+    'symbol': pl.String,
+    'symbol_dir': pl.String,
+    'date': pl.String,
+    'hour': pl.String,
+    'size': pl.Int64,
+    'mtime_ns': pl.Int64,
+    'rows': pl.Int64,
+    'ts_min': pl.Datetime('us'),
+    'ts_max': pl.Datetime('us'),
+    'compacted': pl.Boolean,
+}
+
+DIRS_SCHEMA = {
+    'path': pl.String,
+    'mtime_ns': pl.Int64,
+    'children': pl.List(pl.String),
+}
+
+
+def read_parquet_footer(path: str, timestamp_column: str = 'Timestamp') -> Tuple[int, Optional[datetime], Optional[datetime]]:
+    """
+    Read row count and min/max timestamp from a parquet footer (no data pages).
+
+    Args:
+        path: Parquet file path
+        timestamp_column: Column whose row-group statistics give the time range
+
+    Returns:
+        Tuple of (row_count, ts_min, ts_max). Timestamps are naive UTC and
+        None when the file carries no usable statistics.
+    """
+    import pyarrow.parquet as pq
+
+    metadata = pq.read_metadata(path)
+    names = metadata.schema.names
+    if timestamp_column not in names:
+        return metadata.num_rows, None, None
+
+    column_index = names.index(timestamp_column)
+    ts_min = None
+    ts_max = None
+
+    for rg in range(metadata.num_row_groups):
+        stats = metadata.row_group(rg).column(column_index).statistics
+        if stats is None or not stats.has_min_max:
+            return metadata.num_rows, None, None
+        rg_min = _as_naive_utc(stats.min)
+        rg_max = _as_naive_utc(stats.max)
+        if rg_min is None or rg_max is None:
+            return metadata.num_rows, None, None
+        ts_min = rg_min if ts_min is None else min(ts_min, rg_min)
+        ts_max = rg_max if ts_max is None else max(ts_max, rg_max)
+
+    return metadata.num_rows, ts_min, ts_max
+
+
+def _as_naive_utc(value) -> Optional[datetime]:
+    """Normalize a statistics value to a naive UTC datetime (None if not a timestamp)."""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class PartitionManifest:
+    """
+    On-disk index of every parquet file under the market_data tree.
+
+    Example:
+        manifest = PartitionManifest(data_path).refresh().save()
+        symbols = manifest.symbol_map()
+        files = manifest.select_files("Binance", "BTC/USDT", start_date="2025-11-01")
+    """
+
+    def __init__(self, data_path: str, manifest_dir: Optional[str] = None):
+        """
+        Args:
+            data_path: Path to the market data directory
+            manifest_dir: Where the manifest is stored (default: <data_path>/_manifest)
+        """
+        self.data_path = Path(data_path)
+        self.manifest_dir = Path(manifest_dir) if manifest_dir else self.data_path / MANIFEST_DIRNAME
+        self.files = pl.DataFrame(schema=FILES_SCHEMA)
+        self.dirs = pl.DataFrame(schema=DIRS_SCHEMA)
+        self._by_exchange: Optional[Dict[str, pl.DataFrame]] = None
+
+        # Refresh statistics (for logging)
+        self.dirs_listed = 0
+        self.dirs_reused = 0
+        self.footers_read = 0
+
+        files_path = self.manifest_dir / FILES_FILENAME
+        dirs_path = self.manifest_dir / DIRS_FILENAME
+        if files_path.exists() and dirs_path.exists():
+            try:
+                self.files = pl.read_parquet(files_path).cast(FILES_SCHEMA)
+                self.dirs = pl.read_parquet(dirs_path).cast(DIRS_SCHEMA)
+            except Exception as e:
+                print(f"WARNING: Ignoring unreadable manifest in {self.manifest_dir}: {e}")
+                self.files = pl.DataFrame(schema=FILES_SCHEMA)
+                self.dirs = pl.DataFrame(schema=DIRS_SCHEMA)
+
+    def refresh(self) -> 'PartitionManifest':
+        """
+        Bring the manifest up to date with the directory tree.
+
+        Every partition directory is stat'ed, but only directories whose mtime
+        changed are re-listed, and only new or modified files have their footer read.
+
+        Returns:
+            self (for chaining)
+        """
+        old_dirs = {
+            row['path']: (row['mtime_ns'], row['children'])
+            for row in self.dirs.iter_rows(named=True)
+        }
+        old_files: Dict[str, List[dict]] = defaultdict(list)
+        for row in self.files.iter_rows(named=True):
+            old_files[row['path'].rsplit('/', 1)[0]].append(row)
+
+        new_dirs = []
+        new_files = []
+        self.dirs_listed = 0
+        self.dirs_reused = 0
+        self.footers_read = 0
+
+        if not self.data_path.exists():
+            print(f"ERROR: Data path does not exist: {self.data_path}")
+            self.files = pl.DataFrame(schema=FILES_SCHEMA)
+            self.dirs = pl.DataFrame(schema=DIRS_SCHEMA)
+            return self
+
+        # Depth-first walk: (relative path, depth, partition values so far)
+        stack = [('', 0, ())]
+        while stack:
+            rel_path, depth, partitions = stack.pop()
+            abs_path = self.data_path / rel_path if rel_path else self.data_path
+            try:
+                mtime_ns = os.stat(abs_path).st_mtime_ns
+            except OSError:
+                continue
+
+            old = old_dirs.get(rel_path)
+            if old is not None and old[0] == mtime_ns:
+                children = old[1]
+                self.dirs_reused += 1
+                # Directory unchanged: keep its files as recorded
+                new_files.extend(old_files.get(rel_path, []))
+            else:
+                children = self._list_children(abs_path, depth)
+                self.dirs_listed += 1
+                previous = {row['path']: row for row in old_files.get(rel_path, [])}
+                for name in children:
+                    if name.endswith('.parquet'):
+                        new_files.append(self._file_entry(rel_path, name, partitions, previous))
+
+            new_dirs.append({'path': rel_path, 'mtime_ns': mtime_ns, 'children': children})
+
+            for name in children:
+                if not name.endswith('.parquet'):
+                    child_rel = f"{rel_path}/{name}" if rel_path else name
+                    stack.append((child_rel, depth + 1, partitions + (name.split('=', 1)[1],)))
+
+        self.dirs = pl.DataFrame(new_dirs, schema=DIRS_SCHEMA)
+        self.files = pl.DataFrame(
+            [row for row in new_files if row is not None], schema=FILES_SCHEMA
+        ).sort('path')
+        self._by_exchange = None
+
+        print(f"--- Manifest: {self.files.height} files, "
+              f"{self.dirs_listed} dirs listed, {self.dirs_reused} unchanged, "
+              f"{self.footers_read} footers read ---")
+        return self
+
+    def _list_children(self, abs_path: Path, depth: int) -> List[str]:
+        """
+        List partition subdirectories and the parquet files this level may hold.
+
+        Raw collector files live in hour= directories; a date= directory may
+        additionally hold the compacted day file.
+        """
+        children = []
+        with os.scandir(abs_path) as entries:
+            for entry in entries:
+                if depth < len(PARTITION_PREFIXES):
+                    if entry.is_dir() and entry.name.startswith(PARTITION_PREFIXES[depth]):
+                        children.append(entry.name)
+                    elif depth == DATE_DEPTH and entry.name == COMPACTED_FILENAME and entry.is_file():
+                        children.append(entry.name)
+                elif entry.is_file() and entry.name.endswith('.parquet'):
+                    children.append(entry.name)
+        return sorted(children)
+
+    def _file_entry(self, rel_dir: str, name: str, partitions: tuple, previous: Dict[str, dict]) -> Optional[dict]:
+        """Build a manifest row, reusing the previous one if size and mtime match."""
+        rel_path = f"{rel_dir}/{name}"
+        try:
+            stat = os.stat(self.data_path / rel_path)
+        except OSError:
+            return None
+
+        old = previous.get(rel_path)
+        if old is not None and old['size'] == stat.st_size and old['mtime_ns'] == stat.st_mtime_ns:
+            return old
+
+        try:
+            rows, ts_min, ts_max = read_parquet_footer(str(self.data_path / rel_path))
+        except Exception:
+            # Partially written or corrupt file - keep it selectable, stats unknown
+            rows, ts_min, ts_max = None, None, None
+        self.footers_read += 1
+
+        exchange, symbol_dir, date = partitions[:3]
+        hour = partitions[3] if len(partitions) > 3 else None
+        return {
+            'path': rel_path,
+            'exchange': exchange,
+            'symbol': normalize_symbol(symbol_dir),
+            'symbol_dir': symbol_dir,
+            'date': date,
+            'hour': hour,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'rows': rows,
+            'ts_min': ts_min,
+            'ts_max': ts_max,
+            'compacted': hour is None,
+        }
+
+    def save(self) -> 'PartitionManifest':
+        """
+        Persist the manifest atomically (write to temp file, then rename).
+
+        A read-only data directory is not an error: the in-memory manifest
+        remains usable for this run.
+
+        Returns:
+            self (for chaining)
+        """
+        try:
+            os.makedirs(self.manifest_dir, exist_ok=True)
+            for frame, filename in ((self.files, FILES_FILENAME), (self.dirs, DIRS_FILENAME)):
+                target = self.manifest_dir / filename
+                tmp = target.with_suffix('.tmp')
+                frame.write_parquet(tmp)
+                os.replace(tmp, target)
+        except OSError as e:
+            print(f"WARNING: Could not save manifest to {self.manifest_dir}: {e}")
+        return self
+
+    def symbol_map(self) -> Dict[str, Set[str]]:
+        """
+        Map every canonical symbol to the exchanges that have files for it.
+
+        Returns:
+            Dictionary mapping symbol names to sets of exchange names (no 2+ filter)
+        """
+        symbol_map = defaultdict(set)
+        pairs = self.files.select(['symbol', 'exchange']).unique()
+        for symbol, exchange in pairs.iter_rows():
+            symbol_map[symbol].add(exchange)
+        return dict(symbol_map)
+
+    def select_files(
+        self,
+        exchange: str,
+        symbol: str,
+        start_date: TimeBound = None,
+        end_date: TimeBound = None
+    ) -> List[str]:
+        """
+        Select parquet files for (exchange, symbol) within a date/time range.
+
+        Mirrors the directory-walk semantics of load_exchange_symbol_data: the
+        first existing symbol directory format wins, date bounds are inclusive.
+        With datetime bounds, hour= partitions and files whose footer time range
+        lies outside the window are pruned as well. A day with an up-to-date
+        compacted file is served from it alone; otherwise its raw hourly files are used.
+
+        Args:
+            exchange: Exchange name
+            symbol: Canonical symbol name (e.g., "BTC/USDT")
+            start_date: Start bound (date or datetime). If None, no start filter.
+            end_date: End bound (date = inclusive day, datetime = exclusive). If None, no end filter.
+
+        Returns:
+            Absolute file paths (empty list if nothing matches)
+        """
+        return [f.path for f in self.select_sources(exchange, symbol, start_date, end_date)]
+
+    def select_sources(
+        self,
+        exchange: str,
+        symbol: str,
+        start_date: TimeBound = None,
+        end_date: TimeBound = None
+    ) -> List[SourceFile]:
+        """
+        Same selection as select_files(), with the date/size/mtime/rows recorded for each file.
+
+        Passing these to load_exchange_symbol_data lets the frame cache
+        fingerprint days without stat'ing the files again, and marks compacted
+        files as already sorted.
+        """
+        selected = self._select(exchange, symbol, start_date, end_date)
+        return [
+            SourceFile(str(self.data_path / path), date, size, mtime_ns, compacted, rows)
+            for path, date, size, mtime_ns, compacted, rows
+            in selected.select(['path', 'date', 'size', 'mtime_ns', 'compacted', 'rows']).iter_rows()
+        ]
+
+    def _select(
+        self,
+        exchange: str,
+        symbol: str,
+        start_date: TimeBound,
+        end_date: TimeBound
+    ) -> pl.DataFrame:
+        """Manifest rows for (exchange, symbol) within the time window."""
+        if self._by_exchange is None:
+            # Partition once; selection is called for every (symbol, exchange)
+            self._by_exchange = {
+                key[0]: frame for key, frame in self.files.partition_by('exchange', as_dict=True).items()
+            }
+        candidates = self._by_exchange.get(exchange, self.files.clear())
+        available = set(candidates['symbol_dir'].unique().to_list())
+
+        symbol_dir = next((fmt for fmt in symbol_formats(symbol) if fmt in available), None)
+        if symbol_dir is None:
+            return candidates.clear()
+
+        window = TimeWindow.from_bounds(start_date, end_date)
+        first_date, last_date = window.date_range()
+        hour_start = pl.col('date').str.to_datetime('%Y-%m-%d', time_unit='us', strict=False) + \
+            pl.duration(hours=pl.col('hour').cast(pl.Int64, strict=False))
+
+        predicate = pl.col('symbol_dir') == symbol_dir
+        if first_date:
+            predicate = predicate & (pl.col('date') >= first_date)
+            # Hour partition and footer range must reach the window start
+            predicate = predicate & (hour_start.is_null() | (hour_start > pl.lit(window.start) - pl.duration(hours=1)))
+            predicate = predicate & (pl.col('ts_max').is_null() | (pl.col('ts_max') >= pl.lit(window.start)))
+        if last_date:
+            predicate = predicate & (pl.col('date') <= last_date)
+            predicate = predicate & (hour_start.is_null() | (hour_start < pl.lit(window.end)))
+            predicate = predicate & (pl.col('ts_min').is_null() | (pl.col('ts_min') < pl.lit(window.end)))
+        return prefer_compacted(candidates.filter(predicate))
+
+
+def prefer_compacted(rows: pl.DataFrame) -> pl.DataFrame:
+    """
+    Keep the compacted file for days where it is fresh, the raw hourly files otherwise.
+
+    A compacted file is fresh when no raw file of the same day is newer than
+    it (late collector writes after compaction make it stale).
+    """
+    if not rows['compacted'].any():
+        return rows
+
+    raw_newest = rows.filter(~pl.col('compacted')) \
+        .group_by('date') \
+        .agg(pl.col('mtime_ns').max().alias('raw_mtime_ns'))
+    fresh_days = rows.filter(pl.col('compacted')) \
+        .join(raw_newest, on='date', how='left') \
+        .filter(pl.col('raw_mtime_ns').is_null() | (pl.col('mtime_ns') >= pl.col('raw_mtime_ns'))) \
+        .get_column('date')
+
+    return rows.filter(
+        pl.when(pl.col('date').is_in(fresh_days.implode()))
+        .then(pl.col('compacted'))
+        .otherwise(~pl.col('compacted'))
+    )
+
+
+def load_manifest(data_path: str, manifest_dir: Optional[str] = None) -> PartitionManifest:
+    """
+    Load the on-disk manifest, refresh it incrementally and save it back.
+
+    Args:
+        data_path: Path to the market data directory
+        manifest_dir: Manifest location (default: <data_path>/_manifest)
+
+    Returns:
+        Up-to-date PartitionManifest
+    """
+    return PartitionManifest(data_path, manifest_dir).refresh().save()
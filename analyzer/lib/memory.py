@@ -0,0 +1,276 @@
+"""
+Memory budget: footprint estimates, admission control and peak RSS.
+
+A symbol task's footprint is estimated from its input rows before it
+starts: the loaded frames, the aligned frames (every exchange's rows carry
+the prices of all exchanges) and the pair deviation frames, plus a fixed
+allowance per task; a task group adds the symbols read ahead and the pairs
+waiting in its PairBatch. The coefficients below are rough per-row
+estimates from the column widths of those frames, not measurements; the
+peak RSS reported per task (Estimate vs Peak RSS) shows how far off they are
+on real data.
+
+MemoryBudget dispatches task groups to the pool only while the footprints
+of the running groups fit the budget: a group that would exceed it is held
+back and a later, smaller one that fits goes first. A symbol that does not
+fit even alone is routed to the streaming path with a chunk length that
+scales its footprint down (low_memory_chunk).
+
+Peak RSS is the kernel's high-water mark of the worker process (VmHWM),
+reset before each task on Linux, so every task reports its own peak; where
+it cannot be reset it is the process peak so far. A worker keeps memory its
+allocator retained from earlier tasks, so each task also reports the RSS it
+started with.
+"""
+
+import queue
+import re
+import sys
+from itertools import combinations
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from .batch import DEFAULT_BATCH_ROWS, DEFAULT_MAX_PAIR_ROWS
+from .data_loader import SourceFile
+from .scheduler import source_rows
+
+# Rough estimates, not calibrated:
+# Allowance per task on top of its frames (Polars buffers, result objects)
+TASK_OVERHEAD_BYTES = 48 * 1024 ** 2
+# Pair deviation frames (timestamp + deviation: 16 bytes) plus some of the batch's stacked copy
+PAIR_ROW_BYTES = 20
+# Stacked batch rows (key, timestamp, deviation) with the batched query's intermediates
+BATCH_ROW_BYTES = 96
+# Idle worker process (interpreter, Polars, NumPy)
+WORKER_BASE_BYTES = 100 * 1024 ** 2
+
+_SIZE_UNITS = {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3, 't': 1024 ** 4}
+
+
+def parse_size(value: str) -> int:
+    """
+    Parse a memory size such as "8G", "512M", "1.5GB" or "1048576" (bytes).
+
+    Raises:
+        ValueError: If the string is not a recognised size
+    """
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*', value.lower())
+    if not match:
+        raise ValueError(f"Expected a size like 512M, 8G or 1.5GB, got: {value}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def format_size(n_bytes: float) -> str:
+    """Human-readable size, e.g. 1.2 GB."""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if n_bytes < 1024:
+            return f"{n_bytes:.0f} {unit}" if unit == 'B' else f"{n_bytes:.1f} {unit}"
+        n_bytes /= 1024
+    return f"{n_bytes:.1f} TB"
+
+
+def loaded_bytes(
+    files_by_exchange: Optional[Dict[str, List[SourceFile]]],
+    n_price_columns: int,
+    compact: bool = False
+) -> Optional[float]:
+    """Estimated size of a symbol's loaded frames (what read-ahead holds), in bytes."""
+    if files_by_exchange is None:
+        return None
+    rows = sum(source_rows(files) for files in files_by_exchange.values())
+    return rows * (8 + n_price_columns * (4 if compact else 8))
+
+
+def source_span(files_by_exchange: Dict[str, List[SourceFile]]) -> Optional[timedelta]:
+    """Days covered by the dated files (first to last day, inclusive), or None."""
+    dates = sorted(f.date for files in files_by_exchange.values() for f in files if f.date is not None)
+    if not dates:
+        return None
+    return datetime.strptime(dates[-1], '%Y-%m-%d') - datetime.strptime(dates[0], '%Y-%m-%d') + timedelta(days=1)
+
+
+def symbol_footprint(
+    files_by_exchange: Optional[Dict[str, List[SourceFile]]],
+    n_price_columns: int,
+    compact: bool = False
+) -> Optional[float]:
+    """
+    Estimated peak memory of analyzing one symbol in memory, in bytes.
+
+    Args:
+        files_by_exchange: Exchange -> selected source files (with manifest stats)
+        n_price_columns: Price columns loaded per exchange
+        compact: Float32 prices (timestamps stay 8 bytes)
+
+    Returns:
+        Bytes, or None when the files are unknown (no manifest)
+    """
+    if files_by_exchange is None:
+        return None
+    n_exchanges = max(len(files_by_exchange), 1)
+    n_pairs = n_exchanges * (n_exchanges - 1) / 2
+    rows = sum(source_rows(files) for files in files_by_exchange.values())
+    price_bytes = n_price_columns * (4 if compact else 8)
+    row_bytes = (
+        (8 + price_bytes)                                      # loaded frames
+        + (8 + n_exchanges * price_bytes)                      # aligned frames
+        + n_pairs / n_exchanges * PAIR_ROW_BYTES               # pair deviations
+    )
+    return TASK_OVERHEAD_BYTES + rows * row_bytes
+
+
+def batched_rows(files_by_exchange: Optional[Dict[str, List[SourceFile]]]) -> Optional[float]:
+    """
+    Rows of a symbol's pairs that wait in the shared PairBatch (pairs small
+    enough to be batched; a pair has the rows of its first exchange).
+    """
+    if files_by_exchange is None:
+        return None
+    rows = {exchange: source_rows(files) for exchange, files in files_by_exchange.items()}
+    return sum(rows[ex1] for ex1, _ in combinations(sorted(rows), 2) if rows[ex1] <= DEFAULT_MAX_PAIR_ROWS)
+
+
+def group_footprint(
+    footprints: Sequence[float],
+    loaded: Sequence[float],
+    batched: Sequence[float],
+    read_ahead: int
+) -> float:
+    """
+    Estimated peak of a task group: while a symbol is analyzed, the frames of
+    the next `read_ahead` symbols of the group are already loaded, and the
+    small pairs of the group wait in one PairBatch of up to DEFAULT_BATCH_ROWS.
+
+    Args:
+        footprints: symbol_footprint of each symbol, in group order
+        loaded: loaded_bytes of each symbol, in group order
+        batched: batched_rows of each symbol, in group order
+        read_ahead: Symbols read ahead (see prefetch)
+    """
+    analysis = max((footprint + sum(loaded[i + 1:i + 1 + read_ahead]) for i, footprint in enumerate(footprints)),
+                   default=0.0)
+    return analysis + min(sum(batched), DEFAULT_BATCH_ROWS) * BATCH_ROW_BYTES
+
+
+def low_memory_chunk(
+    footprint: float,
+    target: float,
+    span: timedelta,
+    step: Optional[timedelta] = None
+) -> timedelta:
+    """
+    Streaming chunk length that brings a symbol's footprint down to `target`.
+
+    Memory of the streaming path scales with the chunk's share of the span;
+    the chunk is whole hours, at least one. With a resample `step` it is
+    rounded down to a multiple of it (at least one step), so no bucket is
+    split between two chunks.
+    """
+    hours = span / timedelta(hours=1) * target / max(footprint, 1.0)
+    chunk = timedelta(hours=max(1, int(hours)))
+    if step is not None:
+        chunk = max(step, chunk // step * step)
+    return chunk
+
+
+def reset_peak_rss() -> bool:
+    """Reset this process's RSS high-water mark (Linux); False where not supported."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _proc_status(field: str) -> Optional[int]:
+    """A kB field of /proc/self/status in bytes (Linux), or None."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def current_rss() -> Optional[int]:
+    """Current RSS of this process in bytes (Linux), or None."""
+    return _proc_status('VmRSS')
+
+
+def peak_rss() -> Optional[int]:
+    """Peak RSS of this process in bytes (since the last reset on Linux); None if unavailable."""
+    peak = _proc_status('VmHWM')
+    if peak is not None:
+        return peak
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class MemoryBudget:
+    """
+    Admission control: runs task groups on a pool while their footprints fit.
+
+    Groups are considered in order (largest first, see plan_groups); the
+    first one that fits next to the running groups is dispatched. When
+    nothing is running, the next group runs even if it exceeds the budget -
+    the run must make progress, and symbols too large for the budget have
+    already been routed to the low-memory path.
+    """
+
+    def __init__(self, budget_bytes: float, slots: int):
+        self.budget = budget_bytes
+        self.slots = slots
+        self.peak_reserved = 0.0
+        self._held = set()
+
+    @property
+    def held_back(self) -> int:
+        """Groups that had to wait for memory when they were next in line."""
+        return len(self._held)
+
+    def run(self, pool, func: Callable, items: Sequence, footprints: Sequence[float]) -> Iterator:
+        """
+        Yield func(item) of every item, in completion order.
+
+        Args:
+            pool: multiprocessing Pool
+            func: Picklable task function
+            items: Task arguments, in preferred dispatch order
+            footprints: Estimated peak bytes of each item
+
+        Raises:
+            Exception: The first exception raised by a task
+        """
+        done = queue.Queue()
+        pending = list(range(len(items)))
+        running: Dict[int, float] = {}
+        while pending or running:
+            while pending and len(running) < self.slots:
+                reserved = sum(running.values())
+                index = next((i for i in pending if reserved + footprints[i] <= self.budget), None)
+                if index != pending[0] and running:
+                    self._held.add(pending[0])
+                if index is None:
+                    if running:
+                        break
+                    index = pending[0]
+                pending.remove(index)
+                running[index] = footprints[index]
+                self.peak_reserved = max(self.peak_reserved, reserved + footprints[index])
+                pool.apply_async(
+                    func, (items[index],),
+                    callback=lambda result, i=index: done.put((i, result, None)),
+                    error_callback=lambda error, i=index: done.put((i, None, error))
+                )
+            index, result, error = done.get()
+            del running[index]
+            if error is not None:
+                raise error
+            yield result
@@ -0,0 +1,199 @@
+"""
+Incremental pair analysis, one quote at a time.
+
+A PairState consumes the quotes of both exchanges in time order and keeps
+the as-of aligned deviation and every summary counter up to date in
+constant time per quote, so a live screener can read the pair metrics at
+any moment without re-running the batch analysis. Its snapshot equals
+analyze_pair_fast on the same quotes.
+"""
+
+import math
+from typing import Optional, List, Any, Dict
+
+from .summary import DeviationSummary, ThresholdState, exact_value
+
+_INF = float('inf')
+
+
+class PairState:
+    """
+    Running metrics of one exchange pair.
+
+    Rows are ex1's quotes, each aligned with the latest ex2 quote at or
+    before its timestamp (as join_asof in align_pair). Because an ex2 quote
+    with the same timestamp still applies, ex1 quotes of the newest
+    timestamp stay pending until a later timestamp arrives; summary() and
+    snapshot() include them.
+    """
+
+    __slots__ = (
+        'thresholds', 'zero_threshold', 'bid2', 'last_ts', 'pending_ts', 'pending',
+        'rows', 'valid', 'total', 'special_total', 'min', 'max', 'first_ts', 'row_ts',
+        'first_sign', 'last_sign', 'crossings', 'last_deviation',
+        'above', 'cycles', 'first_event', 'last_event'
+    )
+
+    def __init__(self, thresholds: Optional[List[float]] = None, zero_threshold: float = 0.05):
+        """
+        Args:
+            thresholds: List of profitability thresholds in % (default: [0.3, 0.5, 0.4])
+            zero_threshold: Neutral zone threshold in % (default: 0.05)
+        """
+        self.thresholds = tuple(thresholds if thresholds is not None else [0.3, 0.5, 0.4])
+        self.zero_threshold = zero_threshold
+        self.bid2: Optional[float] = None
+        self.last_ts: Any = None
+        self.pending_ts: Any = None
+        self.pending: List[float] = []
+
+        self.rows = 0
+        self.valid = 0
+        self.total = 0
+        self.special_total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.first_ts: Any = None
+        self.row_ts: Any = None
+        self.first_sign: Optional[float] = None
+        self.last_sign: Optional[float] = None
+        self.crossings = 0
+        self.last_deviation: Optional[float] = None
+        self.above = [0] * len(self.thresholds)
+        self.cycles = [0] * len(self.thresholds)
+        self.first_event = [0] * len(self.thresholds)
+        self.last_event = [0] * len(self.thresholds)
+
+    def update(self, side: int, timestamp, bid: float) -> None:
+        """
+        Apply one quote.
+
+        Args:
+            side: 1 for a quote of ex1, 2 for ex2
+            timestamp: Quote time (datetime, or epoch integer); never earlier than the previous quote
+            bid: Best bid
+
+        Raises:
+            ValueError: If the side is not 1 or 2, or the quote is out of time order
+        """
+        if side not in (1, 2):
+            raise ValueError(f"side must be 1 or 2, got: {side}")
+        if self.last_ts is not None and timestamp < self.last_ts:
+            raise ValueError(f"Quote at {timestamp} is older than the previous one ({self.last_ts})")
+        self.last_ts = timestamp
+
+        if self.pending and timestamp != self.pending_ts:
+            self._flush()
+        if side == 2:
+            self.bid2 = float(bid)
+        else:
+            self.pending_ts = timestamp
+            self.pending.append(float(bid))
+
+    def summary(self) -> DeviationSummary:
+        """DeviationSummary of every quote so far (mergeable with batch summaries)."""
+        state = self
+        if self.pending:
+            state = self._copy()
+            state._flush()
+        return DeviationSummary(
+            thresholds=state.thresholds,
+            zero_threshold=state.zero_threshold,
+            rows=state.rows,
+            valid=state.valid,
+            total=state.total,
+            special_total=state.special_total,
+            min=state.min,
+            max=state.max,
+            first_ts=state.first_ts,
+            last_ts=state.row_ts,
+            first_sign=state.first_sign,
+            last_sign=state.last_sign,
+            crossings=state.crossings,
+            last_deviation=state.last_deviation,
+            levels=[
+                ThresholdState(above=a, cycles=c, first_event=f, last_event=e)
+                for a, c, f, e in zip(state.above, state.cycles, state.first_event, state.last_event)
+            ]
+        )
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """Current pair metrics: what analyze_pair_fast returns for the quotes so far."""
+        return self.summary().to_metrics()
+
+    def _copy(self) -> 'PairState':
+        state = PairState.__new__(PairState)
+        for name in PairState.__slots__:
+            value = getattr(self, name)
+            setattr(state, name, list(value) if isinstance(value, list) else value)
+        return state
+
+    def _flush(self) -> None:
+        """Add the pending ex1 rows, aligned with the current ex2 quote."""
+        for bid1 in self.pending:
+            self._add_row(self.pending_ts, bid1)
+        self.pending.clear()
+
+    def _add_row(self, timestamp, bid1: float) -> None:
+        """One row of the aligned series; same rules as summarize_deviation."""
+        if self.rows == 0:
+            self.first_ts = timestamp
+        self.rows += 1
+        self.row_ts = timestamp
+
+        if self.bid2 is None:
+            # No ex2 quote yet: a null deviation (counts as a row only)
+            self.last_sign = None
+            self.last_deviation = None
+            return
+
+        deviation = (_divide(bid1, self.bid2) - 1.0) / 1.0 * 100
+        is_nan = math.isnan(deviation)
+        sign = math.nan if is_nan else float((deviation > 0) - (deviation < 0))
+        if self.rows == 1:
+            self.first_sign = sign
+        if self.last_sign is not None and sign * self.last_sign < 0:
+            self.crossings += 1
+        self.last_sign = sign
+        self.last_deviation = deviation
+
+        self.valid += 1
+        if math.isfinite(deviation):
+            self.total += exact_value(deviation)
+        else:
+            self.special_total += deviation
+        # Polars min/max skip NaN unless every value is NaN
+        if is_nan:
+            if self.min is None:
+                self.min = self.max = deviation
+        else:
+            if self.min is None or math.isnan(self.min) or deviation < self.min:
+                self.min = deviation
+            if self.max is None or math.isnan(self.max) or deviation > self.max:
+                self.max = deviation
+
+        # NaN compares above every threshold and is never neutral (Polars ordering)
+        magnitude = _INF if is_nan else abs(deviation)
+        neutral = magnitude < self.zero_threshold
+        for i, threshold in enumerate(self.thresholds):
+            if magnitude > threshold:
+                event = 1
+                self.above[i] += 1
+            elif neutral:
+                event = -1
+                if self.last_event[i] == 1:
+                    self.cycles[i] += 1
+            else:
+                continue
+            if self.first_event[i] == 0:
+                self.first_event[i] = event
+            self.last_event[i] = event
+
+
+def _divide(a: float, b: float) -> float:
+    """IEEE division, as Polars computes it (x/0 is +-inf, 0/0 is NaN)."""
+    if b != 0:
+        return a / b
+    if a == 0 or math.isnan(a):
+        return math.nan
+    return math.copysign(_INF, a) * math.copysign(1.0, b)
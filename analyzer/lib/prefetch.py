@@ -0,0 +1,70 @@
+"""
+Process-wide I/O thread pool and bounded read-ahead.
+
+Each worker process keeps one long-lived reader pool (created on first use,
+reused by every task the process runs). prefetch() walks a list of items and
+keeps the reads of the next `read_ahead` items in flight while the caller
+analyzes the current one, so parquet decoding overlaps with the CPU work
+instead of alternating with it. At most read_ahead + 1 items' data is
+resident at any time.
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Tuple, TypeVar, Optional
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+DEFAULT_IO_WORKERS = 4
+DEFAULT_READ_AHEAD = 2
+
+_io_pool: Optional[ThreadPoolExecutor] = None
+_io_pool_size = 0
+# Symbol groups may run on threads of one process (thread executor)
+_io_pool_lock = threading.Lock()
+
+
+def io_pool(max_workers: Optional[int] = None) -> ThreadPoolExecutor:
+    """
+    The reader pool of this process.
+
+    Created on first use and kept for the life of the process; a request for
+    a different size replaces it (the old pool finishes its queued reads).
+
+    Args:
+        max_workers: Concurrent reads (keep low on spinning disks and network
+            shares); None = the current pool, or DEFAULT_IO_WORKERS if there is none
+    """
+    global _io_pool, _io_pool_size
+    with _io_pool_lock:
+        if max_workers is None:
+            max_workers = _io_pool_size or DEFAULT_IO_WORKERS
+        if _io_pool is None or _io_pool_size != max_workers:
+            if _io_pool is not None:
+                _io_pool.shutdown(wait=False)
+            _io_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='io')
+            _io_pool_size = max_workers
+        return _io_pool
+
+
+def prefetch(items: Iterable[T], start: Callable[[T], R], read_ahead: int = DEFAULT_READ_AHEAD) -> Iterator[Tuple[T, R]]:
+    """
+    Yield (item, start(item)) in order, with up to `read_ahead` later items already started.
+
+    `start` must only submit work (e.g. return futures of io_pool reads) and
+    not wait on it; the caller waits on the results of the current item.
+
+    Args:
+        items: Items in processing order
+        start: Submits the reads of one item and returns their handles
+        read_ahead: Items started ahead of the one being processed (0 = no prefetch)
+    """
+    pending = deque()
+    for item in items:
+        pending.append((item, start(item)))
+        if len(pending) > read_ahead:
+            yield pending.popleft()
+    while pending:
+        yield pending.popleft()
@@ -0,0 +1,132 @@
+"""
+Columnar result transport between workers and the parent.
+
+A worker task returns one ResultBatch per symbol group instead of a list of
+per-pair dicts: the pair outcomes and the metrics of all its pairs are
+frames with a fixed schema, and the sweep, window, cycle and simulation
+frames of all pairs are concatenated with their pair columns in the worker.
+Polars frames are pickled as Arrow IPC buffers, so the IPC volume is a few
+column buffers per group, and the parent (ResultCollector) keeps frames
+instead of one Python dict per pair.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import polars as pl
+
+# Pair outcomes: one row per pair of the group, successful or not
+PAIR_SCHEMA = {
+    'symbol': pl.String,
+    'exchange1': pl.String,
+    'exchange2': pl.String,
+    'status': pl.String,
+    'days_reused': pl.Int64,
+    'days_computed': pl.Int64,
+}
+# Key columns leading the stats frame and every per-pair frame
+PAIR_KEY = ['symbol', 'exchange1', 'exchange2']
+# Optional per-pair frames (see analyze_symbol_batch)
+FRAME_KINDS = ('sweep', 'windows', 'cycles', 'simulation')
+
+
+@dataclass
+class ResultBatch:
+    """Results of one task group in columnar form."""
+
+    pairs: pl.DataFrame
+    stats: Optional[pl.DataFrame]
+    frames: Dict[str, pl.DataFrame] = field(default_factory=dict)
+    # Pairs that contributed to each frame
+    frame_pairs: Dict[str, int] = field(default_factory=dict)
+    peak_rss: Optional[int] = None
+    start_rss: Optional[int] = None
+    worker_pid: Optional[int] = None
+
+    @property
+    def symbols(self) -> List[str]:
+        """Symbols of the group, in analysis order."""
+        return self.pairs['symbol'].unique(maintain_order=True).to_list()
+
+
+def pack_results(results: List[dict], **task_info) -> ResultBatch:
+    """
+    Pack per-pair result dicts (symbol, ex1, ex2, status, stats and optional
+    frames) into a ResultBatch.
+
+    Args:
+        results: Pair results of analyze_symbol_batch / analyze_symbol_streaming
+        **task_info: peak_rss, start_rss, worker_pid of the task
+
+    Returns:
+        ResultBatch; stats holds the successful pairs only (None if there are none)
+    """
+    pairs = pl.DataFrame({
+        'symbol': [r['symbol'] for r in results],
+        'exchange1': [r['ex1'] for r in results],
+        'exchange2': [r['ex2'] for r in results],
+        'status': [r['status'] for r in results],
+        'days_reused': [r.get('days_reused', 0) for r in results],
+        'days_computed': [r.get('days_computed', 0) for r in results],
+    }, schema=PAIR_SCHEMA)
+
+    successful = [r for r in results if r['status'] == 'SUCCESS']
+    rows = [{'symbol': r['symbol'], 'exchange1': r['ex1'], 'exchange2': r['ex2'], **r['stats']}
+            for r in successful if r['stats']]
+    # Every row is inspected: a metric can be null in the first pairs (e.g. no ADF result)
+    stats = pl.DataFrame(rows, infer_schema_length=None) if rows else None
+
+    frames, frame_pairs = {}, {}
+    for kind in FRAME_KINDS:
+        parts = [
+            r[kind].select([
+                pl.lit(r['symbol']).alias('symbol'),
+                pl.lit(r['ex1']).alias('exchange1'),
+                pl.lit(r['ex2']).alias('exchange2'),
+                pl.all()
+            ])
+            for r in successful if r.get(kind) is not None
+        ]
+        if kind == 'cycles':
+            parts = [part for part in parts if not part.is_empty()]
+        if parts:
+            frames[kind] = pl.concat(parts)
+            frame_pairs[kind] = len(parts)
+
+    return ResultBatch(pairs, stats, frames, frame_pairs, **task_info)
+
+
+class ResultCollector:
+    """Parent-side merge of ResultBatches: frames are concatenated once, at the end."""
+
+    def __init__(self):
+        self._pairs: List[pl.DataFrame] = []
+        self._stats: List[pl.DataFrame] = []
+        self._frames: Dict[str, List[pl.DataFrame]] = {kind: [] for kind in FRAME_KINDS}
+        self.frame_pairs: Dict[str, int] = dict.fromkeys(FRAME_KINDS, 0)
+
+    def add(self, batch: ResultBatch):
+        self._pairs.append(batch.pairs)
+        if batch.stats is not None:
+            self._stats.append(batch.stats)
+        for kind, frame in batch.frames.items():
+            self._frames[kind].append(frame)
+            self.frame_pairs[kind] += batch.frame_pairs[kind]
+
+    def pairs(self) -> pl.DataFrame:
+        """Outcome rows of all pairs (PAIR_SCHEMA)."""
+        return pl.concat(self._pairs) if self._pairs else pl.DataFrame(schema=PAIR_SCHEMA)
+
+    def stats(self) -> Optional[pl.DataFrame]:
+        """
+        Metrics of all successful pairs, or None. Groups are merged by column
+        name; a metric that is all null in one group takes the others' type.
+        """
+        if not self._stats:
+            return None
+        return pl.concat(self._stats, how='diagonal_relaxed')
+
+    def frame(self, kind: str) -> Optional[pl.DataFrame]:
+        """Concatenated frame of one kind (see FRAME_KINDS), or None."""
+        frames = self._frames[kind]
+        return pl.concat(frames) if frames else None
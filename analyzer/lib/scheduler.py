@@ -0,0 +1,154 @@
+"""
+Size-aware scheduling of symbol tasks over the worker pool.
+
+Each symbol task gets a cost estimate from its input: the rows of its
+files (manifest footers; file size / BYTES_PER_ROW where the row count is
+unknown), weighted by the work done on them - every exchange is loaded
+once and every pair aligns and scans about one exchange's rows.
+
+plan_groups() hands the work out largest first (LPT): a task at least as
+large as the target group cost runs alone, and the small ones are packed
+into groups of about that cost, so a huge symbol starts immediately
+instead of becoming the tail of the run and a thousand tiny symbols do
+not cost a thousand round trips. The pool dispatches groups in order, so
+the largest are always in flight first.
+
+split_threads() divides a fixed thread budget (default: the CPU count)
+between worker processes and Polars threads per process. It simulates the
+LPT schedule for each split, with the speedup of t Polars threads modeled
+as t / (1 + THREAD_OVERHEAD * (t - 1)), and keeps the split with the
+shortest makespan: many single-threaded processes for many similar tasks,
+fewer processes with more threads each when one task dominates.
+"""
+
+import heapq
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .data_loader import SourceFile
+
+# Compressed parquet bytes per quote row, for files without a recorded row count
+BYTES_PER_ROW = 16
+# Fraction of each additional Polars thread lost to coordination (speedup model)
+THREAD_OVERHEAD = 0.25
+# Target groups per process: enough to balance the tail, few enough to keep read-ahead useful
+GROUPS_PER_PROCESS = 4
+MAX_GROUP_SIZE = 32
+
+
+def source_rows(files: List[SourceFile]) -> float:
+    """Quote rows of the files: footer row counts, file size / BYTES_PER_ROW where unknown."""
+    rows = 0.0
+    for f in files:
+        if f.rows is not None:
+            rows += f.rows
+        elif f.size is not None:
+            rows += f.size / BYTES_PER_ROW
+    return rows
+
+
+def task_cost(files_by_exchange: Optional[Dict[str, List[SourceFile]]], n_pairs: int) -> Optional[float]:
+    """
+    Estimated cost of a symbol task, in rows processed.
+
+    Args:
+        files_by_exchange: Exchange -> selected source files (with manifest stats)
+        n_pairs: Number of exchange pairs of the symbol
+
+    Returns:
+        Rows loaded plus rows scanned by the pairs, or None when the files are
+        unknown (no manifest)
+    """
+    if files_by_exchange is None:
+        return None
+    n_exchanges = max(len(files_by_exchange), 1)
+    rows = sum(source_rows(files) for files in files_by_exchange.values())
+    # Each exchange is loaded once; each pair aligns and scans about one exchange's rows
+    # (at least one row, so empty symbols are still packed rather than run alone)
+    return max(rows, 1.0) * (1 + n_pairs / n_exchanges)
+
+
+def plan_groups(
+    costs: Sequence[float],
+    n_processes: int,
+    max_group_size: int = MAX_GROUP_SIZE
+) -> List[List[int]]:
+    """
+    Pack tasks into groups, largest first.
+
+    Args:
+        costs: Cost of each task
+        n_processes: Worker processes the groups are spread over
+        max_group_size: Most tasks per group
+
+    Returns:
+        Groups of task indices, in descending order of group cost; every task
+        is in exactly one group
+    """
+    if not costs:
+        return []
+    target = sum(costs) / (n_processes * GROUPS_PER_PROCESS)
+    groups: List[Tuple[float, List[int]]] = []
+    current: List[int] = []
+    current_cost = 0.0
+    for index in sorted(range(len(costs)), key=lambda i: costs[i], reverse=True):
+        if costs[index] >= target:
+            groups.append((costs[index], [index]))
+            continue
+        current.append(index)
+        current_cost += costs[index]
+        if current_cost >= target or len(current) == max_group_size:
+            groups.append((current_cost, current))
+            current, current_cost = [], 0.0
+    if current:
+        groups.append((current_cost, current))
+    groups.sort(key=lambda group: group[0], reverse=True)
+    return [indices for _, indices in groups]
+
+
+def thread_speedup(threads: int) -> float:
+    """Modeled speedup of one task run with `threads` Polars threads."""
+    return threads / (1 + THREAD_OVERHEAD * (threads - 1))
+
+
+def lpt_makespan(costs: Sequence[float], n_processes: int, speed: float = 1.0) -> float:
+    """Finish time of the costs (descending) handed to the first free of n_processes."""
+    finish = [0.0] * n_processes
+    for cost in sorted(costs, reverse=True):
+        heapq.heapreplace(finish, finish[0] + cost / speed)
+    return max(finish)
+
+
+def split_threads(
+    costs: Sequence[float],
+    budget: int,
+    n_processes: Optional[int] = None,
+    max_processes: Optional[int] = None
+) -> Tuple[int, int]:
+    """
+    Split a thread budget into worker processes x Polars threads per process.
+
+    Args:
+        costs: Cost of each task
+        budget: Total threads (usually the CPU count)
+        n_processes: Fixed process count (e.g. --workers); None = chosen here
+        max_processes: Upper bound on processes (e.g. from a memory budget); the
+            threads of the processes left out go to the others
+
+    Returns:
+        (processes, threads per process); processes * threads <= budget unless
+        a fixed process count exceeds the budget (then 1 thread each)
+    """
+    budget = max(1, budget)
+    if n_processes is not None:
+        if max_processes is not None:
+            n_processes = max(1, min(n_processes, max_processes))
+        return n_processes, max(1, budget // n_processes)
+
+    best = (float('inf'), 0, 1, 1)
+    limit = min(budget, max(len(costs), 1), max_processes or budget)
+    for processes in range(1, max(limit, 1) + 1):
+        threads = budget // processes
+        makespan = lpt_makespan(costs, processes, thread_speedup(threads))
+        # Ties go to more processes: they scale better than the modeled threads
+        best = min(best, (makespan, -processes, processes, threads))
+    return best[2], best[3]
@@ -0,0 +1,186 @@
+"""
+Fee-aware trade simulation over a pair's cycles, for a whole threshold grid.
+
+A trade follows the cycle state machine: it is entered at the first row
+whose |deviation| exceeds the threshold and closed at the next neutral row
+(|deviation| < zero_threshold); a trade still open at the end of the
+series is not counted. Prices are the executable ones of the directional
+paths (see PATHS): with ex1 rich (deviation > 0) the entry sells ex1's bid
+and buys ex2's ask, and the exit buys ex1's ask and sells ex2's bid - the
+ratio is sold at bid1/ask2 and bought back at ask1/bid2:
+
+    gross % = ((1 + bid1_ask2_entry / 100) * (1 + bid2_ask1_exit / 100) - 1) * 100
+
+(mirrored for ex2 rich). Each trade has four fills; a fee schedule charges
+every fill its exchange's fee plus the slippage allowance.
+
+The grid is evaluated without replaying it per threshold. With thresholds
+at or above the neutral zone, the exits are the same for every threshold
+(the neutral row closing the excursion) and the entry for threshold t is
+the first row of the excursion whose |deviation| exceeds t - a row where
+the running maximum of the excursion rises from p to c is the entry of
+exactly the thresholds in [p, c). So one pass finds those record rows, a
+binary search maps each to its range of grid thresholds, and all trades of
+all thresholds come out as one array; fee schedules are a broadcast over it.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple, Optional
+
+import numpy as np
+import polars as pl
+
+
+@dataclass(frozen=True)
+class FeeSchedule:
+    """Fee per fill in %, by exchange (others pay `default`)."""
+
+    name: str
+    default: float
+    fees: Dict[str, float] = field(default_factory=dict)
+
+    def fee(self, exchange: str) -> float:
+        return self.fees.get(exchange, self.default)
+
+
+@dataclass(frozen=True)
+class SimulationGrid:
+    """Entry thresholds (%) x fee schedules, with a slippage allowance per fill (%)."""
+
+    thresholds: Tuple[float, ...]
+    schedules: Tuple[FeeSchedule, ...]
+    slippage_pct: float = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.thresholds) * len(self.schedules)
+
+
+def parse_fee_schedules(config: Dict[str, Dict[str, float]]) -> Tuple[FeeSchedule, ...]:
+    """
+    Fee schedules from config: name -> {exchange: fee %, ..., 'default': fee %}.
+
+    Raises:
+        ValueError: If a schedule has no default or a fee is not a number
+    """
+    schedules = []
+    for name, fees in config.items():
+        fees = dict(fees or {})
+        if 'default' not in fees:
+            raise ValueError(f"Fee schedule '{name}' needs a 'default' fee")
+        try:
+            default = float(fees.pop('default'))
+            schedules.append(FeeSchedule(name, default, {ex: float(fee) for ex, fee in fees.items()}))
+        except (TypeError, ValueError):
+            raise ValueError(f"Fee schedule '{name}' has a non-numeric fee")
+    return tuple(schedules)
+
+
+def simulate_pair(
+    paths: pl.DataFrame,
+    ex1: str,
+    ex2: str,
+    grid: SimulationGrid,
+    zero_threshold: float = 0.05
+) -> Optional[pl.DataFrame]:
+    """
+    Simulated trades of one pair at every grid point.
+
+    Args:
+        paths: pair_paths() output (timestamp, bid_bid, bid1_ask2, bid2_ask1, ...)
+        ex1: First exchange of the pair (fees of the ex1 fills)
+        ex2: Second exchange of the pair
+        grid: Thresholds x fee schedules; thresholds below zero_threshold are not simulated
+        zero_threshold: Neutral zone (exit) threshold in %
+
+    Returns:
+        Long-format frame, one row per threshold and fee schedule: threshold,
+        fee_schedule, trades, trades_per_hour, hit_rate_pct (share of trades
+        with positive net PnL), avg_gross_pnl_pct, avg_net_pnl_pct,
+        total_net_pnl_pct, avg_hold_sec; None if the series has no valid deviation
+    """
+    deviation = paths['bid_bid']
+    if deviation.null_count() == len(deviation):
+        return None
+    thresholds = np.asarray(sorted(t for t in grid.thresholds if t >= zero_threshold), dtype=np.float64)
+
+    # Same event rules as the cycle counters: NaN is above every threshold and never
+    # neutral (as +inf), rows without a deviation never enter or exit
+    frame = paths.select([
+        pl.col('bid_bid').abs().fill_nan(np.inf).fill_null(-np.inf).alias('magnitude'),
+    ]).with_columns(
+        (pl.col('magnitude') < zero_threshold).alias('neutral')
+    ).with_columns(
+        pl.col('neutral').cum_sum().alias('excursion')
+    ).with_columns(
+        pl.col('magnitude').cum_max().over('excursion').alias('running_max')
+    )
+    neutral = frame['neutral'].to_numpy()
+    excursion = frame['excursion'].to_numpy()
+    running_max = frame['running_max'].to_numpy()
+    exits = np.flatnonzero(neutral)
+
+    # Record rows: the excursion's running maximum rises from `previous` to `running_max`
+    previous = np.empty_like(running_max)
+    previous[0] = -np.inf
+    previous[1:] = running_max[:-1]
+    previous[1:][excursion[1:] != excursion[:-1]] = -np.inf
+    # Only excursions closed by a neutral row make trades
+    records = np.flatnonzero((running_max > previous) & (excursion < len(exits)))
+    first = np.searchsorted(thresholds, previous[records], side='left')
+    last = np.searchsorted(thresholds, running_max[records], side='left')
+    counts = last - first
+
+    # One trade per (record row, threshold in [previous, running_max))
+    entry = np.repeat(records, counts)
+    offsets = np.arange(len(entry)) - np.repeat(np.cumsum(counts) - counts, counts)
+    level = np.repeat(first, counts) + offsets
+    exit_row = exits[excursion[entry]]
+
+    bid_bid = deviation.to_numpy()
+    bid1_ask2 = paths['bid1_ask2'].to_numpy()
+    bid2_ask1 = paths['bid2_ask1'].to_numpy()
+    ex1_rich = bid_bid[entry] > 0
+    gross = np.where(
+        ex1_rich,
+        (1 + bid1_ask2[entry] / 100) * (1 + bid2_ask1[exit_row] / 100) - 1,
+        (1 + bid2_ask1[entry] / 100) * (1 + bid1_ask2[exit_row] / 100) - 1
+    ) * 100
+    # Trades at rows without executable prices cannot be valued
+    valid = np.isfinite(gross)
+    entry, exit_row, level, gross = entry[valid], exit_row[valid], level[valid], gross[valid]
+
+    timestamps = paths['timestamp']
+    if timestamps.dtype == pl.Int64:
+        micros = timestamps.to_numpy()  # compact mode: epoch microseconds
+    else:
+        micros = timestamps.dt.epoch('us').to_numpy()
+    hold = (micros[exit_row] - micros[entry]) / 1e6
+    hours = (micros[-1] - micros[0]) / 3_600_000_000
+
+    n_levels = len(thresholds)
+    trades = np.bincount(level, minlength=n_levels)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg_gross = np.bincount(level, weights=gross, minlength=n_levels) / trades
+        avg_hold = np.bincount(level, weights=hold, minlength=n_levels) / trades
+
+    rows: Dict[str, List] = {key: [] for key in (
+        'threshold', 'fee_schedule', 'trades', 'trades_per_hour', 'hit_rate_pct',
+        'avg_gross_pnl_pct', 'avg_net_pnl_pct', 'total_net_pnl_pct', 'avg_hold_sec')}
+    for schedule in grid.schedules:
+        cost = 2 * (schedule.fee(ex1) + schedule.fee(ex2)) + 4 * grid.slippage_pct
+        net = gross - cost
+        total = np.bincount(level, weights=net, minlength=n_levels)
+        wins = np.bincount(level, weights=net > 0, minlength=n_levels)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rows['threshold'].extend(thresholds)
+            rows['fee_schedule'].extend([schedule.name] * n_levels)
+            rows['trades'].extend(trades)
+            rows['trades_per_hour'].extend(trades / hours if hours > 0 else np.zeros(n_levels))
+            rows['hit_rate_pct'].extend(wins / trades * 100)
+            rows['avg_gross_pnl_pct'].extend(avg_gross)
+            rows['avg_net_pnl_pct'].extend(total / trades)
+            rows['total_net_pnl_pct'].extend(total)
+            rows['avg_hold_sec'].extend(avg_hold)
+    # Levels without trades have no averages
+    return pl.DataFrame(rows).fill_nan(None)
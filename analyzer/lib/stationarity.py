@@ -0,0 +1,169 @@
+"""
+Stationarity and mean-reversion statistics of many pairs at once.
+
+Per pair, the deviation series is sampled on a regular time grid (last
+value per bucket of `every`), and on that grid:
+
+- ADF statistic: t-statistic of beta in the augmented Dickey-Fuller
+  regression  dx_t = a + beta * x_{t-1} + sum_j g_j * dx_{t-j} + e
+  (constant, `lags` lagged differences). Below about -2.86 the unit root
+  is rejected at 5% (asymptotic critical value, constant only).
+- OU half-life: from the AR(1) fit  dx_t = a + beta * x_{t-1} + e  on the
+  same rows, -ln 2 / ln(1 + beta) grid steps, in seconds; None when the
+  fit is not mean-reverting (1 + beta outside (0, 1)).
+- Skewness, excess kurtosis and the Jarque-Bera normality test of the grid
+  values (time-weighted, unlike tick rows that bunch in busy periods).
+
+Nothing is fitted pair by pair: the grid rows of all pairs are stacked,
+every cross-product of the regressors is summed per pair with one
+bincount, and the normal equations of all pairs are solved as one stacked
+linear-algebra call. Empty buckets are not filled; a row enters the
+regressions only when its lags are the directly preceding buckets.
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, Any, Optional
+
+import numpy as np
+import polars as pl
+
+# Regressions with fewer usable rows than this report no statistics
+MIN_REGRESSION_ROWS = 20
+# Normal equations worse conditioned than this are treated as singular (e.g. a flat series)
+MAX_CONDITION = 1e12
+
+STAT_COLUMNS = ('adf_stat', 'half_life_sec', 'deviation_skew', 'deviation_kurtosis',
+                'jarque_bera_pvalue', 'stat_samples')
+
+
+@dataclass(frozen=True)
+class StatsSpec:
+    """Grid step and ADF lag order of the statistics stage."""
+
+    every: timedelta = timedelta(seconds=1)
+    lags: int = 1
+
+
+def pair_statistics(stacked: pl.DataFrame, spec: StatsSpec = StatsSpec()) -> pl.DataFrame:
+    """
+    Statistics of every pair of a stacked frame (see stack_pairs).
+
+    Args:
+        stacked: Frame with pair_id, timestamp and deviation columns, pairs contiguous,
+            each in time order
+        spec: Grid step and ADF lag order
+
+    Returns:
+        DataFrame with pair_id and STAT_COLUMNS, one row per pair with at least
+        one finite deviation, in pair_id order; values are null where the
+        pair has too few grid rows (or, for half_life_sec, no mean reversion)
+    """
+    step = int(spec.every / timedelta(microseconds=1))
+    timestamp = pl.col('timestamp')
+    if stacked.schema['timestamp'] != pl.Int64:
+        timestamp = timestamp.dt.epoch('us')  # compact mode already stores epoch microseconds
+    bucket = timestamp // step
+    pair_id = pl.col('pair_id')
+
+    # Last finite deviation of each bucket: pairs and buckets are contiguous
+    grid = stacked.lazy().filter(pl.col('deviation').is_finite()).select([
+        pair_id, bucket.alias('bucket'), pl.col('deviation').alias('x')
+    ]).filter(
+        ((pair_id != pair_id.shift(-1)) | (pl.col('bucket') != pl.col('bucket').shift(-1))).fill_null(True)
+    ).collect()
+    if grid.is_empty():
+        return pl.DataFrame(schema={'pair_id': pl.UInt32, **{c: pl.Float64 for c in STAT_COLUMNS[:-1]},
+                                    'stat_samples': pl.Int64})
+
+    ids = grid['pair_id'].to_numpy().astype(np.int64)
+    buckets = grid['bucket'].to_numpy()
+    x = grid['x'].to_numpy()
+    n_pairs = int(ids[-1]) + 1
+    index = np.arange(len(x))
+
+    # Position within the current run of consecutive buckets of one pair
+    run_start = np.ones(len(x), dtype=bool)
+    run_start[1:] = (ids[1:] != ids[:-1]) | (buckets[1:] - buckets[:-1] != 1)
+    position = index - np.maximum.accumulate(np.where(run_start, index, 0))
+
+    # Regression rows need x_{t-1} and `lags` lagged differences: lags + 1 preceding buckets
+    lags = spec.lags
+    rows = np.flatnonzero(position >= lags + 1)
+    dx = np.diff(x, prepend=np.nan)
+    y = dx[rows]
+    regressors = [np.ones(len(rows)), x[rows - 1]] + [dx[rows - j] for j in range(1, lags + 1)]
+    row_ids = ids[rows]
+
+    k = len(regressors)
+    xtx = np.empty((n_pairs, k, k))
+    xty = np.empty((n_pairs, k))
+    for i in range(k):
+        xty[:, i] = np.bincount(row_ids, weights=regressors[i] * y, minlength=n_pairs)
+        for j in range(i, k):
+            xtx[:, i, j] = xtx[:, j, i] = np.bincount(row_ids, weights=regressors[i] * regressors[j],
+                                                      minlength=n_pairs)
+    yty = np.bincount(row_ids, weights=y * y, minlength=n_pairs)
+    n = xtx[:, 0, 0]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # ADF: all k regressors
+        solvable = (n >= max(MIN_REGRESSION_ROWS, k + 1)) & (np.linalg.cond(xtx) < MAX_CONDITION)
+        eye = np.broadcast_to(np.eye(k), xtx.shape)
+        inverse = np.linalg.inv(np.where(solvable[:, None, None], xtx, eye))
+        beta = np.einsum('pij,pj->pi', inverse, xty)
+        rss = np.maximum(yty - np.einsum('pi,pi->p', beta, xty), 0.0)
+        se = np.sqrt(rss / (n - k) * inverse[:, 1, 1])
+        adf = np.where(solvable & (se > 0), beta[:, 1] / se, np.nan)
+
+        # AR(1) for the half-life: the constant and x_{t-1} block of the same sums
+        det = xtx[:, 0, 0] * xtx[:, 1, 1] - xtx[:, 0, 1] ** 2
+        ar_beta = (xtx[:, 0, 0] * xty[:, 1] - xtx[:, 0, 1] * xty[:, 0]) / det
+        phi = 1.0 + ar_beta
+        reverting = solvable & (phi > 0) & (phi < 1)
+        half_life = np.where(reverting, -math.log(2) / np.log(np.where(reverting, phi, 0.5)), np.nan) \
+            * (step / 1e6)
+
+        # Moments of the grid values (population moments, as Polars skew/kurtosis)
+        samples = np.bincount(ids, minlength=n_pairs).astype(np.float64)
+        mean = np.bincount(ids, weights=x, minlength=n_pairs) / samples
+        centered = x - mean[ids]
+        squared = centered * centered
+        m2 = np.bincount(ids, weights=squared, minlength=n_pairs) / samples
+        m3 = np.bincount(ids, weights=squared * centered, minlength=n_pairs) / samples
+        m4 = np.bincount(ids, weights=squared * squared, minlength=n_pairs) / samples
+        # A flat series leaves only rounding noise of the mean (relative variance ~1e-32)
+        spread = m2 > 1e-24 * mean * mean
+        skew = np.where(spread, m3 / m2 ** 1.5, np.nan)
+        kurtosis = np.where(spread, m4 / m2 ** 2 - 3.0, np.nan)
+        # Jarque-Bera statistic is chi-squared with 2 degrees of freedom: p = exp(-JB / 2)
+        jarque_bera = samples / 6 * (skew ** 2 + kurtosis ** 2 / 4)
+        pvalue = np.exp(-jarque_bera / 2)
+
+    present = samples > 0
+    return pl.DataFrame({
+        'pair_id': np.flatnonzero(present).astype(np.uint32),
+        'adf_stat': adf[present],
+        'half_life_sec': half_life[present],
+        'deviation_skew': skew[present],
+        'deviation_kurtosis': kurtosis[present],
+        'jarque_bera_pvalue': pvalue[present],
+        'stat_samples': samples[present].astype(np.int64),
+    }).fill_nan(None)
+
+
+def deviation_statistics(aligned: pl.DataFrame, spec: StatsSpec = StatsSpec()) -> Optional[Dict[str, Any]]:
+    """
+    Statistics of one aligned pair series (see pair_statistics).
+
+    Returns:
+        Dict of STAT_COLUMNS, or None if the series has no finite deviation
+    """
+    stacked = aligned.select([pl.lit(0, dtype=pl.UInt32).alias('pair_id'), 'timestamp', 'deviation'])
+    stats = pair_statistics(stacked, spec)
+    if stats.is_empty():
+        return None
+    row = stats.row(0, named=True)
+    row.pop('pair_id')
+    return row
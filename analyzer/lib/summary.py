@@ -0,0 +1,418 @@
+"""
+Mergeable summary of a pair's deviation series.
+
+A DeviationSummary holds everything the pair metrics are derived from -
+counts, exact sum, min/max, first/last timestamps, boundary signs, zero
+crossings and, per threshold, the cycle counter with its boundary state.
+Summaries of consecutive, non-overlapping pieces of the aligned series merge
+into exactly the summary of the whole series, so long ranges can be
+processed in time chunks with bounded memory.
+"""
+
+import math
+from dataclasses import dataclass, field, replace, asdict
+from datetime import datetime, timedelta
+from typing import Optional, List, Tuple, Dict, Any
+
+import numpy as np
+import polars as pl
+
+
+# exact_sum scale: every finite float64 is an integer multiple of 2^-1074
+_EXACT_SHIFT = 1074 + 53
+_MANTISSA_SCALE = float(2 ** 53)
+
+
+def exact_sum(values: np.ndarray) -> int:
+    """
+    Exact sum of finite float64 values, as an integer scaled by 2^1127.
+
+    Integer sums add associatively, so summing chunks and adding the results
+    gives the same value as summing the whole series - unlike float sums,
+    whose rounding depends on the order of additions.
+
+    Args:
+        values: Finite float64 values
+
+    Returns:
+        Sum * 2^1127 as a Python int (convert with exact_sum_to_float)
+    """
+    return exact_sums(values, np.zeros(len(values), dtype=np.int64), 1)[0]
+
+
+def exact_sums(values: np.ndarray, groups: np.ndarray, n_groups: int) -> List[int]:
+    """
+    exact_sum of every group of values in one pass.
+
+    Args:
+        values: Finite float64 values
+        groups: Group index of each value (0 <= group < n_groups)
+        n_groups: Number of groups
+
+    Returns:
+        Per-group sums * 2^1127 as Python ints (0 for empty groups)
+    """
+    totals = [0] * n_groups
+    if len(values) == 0:
+        return totals
+    mantissa, exponent = np.frexp(values)
+    digits = (mantissa * _MANTISSA_SCALE).astype(np.int64)  # values = digits * 2^(exponent - 53)
+    high = digits >> 26
+    low = digits - (high << 26)
+    # Per-(group, exponent) sums of 27/26-bit parts stay exact in float64 below 2^26 rows
+    base = int(exponent.min())
+    width = int(exponent.max()) - base + 1
+    index = groups.astype(np.int64) * width + (exponent - base)
+    for start in range(0, len(values), 1 << 26):
+        part = slice(start, start + (1 << 26))
+        high_sums = np.bincount(index[part], weights=high[part])
+        low_sums = np.bincount(index[part], weights=low[part])
+        for k in np.flatnonzero((high_sums != 0) | (low_sums != 0)):
+            group, shift = divmod(int(k), width)
+            totals[group] += ((int(high_sums[k]) << 26) + int(low_sums[k])) << (shift + base - 53 + _EXACT_SHIFT)
+    return totals
+
+
+def exact_value(value: float) -> int:
+    """exact_sum of a single finite value, without numpy (for per-quote updates)."""
+    mantissa, exponent = math.frexp(value)
+    return int(mantissa * _MANTISSA_SCALE) << (exponent - 53 + _EXACT_SHIFT)
+
+
+def exact_sum_to_float(total: int) -> float:
+    """Correctly rounded float value of an exact_sum result."""
+    return total / (1 << _EXACT_SHIFT)
+
+
+def threshold_label(threshold: float) -> str:
+    """
+    Metric key suffix of a threshold in %: 0.4 -> '040bp', 0.125 -> '012p5bp'.
+    """
+    bp = round(threshold * 100, 6)
+    if bp == int(bp):
+        return f"{int(bp):03d}bp"
+    whole, fraction = f"{bp:.6f}".rstrip('0').split('.')
+    return f"{int(whole):03d}p{fraction}bp"
+
+
+def threshold_event(above: pl.Expr, neutral: pl.Expr) -> pl.Expr:
+    """Cycle event per row: above threshold (1) takes precedence over neutral (-1); other rows null."""
+    return pl.when(above).then(1).when(neutral).then(-1)
+
+
+def complete_cycles(above: pl.Expr, neutral: pl.Expr) -> pl.Expr:
+    """
+    Number of complete cycles, as one vectorized expression.
+
+    Same result as the count_complete_cycles state machine: a neutral row
+    completes a cycle exactly when the latest event before it is "above".
+    Forward-filling the events carries that state across rows with neither.
+    """
+    event = threshold_event(above, neutral)
+    return ((event == -1) & (event.forward_fill().shift(1) == 1)).sum()
+
+
+def duration_hours(start, end) -> float:
+    """Hours between two timestamps (datetimes, or Int64 epoch microseconds in compact mode)."""
+    delta = end - start
+    if isinstance(delta, timedelta):
+        return delta.total_seconds() / 3600
+    return delta / 3_600_000_000
+
+
+@dataclass
+class ThresholdState:
+    """Cycle state of one threshold over a piece of the series."""
+
+    above: int = 0        # rows with |deviation| > threshold
+    cycles: int = 0       # complete cycles, counted from a "not above" start
+    first_event: int = 0  # first above (1) / neutral (-1) row of the piece, 0 if none
+    last_event: int = 0   # last above (1) / neutral (-1) row of the piece, 0 if none
+
+    def merge(self, other: 'ThresholdState') -> 'ThresholdState':
+        # A piece entered while "above" completes one more cycle if its first event is neutral
+        carried = 1 if self.last_event == 1 and other.first_event == -1 else 0
+        return ThresholdState(
+            above=self.above + other.above,
+            cycles=self.cycles + other.cycles + carried,
+            first_event=self.first_event or other.first_event,
+            last_event=other.last_event or self.last_event
+        )
+
+
+@dataclass
+class DeviationSummary:
+    """
+    Mergeable state of a deviation series (rows in time order).
+
+    Rows with a null deviation (no ex2 quote yet) count towards rows and
+    the time range, but not towards the value statistics - as in the
+    in-memory analysis.
+    """
+
+    thresholds: Tuple[float, ...]
+    zero_threshold: float
+    rows: int = 0
+    valid: int = 0
+    total: int = 0             # exact_sum of finite deviations
+    special_total: float = 0.0  # sum of non-finite deviations (inf/nan)
+    min: Optional[float] = None
+    max: Optional[float] = None
+    first_ts: Any = None
+    last_ts: Any = None
+    first_sign: Optional[float] = None
+    last_sign: Optional[float] = None
+    crossings: int = 0
+    last_deviation: Optional[float] = None
+    levels: List[ThresholdState] = field(default_factory=list)
+
+    @classmethod
+    def empty(cls, thresholds: List[float], zero_threshold: float) -> 'DeviationSummary':
+        """Identity element of merge()."""
+        return cls(tuple(thresholds), zero_threshold, levels=[ThresholdState() for _ in thresholds])
+
+    def merge(self, other: 'DeviationSummary') -> 'DeviationSummary':
+        """
+        Summary of this piece followed by `other` (which must start after it ends).
+
+        Raises:
+            ValueError: If the summaries were built with different thresholds
+        """
+        if (self.thresholds, self.zero_threshold) != (other.thresholds, other.zero_threshold):
+            raise ValueError("Cannot merge summaries built with different thresholds")
+        if other.rows == 0:
+            return self
+        if self.rows == 0:
+            return other
+
+        # Zero crossing across the boundary: last row here, first row there
+        boundary = 0
+        if self.last_sign is not None and other.first_sign is not None and self.last_sign * other.first_sign < 0:
+            boundary = 1
+
+        return replace(
+            self,
+            rows=self.rows + other.rows,
+            valid=self.valid + other.valid,
+            total=self.total + other.total,
+            special_total=self.special_total + other.special_total,
+            min=_combine(min, self.min, other.min),
+            max=_combine(max, self.max, other.max),
+            last_ts=other.last_ts,
+            last_sign=other.last_sign,
+            crossings=self.crossings + other.crossings + boundary,
+            last_deviation=other.last_deviation,
+            levels=[a.merge(b) for a, b in zip(self.levels, other.levels)]
+        )
+
+    def without_values(self) -> 'DeviationSummary':
+        """
+        The same rows with every deviation null.
+
+        Used for rows aligned with a quote carried over from before the
+        analysis window: when that quote is not part of the window, those
+        rows have no ex2 price, exactly as in the in-memory path.
+        """
+        empty = DeviationSummary.empty(list(self.thresholds), self.zero_threshold)
+        return replace(empty, rows=self.rows, first_ts=self.first_ts, last_ts=self.last_ts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form (see from_dict)."""
+        data = asdict(self)
+        data['thresholds'] = list(self.thresholds)
+        data['total'] = hex(self.total)
+        data['first_ts'] = encode_ts(self.first_ts)
+        data['last_ts'] = encode_ts(self.last_ts)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DeviationSummary':
+        """Rebuild a summary written by to_dict."""
+        return cls(**{
+            **data,
+            'thresholds': tuple(data['thresholds']),
+            'total': int(data['total'], 16),
+            'first_ts': decode_ts(data['first_ts']),
+            'last_ts': decode_ts(data['last_ts']),
+            'levels': [ThresholdState(**level) for level in data['levels']]
+        })
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Mean of the non-null deviations."""
+        if self.valid == 0:
+            return None
+        return (exact_sum_to_float(self.total) + self.special_total) / self.valid
+
+    def to_metrics(self) -> Optional[Dict[str, Any]]:
+        """
+        Pair metrics (see analyze_pair_fast), or None if the series is empty
+        or ends without a deviation.
+        """
+        if self.rows == 0 or self.valid == 0 or self.last_deviation is None:
+            return None
+
+        hours = duration_hours(self.first_ts, self.last_ts)
+        zero_crossings_per_hour = self.crossings / hours if hours > 0 else 0
+        zero_crossings_per_minute = zero_crossings_per_hour / 60 if hours > 0 else 0
+
+        threshold_stats = {}
+        for threshold, level in zip(self.thresholds, self.levels):
+            label = threshold_label(threshold)
+            pct = level.above / self.valid * 100
+            threshold_stats.update({
+                f'opportunity_cycles_{label}': level.cycles,
+                f'cycles_{label}_per_hour': level.cycles / hours if hours > 0 else 0,
+                f'pct_time_above_{label}': pct,
+                f'avg_cycle_duration_{label}_sec': (hours * pct / 100 * 3600) / level.cycles if level.cycles > 0 else 0,
+                f'pattern_break_{label}': abs(self.last_deviation) > threshold
+            })
+
+        return {
+            'max_deviation_pct': float(self.max),
+            'min_deviation_pct': float(self.min),
+            'deviation_asymmetry': self.mean,
+            'zero_crossings': self.crossings,
+            'zero_crossings_per_hour': zero_crossings_per_hour,
+            'zero_crossings_per_minute': zero_crossings_per_minute,
+            **threshold_stats,
+            'data_points': self.rows,
+            'duration_hours': hours
+        }
+
+
+def encode_ts(value):
+    """Datetimes as ISO strings; epoch integers (compact mode) and None unchanged."""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def decode_ts(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _combine(fn, a, b):
+    """Apply min/max to two optional values."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return fn(a, b)
+
+
+def summarize_deviation(
+    aligned: pl.DataFrame,
+    thresholds: List[float],
+    zero_threshold: float
+) -> DeviationSummary:
+    """
+    Summarize one piece of an aligned pair series.
+
+    Args:
+        aligned: Frame with timestamp and deviation (%) columns, in time order
+        thresholds: Profitability thresholds in %
+        zero_threshold: Neutral zone threshold in %
+
+    Returns:
+        DeviationSummary of the piece
+    """
+    return summarize_deviations(aligned, ['deviation'], thresholds, zero_threshold)['deviation']
+
+
+def summarize_deviations(
+    aligned: pl.DataFrame,
+    columns: List[str],
+    thresholds: List[float],
+    zero_threshold: float
+) -> Dict[str, DeviationSummary]:
+    """
+    Summarize several deviation series that share one timeline.
+
+    All columns are reduced in the same select, so N series cost one
+    parallel pass over the frame rather than N.
+
+    Args:
+        aligned: Frame with timestamp and the deviation (%) columns, in time order
+        columns: Deviation columns to summarize
+        thresholds: Profitability thresholds in %
+        zero_threshold: Neutral zone threshold in %
+
+    Returns:
+        Column -> DeviationSummary of the piece
+    """
+    if aligned.is_empty():
+        return {column: DeviationSummary.empty(thresholds, zero_threshold) for column in columns}
+
+    exprs = [
+        pl.len().alias('rows'),
+        pl.col('timestamp').first().alias('first_ts'),
+        pl.col('timestamp').last().alias('last_ts'),
+    ]
+    for column in columns:
+        exprs += _summary_exprs(pl.col(column), f'{column}.', thresholds, zero_threshold)
+    stats = aligned.select(exprs).row(0, named=True)
+
+    summaries = {}
+    for column in columns:
+        def stat(key):
+            return stats[f'{column}.{key}']
+
+        levels = [
+            ThresholdState(
+                above=stat(f'above_{i}'),
+                cycles=stat(f'cycles_{i}'),
+                first_event=stat(f'first_event_{i}') or 0,
+                last_event=stat(f'last_event_{i}') or 0
+            )
+            for i in range(len(thresholds))
+        ]
+
+        values = aligned[column].drop_nulls().to_numpy()
+        finite = np.isfinite(values)
+        summaries[column] = DeviationSummary(
+            thresholds=tuple(thresholds),
+            zero_threshold=zero_threshold,
+            rows=stats['rows'],
+            valid=stat('valid'),
+            total=exact_sum(values[finite]),
+            special_total=float(values[~finite].sum()),
+            min=stat('min'),
+            max=stat('max'),
+            first_ts=stats['first_ts'],
+            last_ts=stats['last_ts'],
+            first_sign=stat('first_sign'),
+            last_sign=stat('last_sign'),
+            crossings=stat('crossings'),
+            last_deviation=stat('last_deviation'),
+            levels=levels
+        )
+    return summaries
+
+
+def _summary_exprs(deviation: pl.Expr, prefix: str, thresholds: List[float], zero_threshold: float) -> List[pl.Expr]:
+    """Aggregations of one deviation series, aliased with `prefix`."""
+    sign = deviation.sign()
+    abs_deviation = deviation.abs()
+    neutral = abs_deviation < zero_threshold
+
+    exprs = [
+        deviation.count().alias('valid'),
+        deviation.min().alias('min'),
+        deviation.max().alias('max'),
+        sign.first().alias('first_sign'),
+        sign.last().alias('last_sign'),
+        # sign[i] * sign[i-1] < 0 only for a true sign flip (not a touch of 0.0)
+        (sign * sign.shift(1) < 0).sum().alias('crossings'),
+        deviation.last().alias('last_deviation'),
+    ]
+    # Every threshold's counters are columns of the same select: one parallel
+    # pass over the series, no per-row Python
+    for i, threshold in enumerate(thresholds):
+        above = abs_deviation > threshold
+        event = threshold_event(above, neutral).drop_nulls()
+        exprs += [
+            above.sum().alias(f'above_{i}'),
+            complete_cycles(above, neutral).alias(f'cycles_{i}'),
+            event.first().alias(f'first_event_{i}'),
+            event.last().alias(f'last_event_{i}'),
+        ]
+    return [expr.name.prefix(prefix) for expr in exprs]
@@ -0,0 +1,160 @@
+"""
+Persistent per-(symbol, day) pair summaries for incremental runs.
+
+For every closed day a symbol was analyzed on, the store keeps one JSON
+record with, per exchange pair, the day's DeviationSummary split in two:
+
+- head: ex1 rows before ex2's first quote of the day. They are aligned with
+  the last ex2 quote of an earlier day (the carry), so the record notes
+  which carry quote was used.
+- body: all later rows, which depend on the day's own data only.
+
+plus the fingerprint of each exchange's source files and each exchange's
+last quote of the day (the carry into the next day). A multi-day report
+merges these records instead of re-reading raw quotes; a day is recomputed
+only when its files changed or it was summarized with a different carry.
+"""
+
+import os
+import threading
+import json
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Dict, Tuple, Any, List
+
+from .summary import DeviationSummary, encode_ts, decode_ts
+
+
+# Bump when the record layout or the summary semantics change
+STORE_FORMAT_VERSION = 1
+
+Quote = Tuple[Any, float]  # (timestamp, bestBid) - last quote of an exchange
+
+
+@dataclass
+class PairDay:
+    """One exchange pair's summary parts for one day."""
+
+    carry: Optional[Quote]    # ex2 quote the head was aligned with (None = no earlier quote)
+    head: DeviationSummary
+    body: DeviationSummary
+
+
+@dataclass
+class DayRecord:
+    """All pair summaries of a symbol for one day."""
+
+    fingerprints: Dict[str, str]                  # exchange -> source_fingerprint of its day files
+    last_quotes: Dict[str, Quote] = field(default_factory=dict)
+    pairs: Dict[Tuple[str, str], PairDay] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'version': STORE_FORMAT_VERSION,
+            'fingerprints': self.fingerprints,
+            'last_quotes': {ex: _encode_quote(q) for ex, q in self.last_quotes.items()},
+            'pairs': [
+                {
+                    'ex1': ex1,
+                    'ex2': ex2,
+                    'carry': _encode_quote(part.carry),
+                    'head': part.head.to_dict(),
+                    'body': part.body.to_dict()
+                }
+                for (ex1, ex2), part in self.pairs.items()
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DayRecord':
+        return cls(
+            fingerprints=data['fingerprints'],
+            last_quotes={ex: _decode_quote(q) for ex, q in data['last_quotes'].items()},
+            pairs={
+                (p['ex1'], p['ex2']): PairDay(
+                    _decode_quote(p['carry']),
+                    DeviationSummary.from_dict(p['head']),
+                    DeviationSummary.from_dict(p['body'])
+                )
+                for p in data['pairs']
+            }
+        )
+
+
+def _encode_quote(quote: Optional[Quote]):
+    return None if quote is None else [encode_ts(quote[0]), quote[1]]
+
+
+def _decode_quote(value) -> Optional[Quote]:
+    return None if value is None else (decode_ts(value[0]), value[1])
+
+
+def settings_key(**settings) -> str:
+    """Digest of every setting that changes the summaries (thresholds, resolution, dtypes...)."""
+    payload = json.dumps({'version': STORE_FORMAT_VERSION, **settings}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+class SummaryStore:
+    """
+    Directory of DayRecord JSON files: <store>/<settings key>/<symbol>/<date>.json
+
+    Each worker writes the records of the symbol it analyzes, so processes
+    never write the same file; records are written to a temporary file and
+    renamed into place.
+    """
+
+    def __init__(self, store_dir: str, key: str):
+        """
+        Args:
+            store_dir: Root directory of the store
+            key: settings_key() of the run; records of other settings are never read
+        """
+        self.root = Path(store_dir) / key
+
+    def _record_path(self, symbol: str, date: str) -> Path:
+        return self.root / symbol.replace('/', '_') / f"{date}.json"
+
+    def get(self, symbol: str, date: str, fingerprints: Dict[str, str]) -> Optional[DayRecord]:
+        """
+        Stored record of (symbol, date), if its source files are unchanged.
+
+        Args:
+            symbol: Canonical symbol name
+            date: Day (YYYY-MM-DD)
+            fingerprints: Current exchange -> source_fingerprint of the day's files
+
+        Returns:
+            DayRecord, or None if missing, unreadable or stale
+        """
+        try:
+            with open(self._record_path(symbol, date), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != STORE_FORMAT_VERSION or data['fingerprints'] != fingerprints:
+                return None
+            return DayRecord.from_dict(data)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def put(self, symbol: str, date: str, record: DayRecord) -> None:
+        """Write a record (errors are ignored: the store is an optimization)."""
+        path = self._record_path(symbol, date)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            os.makedirs(path.parent, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(record.to_dict(), f)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+    def dates(self, symbol: str) -> List[str]:
+        """Days with a stored record for the symbol."""
+        directory = self.root / symbol.replace('/', '_')
+        if not directory.exists():
+            return []
+        return sorted(p.stem for p in directory.glob("*.json"))
@@ -0,0 +1,120 @@
+"""
+Threshold x neutral-zone grid sweep over one aligned deviation series.
+
+For a neutral-zone width z, the series splits into excursions: the rows
+from one neutral row (|deviation| < z) up to the next. A complete cycle at
+threshold t >= z is exactly an excursion that reaches |deviation| > t and
+is closed by a later neutral row - the count_complete_cycles state machine
+counts one cycle per such excursion. So per width, one pass computes the
+maximum of every closed excursion, and the cycle counts of all thresholds
+are read from the sorted maxima with a binary search. Time above a
+threshold does not depend on z and comes from the sorted |deviation|.
+
+Grid points with t < z (a row can be above and "neutral" at once; above
+wins) are computed with the cycle expression of summarize_deviation.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Tuple
+
+import numpy as np
+import polars as pl
+
+from .summary import complete_cycles, duration_hours
+
+
+@dataclass(frozen=True)
+class SweepGrid:
+    """Entry thresholds x neutral-zone widths, in %."""
+
+    thresholds: Tuple[float, ...]
+    zero_thresholds: Tuple[float, ...]
+
+    @property
+    def size(self) -> int:
+        return len(self.thresholds) * len(self.zero_thresholds)
+
+
+def parse_grid(values: List[str]) -> Tuple[float, ...]:
+    """
+    Parse grid values: plain numbers and inclusive ranges "start:stop:step".
+
+    Example: ["0.1:0.5:0.1", "0.75"] -> (0.1, 0.2, 0.3, 0.4, 0.5, 0.75)
+
+    Raises:
+        ValueError: If a value is not a number or a valid range
+    """
+    points = []
+    for value in values:
+        parts = str(value).split(':')
+        if len(parts) == 1:
+            points.append(float(parts[0]))
+            continue
+        if len(parts) != 3:
+            raise ValueError(f"Expected a number or start:stop:step, got: {value}")
+        start, stop, step = (float(p) for p in parts)
+        if step <= 0 or stop < start:
+            raise ValueError(f"Expected start <= stop and a positive step, got: {value}")
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        points.extend(round(start + i * step, 10) for i in range(count))
+    return tuple(sorted(set(points)))
+
+
+def sweep_deviation(aligned: pl.DataFrame, grid: SweepGrid) -> Optional[pl.DataFrame]:
+    """
+    Cycle and time-above metrics of every grid point, from one aligned series.
+
+    The values equal what summarize_deviation(...).to_metrics() reports for
+    each (threshold, zero_threshold) configuration.
+
+    Args:
+        aligned: Frame with timestamp and deviation (%) columns, in time order
+        grid: Thresholds x neutral-zone widths
+
+    Returns:
+        Long-format frame, one row per grid point: threshold, zero_threshold,
+        cycles, cycles_per_hour, pct_time_above, avg_cycle_duration_sec;
+        None if the series has no valid deviation
+    """
+    deviation = aligned['deviation']
+    is_null = deviation.is_null().to_numpy()
+    # NaN compares above every threshold and is never neutral, as +inf does;
+    # nulls never raise an excursion maximum
+    magnitude = deviation.abs().fill_nan(np.inf).fill_null(-np.inf).to_numpy()
+    valid = np.sort(magnitude[~is_null])
+    if len(valid) == 0:
+        return None
+
+    hours = duration_hours(aligned['timestamp'][0], aligned['timestamp'][-1])
+    thresholds = np.asarray(grid.thresholds, dtype=np.float64)
+    pct_above = (len(valid) - np.searchsorted(valid, thresholds, side='right')) / len(valid) * 100
+
+    rows: Dict[str, list] = {key: [] for key in ('threshold', 'zero_threshold', 'cycles', 'pct_time_above')}
+    for zero in grid.zero_thresholds:
+        starts = np.flatnonzero((magnitude < zero) & ~is_null)
+        if len(starts):
+            # Excursion k spans [starts[k-1], starts[k]) (the first one starts at row 0);
+            # the last excursion is never closed by a neutral row
+            bounds = np.concatenate(([0], starts)) if starts[0] > 0 else starts
+            maxima = np.sort(np.maximum.reduceat(magnitude, bounds)[:len(bounds) - 1])
+        else:
+            maxima = np.empty(0)
+        cycles = len(maxima) - np.searchsorted(maxima, thresholds, side='right')
+
+        for i, threshold in enumerate(grid.thresholds):
+            count = int(cycles[i])
+            if threshold < zero:
+                abs_deviation = pl.col('deviation').abs()
+                count = aligned.select(complete_cycles(abs_deviation > threshold, abs_deviation < zero)).item()
+            rows['threshold'].append(threshold)
+            rows['zero_threshold'].append(zero)
+            rows['cycles'].append(count)
+            rows['pct_time_above'].append(float(pct_above[i]))
+
+    # Same formulas and operation order as DeviationSummary.to_metrics
+    cycles = np.asarray(rows['cycles'], dtype=np.float64)
+    pct = np.asarray(rows['pct_time_above'])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rows['cycles_per_hour'] = cycles / hours if hours > 0 else np.zeros(len(cycles))
+        rows['avg_cycle_duration_sec'] = np.where(cycles > 0, (hours * pct / 100 * 3600) / cycles, 0.0)
+    return pl.DataFrame(rows)
@@ -0,0 +1,232 @@
+"""
+Time window parsing and partition pruning helpers.
+
+A TimeWindow is a half-open interval [start, end) of naive UTC datetimes,
+built from CLI/config bounds that may be plain dates or full datetimes.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, date, timedelta, timezone
+from typing import Optional, Union, Tuple, List
+
+import polars as pl
+
+
+TimeBound = Union[str, date, datetime, None]
+
+_DATETIME_FORMATS = (
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%d %H',
+)
+
+_DURATION_UNITS = {
+    'ms': 'milliseconds',
+    's': 'seconds',
+    'm': 'minutes',
+    'h': 'hours',
+    'd': 'days',
+}
+
+
+def parse_time_bound(value: TimeBound, is_end: bool = False) -> Optional[datetime]:
+    """
+    Parse a start/end bound into a naive datetime.
+
+    A plain date (YYYY-MM-DD) covers the whole day: as a start it means
+    00:00 of that day, as an end it means 00:00 of the NEXT day (exclusive),
+    which keeps the historical inclusive --end-date semantics. Full datetimes
+    ("2025-11-03 08:00", "2025-11-03T08:00:00") are used as-is.
+
+    Args:
+        value: Bound as string, date or datetime (None = unbounded)
+        is_end: True for the end bound
+
+    Returns:
+        Naive datetime, or None if value is None/empty
+
+    Raises:
+        ValueError: If the string is not a recognised date/datetime
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        day = datetime(value.year, value.month, value.day)
+        return day + timedelta(days=1) if is_end else day
+
+    text = str(value).strip().replace('T', ' ')
+    if text.endswith('Z'):
+        text = text[:-1]
+
+    try:
+        day = datetime.strptime(text, '%Y-%m-%d')
+        return day + timedelta(days=1) if is_end else day
+    except ValueError:
+        pass
+
+    for fmt in _DATETIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+
+    raise ValueError(f"Expected YYYY-MM-DD or 'YYYY-MM-DD HH:MM[:SS]', got: {value}")
+
+
+def parse_duration(value: str) -> timedelta:
+    """
+    Parse a duration such as "30m", "6h", "2d", "90s" or "100ms".
+
+    Raises:
+        ValueError: If the string is not a recognised duration
+    """
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*(ms|[smhd])\s*', value.lower())
+    if not match:
+        raise ValueError(f"Expected a duration like 100ms, 30m, 6h or 2d, got: {value}")
+    return timedelta(**{_DURATION_UNITS[match.group(2)]: float(match.group(1))})
+
+
+def today_utc() -> str:
+    """Current UTC date (YYYY-MM-DD) - the day the collector is still writing."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+
+def is_closed_day(date_str: str, today: Optional[str] = None) -> bool:
+    """True if the date= partition is complete (strictly before today, UTC)."""
+    return date_str < (today or today_utc())
+
+
+@dataclass(frozen=True)
+class TimeWindow:
+    """Half-open time window [start, end); None means unbounded on that side."""
+
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+    @classmethod
+    def from_bounds(cls, start: TimeBound = None, end: TimeBound = None) -> 'TimeWindow':
+        """Build a window from date or datetime bounds (see parse_time_bound)."""
+        return cls(parse_time_bound(start), parse_time_bound(end, is_end=True))
+
+    @classmethod
+    def last(cls, duration: Union[str, timedelta], now: Optional[datetime] = None) -> 'TimeWindow':
+        """Window covering the last `duration` up to `now` (default: current UTC time)."""
+        if isinstance(duration, str):
+            duration = parse_duration(duration)
+        if now is None:
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return cls(now - duration, None)
+
+    @property
+    def is_bounded(self) -> bool:
+        return self.start is not None or self.end is not None
+
+    def date_range(self) -> Tuple[Optional[str], Optional[str]]:
+        """Inclusive (start_date, end_date) strings of the date= partitions to read."""
+        start_date = self.start.strftime('%Y-%m-%d') if self.start else None
+        end_date = None
+        if self.end is not None:
+            # end is exclusive: midnight belongs to the previous day
+            end_date = (self.end - timedelta(microseconds=1)).strftime('%Y-%m-%d')
+        return start_date, end_date
+
+    def contains_date(self, date_str: str) -> bool:
+        """True if the date= partition overlaps the window."""
+        start_date, end_date = self.date_range()
+        return (not start_date or date_str >= start_date) and (not end_date or date_str <= end_date)
+
+    def overlaps(self, lo: Optional[datetime], hi: Optional[datetime]) -> bool:
+        """
+        True if the closed interval [lo, hi] overlaps the window.
+
+        Unknown bounds (None) are treated as overlapping.
+        """
+        if self.start is not None and hi is not None and hi < self.start:
+            return False
+        if self.end is not None and lo is not None and lo >= self.end:
+            return False
+        return True
+
+    def contains_hour(self, date_str: str, hour_str: str) -> bool:
+        """True if the hour= partition [HH:00, HH+1:00) overlaps the window."""
+        try:
+            hour_start = datetime.strptime(date_str, '%Y-%m-%d') + timedelta(hours=int(hour_str))
+        except ValueError:
+            return True
+        return self.overlaps(hour_start, hour_start + timedelta(hours=1) - timedelta(microseconds=1))
+
+    def covers_day(self, date_str: str) -> bool:
+        """True if the whole date= partition lies inside the window."""
+        day_start = datetime.strptime(date_str, '%Y-%m-%d')
+        return ((self.start is None or self.start <= day_start) and
+                (self.end is None or self.end >= day_start + timedelta(days=1)))
+
+    def predicate(self, column: str, dtype: pl.DataType = pl.Datetime('us')) -> Optional[pl.Expr]:
+        """
+        Polars filter expression for the window, typed to match `dtype`.
+
+        Passed to scan_parquet it is pushed into the scan, so row groups whose
+        timestamp statistics fall outside the window are never decoded.
+        """
+        if not self.is_bounded:
+            return None
+
+        time_zone = getattr(dtype, 'time_zone', None)
+        literal_type = pl.Datetime('us', time_zone) if isinstance(dtype, pl.Datetime) else pl.Datetime('us')
+
+        def literal(value: datetime) -> pl.Expr:
+            expr = pl.lit(value, dtype=pl.Datetime('us'))
+            if time_zone:
+                expr = expr.dt.replace_time_zone('UTC').dt.convert_time_zone(time_zone)
+            return expr.cast(literal_type)
+
+        expr = None
+        if self.start is not None:
+            expr = pl.col(column) >= literal(self.start)
+        if self.end is not None:
+            upper = pl.col(column) < literal(self.end)
+            expr = upper if expr is None else expr & upper
+        return expr
+
+    def chunks(self, step: timedelta, lo: datetime, hi: datetime) -> List['TimeWindow']:
+        """
+        Split the window, clipped to the data range [lo, hi), into consecutive chunks.
+
+        Chunk boundaries are aligned to multiples of `step` from midnight of
+        the first day, so day-sized chunks coincide with date= partitions.
+
+        Args:
+            step: Chunk length
+            lo: Start of the available data (used when the window has no start)
+            hi: End of the available data, exclusive (used when the window has no end)
+
+        Returns:
+            Consecutive, non-overlapping windows covering the clipped range
+        """
+        if step <= timedelta(0):
+            raise ValueError(f"Chunk length must be positive, got: {step}")
+        start = max(self.start, lo) if self.start is not None else lo
+        end = min(self.end, hi) if self.end is not None else hi
+
+        windows = []
+        boundary = datetime(start.year, start.month, start.day)
+        while boundary < end:
+            next_boundary = boundary + step
+            if next_boundary > start:
+                windows.append(TimeWindow(max(boundary, start), min(next_boundary, end)))
+            boundary = next_boundary
+        return windows
+
+    def describe(self) -> str:
+        """Human-readable form for log output."""
+        if self.start and self.end:
+            return f"{self.start} to {self.end} (end exclusive)"
+        if self.start:
+            return f"from {self.start} onwards"
+        if self.end:
+            return f"up to {self.end} (exclusive)"
+        return "all available data"
@@ -0,0 +1,128 @@
+"""
+Windowed pair metrics: time series of the summary counters.
+
+A pair's summary is one aggregate over the whole range, so a pair that
+reverted well early on but stopped since looks as good as one that still
+does. Here the row-level events of the aligned series (sign flips, cycle
+completions, rows above each threshold) are flagged once over the whole
+series, then counted per fixed or rolling time window with a single
+group_by_dynamic - one pass, however many windows overlap.
+
+Events belong to the window of the row where they happen, with the state
+carried from earlier rows: a cycle that opened before the window and
+closes inside it counts in that window. So the counts of fixed windows add
+up to the pair's summary counts.
+"""
+
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import List, Optional
+
+import numpy as np
+import polars as pl
+
+from .summary import threshold_event
+
+
+@dataclass(frozen=True)
+class WindowSpec:
+    """Windows starting every `every`, each `period` long (fixed windows: period == every)."""
+
+    every: timedelta
+    period: timedelta
+
+    @classmethod
+    def fixed(cls, every: timedelta) -> 'WindowSpec':
+        return cls(every, every)
+
+    @property
+    def rolling(self) -> bool:
+        return self.period != self.every
+
+
+def window_metrics(
+    aligned: pl.DataFrame,
+    spec: WindowSpec,
+    thresholds: Optional[List[float]] = None,
+    zero_threshold: float = 0.05
+) -> Optional[pl.DataFrame]:
+    """
+    Zero crossings, complete cycles and time above per window of one pair.
+
+    Windows are aligned to multiples of `every` and labelled by their
+    bounds; windows without a valid deviation are left out. Rates per hour
+    use the part of the window covered by the series (the full window
+    except at the ends of the range).
+
+    Args:
+        aligned: Frame with timestamp and deviation (%) columns, in time order
+        spec: Window length and step
+        thresholds: List of profitability thresholds in % (default: [0.3, 0.5, 0.4])
+        zero_threshold: Neutral zone threshold in % (default: 0.05)
+
+    Returns:
+        Long-format frame, one row per window and threshold: window_start,
+        window_end, threshold, data_points, zero_crossings,
+        zero_crossings_per_hour, cycles, cycles_per_hour, pct_time_above;
+        None if the series has no valid deviation
+    """
+    if thresholds is None:
+        thresholds = [0.3, 0.5, 0.4]
+    if aligned.is_empty():
+        return None
+
+    timestamp = pl.col('timestamp')
+    if aligned.schema['timestamp'] == pl.Int64:
+        timestamp = timestamp.cast(pl.Datetime('us'))  # compact mode: epoch microseconds
+    deviation = pl.col('deviation')
+    sign = deviation.sign()
+    abs_deviation = deviation.abs()
+    neutral = abs_deviation < zero_threshold
+
+    # Row-level flags over the whole series (same rules as summarize_deviation)
+    flags = [timestamp.alias('timestamp'), deviation, (sign * sign.shift(1) < 0).alias('crossing')]
+    for i, threshold in enumerate(thresholds):
+        above = abs_deviation > threshold
+        event = threshold_event(above, neutral)
+        flags += [
+            above.alias(f'above_{i}'),
+            ((event == -1) & (event.forward_fill().shift(1) == 1)).alias(f'completes_{i}'),
+        ]
+
+    stats = aligned.lazy().select(flags).group_by_dynamic(
+        'timestamp', every=spec.every, period=spec.period, closed='left', include_boundaries=True
+    ).agg([
+        pl.len().alias('rows'),
+        deviation.count().alias('valid'),
+        pl.col('crossing').sum().alias('crossings'),
+        *[pl.col(f'above_{i}').sum() for i in range(len(thresholds))],
+        *[pl.col(f'completes_{i}').sum().alias(f'cycles_{i}') for i in range(len(thresholds))],
+    ]).filter(pl.col('valid') > 0).collect()
+    if stats.is_empty():
+        return None
+
+    # Covered part of each window, in hours (numpy: see analyze_pairs on literal division)
+    first, last = aligned.select(timestamp.first().alias('first'), timestamp.last().alias('last')).row(0)
+    start = stats['_lower_boundary'].clip(lower_bound=first)
+    end = stats['_upper_boundary'].clip(upper_bound=last)
+    hours = (end - start).dt.total_microseconds().to_numpy() / 1e6 / 3600
+    positive = hours > 0
+    safe_hours = np.where(positive, hours, 1.0)
+    crossings = stats['crossings'].to_numpy()
+    valid = stats['valid'].to_numpy()
+
+    frames = []
+    for i, threshold in enumerate(thresholds):
+        cycles = stats[f'cycles_{i}'].to_numpy()
+        frames.append(pl.DataFrame({
+            'window_start': stats['_lower_boundary'],
+            'window_end': stats['_upper_boundary'],
+            'threshold': np.full(stats.height, threshold),
+            'data_points': stats['rows'],
+            'zero_crossings': stats['crossings'],
+            'zero_crossings_per_hour': np.where(positive, crossings / safe_hours, 0.0),
+            'cycles': stats[f'cycles_{i}'],
+            'cycles_per_hour': np.where(positive, cycles / safe_hours, 0.0),
+            'pct_time_above': stats[f'above_{i}'].to_numpy() / valid * 100,
+        }))
+    return pl.concat(frames).sort('window_start', maintain_order=True)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Query the cycle event store written by run_all_ultra.py --cycles.
+
+Every stored cycle has its pair, threshold, entry time, peak deviation and
+peak time, return-to-neutral time and duration. Queries read only the day
+partitions of the requested range; no market data is re-analyzed.
+"""
+
+from pathlib import Path
+
+import polars as pl
+
+from lib.config import load_config, get_default_config
+from lib.cycle_store import CycleStore
+from lib.timerange import TimeWindow
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Query stored arbitrage cycles",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # All 0.5% cycles shorter than 10 s in the last week
+  python query_cycles.py --threshold 0.5 --max-duration 10 --last 7d
+
+  # Cycles of one symbol on two exchanges, written to parquet
+  python query_cycles.py --symbol BTC/USDT --exchanges Binance Bybit --output btc_cycles.parquet
+        """
+    )
+    parser.add_argument("--start", type=str, default=None,
+                        help="Earliest entry time (YYYY-MM-DD or 'YYYY-MM-DD HH:MM[:SS]'), inclusive")
+    parser.add_argument("--end", type=str, default=None,
+                        help="Latest entry time: YYYY-MM-DD (whole day, inclusive) or a datetime (exclusive)")
+    parser.add_argument("--last", type=str, default=None,
+                        help="Only cycles entered within this recent window, e.g. 6h, 7d (UTC clock)")
+    parser.add_argument("--symbol", type=str, default=None,
+                        help="Symbol, e.g. BTC/USDT")
+    parser.add_argument("--exchanges", type=str, nargs='+', default=None,
+                        help="Only pairs of these exchanges")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="Threshold in %% (e.g. 0.5)")
+    parser.add_argument("--min-duration", type=float, default=None,
+                        help="Shortest cycle duration in seconds, inclusive")
+    parser.add_argument("--max-duration", type=float, default=None,
+                        help="Longest cycle duration in seconds, exclusive")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Write the matching cycles to this .parquet or .csv file")
+    parser.add_argument("--config", type=str, default=None,
+                        help="Path to config file (default: config.yaml in script directory)")
+
+    args = parser.parse_args()
+
+    try:
+        if args.config:
+            config = load_config(Path(args.config))
+        else:
+            config = load_config()
+    except FileNotFoundError:
+        print("WARNING: config.yaml not found, using defaults")
+        config = get_default_config()
+
+    start = args.start
+    if args.last:
+        try:
+            start = TimeWindow.last(args.last).start
+        except ValueError as e:
+            print(f"ERROR: Invalid --last value. {e}")
+            exit(1)
+
+    store = CycleStore(config.cycle_directory or str(Path(__file__).parent / "summary_stats" / "cycles"))
+    try:
+        cycles = store.query(
+            start=start,
+            end=args.end,
+            symbol=args.symbol,
+            exchanges=args.exchanges,
+            threshold=args.threshold,
+            min_duration=args.min_duration,
+            max_duration=args.max_duration
+        )
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        exit(1)
+
+    print(f"{cycles.height} cycles in {store.root}")
+    if cycles.is_empty():
+        exit(0)
+
+    if args.output:
+        if args.output.endswith('.csv'):
+            cycles.write_csv(args.output)
+        else:
+            cycles.write_parquet(args.output)
+        print(f"[OK] Saved to: {args.output}")
+    else:
+        with pl.Config(tbl_rows=20, tbl_cols=-1, tbl_width_chars=200):
+            print(cycles)
@@ -3,15 +3,50 @@
 ULTRA-FAST parallel analyzer with batch processing and advanced optimizations.
 
 Key optimizations:
-1. Batch by symbol - load data once, analyze all pairs
+1. Batch by symbol - load data once, align all exchanges in one query, analyze all pairs
 2. No subprocess - direct function calls
 3. Data caching in worker memory
 4. Single parquet scan - read all dates at once (2-4x faster I/O)
-5. Parallel exchange loading - ThreadPoolExecutor (1.5-2x faster)
+5. Parallel exchange loading - process-wide I/O pool with symbol read-ahead
 6. Pure Polars operations - zero-copy, no NumPy conversion (1.5-2x faster)
 7. Filter pushdown - filter nulls before sort (10-30% faster)
 8. Decimal → Float64 cast - 1.5-2x faster parsing
-9. Batch threshold calculation - all thresholds in one pass (1.3x faster)
+9. Batch threshold calculation - any number of thresholds, cycles included, in one
+   vectorized pass (no per-row Python loop)
+10. Partition manifest - discovery and file selection without tree walks
+11. Arrow IPC frame cache - unchanged closed days are memory-mapped, not re-decoded
+12. Metric-driven column projection - only the price columns the metrics use are read
+    and joined; optional compact mode (Float32 prices, Int64 timestamps)
+13. Streaming mode - long ranges processed in time chunks with mergeable pair
+    summaries; peak memory set by the chunk length, results identical
+14. Optional resampling - last quote per time bucket (e.g. 1s) before the pair join
+15. Incremental runs - per-day pair summaries of closed days are stored and merged;
+    only new or changed days are re-read
+16. Grid sweep - thresholds x neutral zones from one aligned series per pair
+17. Directional paths - bid/bid, ask/ask, bid1/ask2, bid2/ask1 metrics summarized
+    together in one pass over the same aligned frame
+18. Batched pair metrics - the small pairs of a worker's symbols are stacked into one
+    frame and analyzed with grouped expressions in a single query
+19. Window series - per-window crossings, cycles and time above (fixed or rolling)
+    from one pass of row flags and a single dynamic group_by per pair
+20. Cycle events - every complete cycle extracted by run-length grouping and kept in a
+    day-partitioned parquet store for fast queries (query_cycles.py)
+21. Batched statistics - ADF, OU half-life and moments of all batched pairs from
+    stacked least-squares sums on a regular grid, solved in one call
+22. Trade simulation - cycles replayed as trades at executable prices for a whole
+    threshold grid at once (running-maximum records + binary search), fee schedules
+    applied as one broadcast
+23. Size-aware scheduling - symbols costed from manifest row counts and handed out
+    largest first, small ones packed; the thread budget is split between worker
+    processes and Polars threads instead of oversubscribing the CPU
+24. Memory budget - footprints estimated from input rows; task groups wait until
+    they fit, oversized symbols are streamed; peak RSS per worker and task reported
+25. Thread executor - symbol groups on threads of one process sharing its Polars
+    pool, without worker startup or result pickling (--executor thread)
+26. Columnar results - each task group returns its pair outcomes, metrics and per-pair
+    frames as a few frames (Arrow IPC when pickled); the parent merges frames, not dicts
+27. Checkpoint and resume - with --journal, completed task groups are journaled as parquet
+    shards and the report is read back from the journal; --resume skips unchanged symbols
 
 Output metrics:
 - Zero crossings per minute (mean reversion frequency)
@@ -24,54 +59,188 @@ Expected speedup: 2-3x vs previous version, 30-60x vs naive implementation
 import os
 from pathlib import Path
 from itertools import combinations
-from multiprocessing import Pool, cpu_count
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from multiprocessing import get_context, cpu_count
+from multiprocessing.pool import ThreadPool
+from concurrent.futures import as_completed
 import polars as pl
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 # Import analyzer library modules
 from lib.config import load_config, get_default_config
-from lib.data_loader import load_exchange_symbol_data
-from lib.analysis import analyze_pair_fast
+from lib.data_loader import load_exchange_symbol_data, list_source_files, source_fingerprint, SourceFile
+from lib.analysis import (analyze_paths, align_exchanges, pair_deviation, pair_paths,
+                          required_price_columns, summarize_pair_chunk, last_quote, METRIC_COLUMNS)
+from lib.summary import DeviationSummary, threshold_label
+from lib.summary_store import SummaryStore, DayRecord, PairDay, settings_key
 from lib.discovery import discover_data
+from lib.manifest import load_manifest
+from lib.frame_cache import FrameCache
+from lib.timerange import TimeWindow, parse_time_bound, parse_duration, is_closed_day, today_utc
+from lib.prefetch import io_pool, prefetch, DEFAULT_IO_WORKERS, DEFAULT_READ_AHEAD
+from lib.scheduler import task_cost, plan_groups, split_threads
+from lib.memory import (MemoryBudget, WORKER_BASE_BYTES, symbol_footprint, loaded_bytes, batched_rows,
+                        group_footprint, source_span, low_memory_chunk, reset_peak_rss, current_rss,
+                        peak_rss, format_size, parse_size)
+from lib.sweep import SweepGrid, parse_grid, sweep_deviation
+from lib.batch import PairBatch
+from lib.stationarity import StatsSpec
+from lib.simulation import SimulationGrid, parse_fee_schedules, simulate_pair
+from lib.windows import WindowSpec, window_metrics
+from lib.cycles import extract_cycles
+from lib.cycle_store import CycleStore
+from lib.results import ResultCollector, pack_results, PAIR_KEY
+from lib.journal import RunJournal, JOURNAL_FORMAT_VERSION, symbol_key, prune_runs
 
 
-def analyze_symbol_batch(args):
+class SymbolTask(NamedTuple):
+    """Everything a worker needs to analyze all pairs of one symbol."""
+
+    symbol: str
+    exchanges: List[str]
+    data_path: str
+    start_date: Optional[str]
+    end_date: Optional[str]
+    thresholds: List[float]
+    zero_threshold: float
+    # Exchange -> selected source files (manifest); None = listed by the worker
+    files_by_exchange: Optional[Dict[str, List[SourceFile]]]
+    cache: Optional[FrameCache]
+    price_columns: List[str]
+    compact: bool
+    # Streaming chunk length; None = the whole range in memory
+    stream_chunk: Optional[timedelta]
+    resample: Optional[timedelta]
+    store: Optional[SummaryStore]
+    sweep: Optional[SweepGrid]
+    metrics: Tuple[str, ...]
+    windows: Optional[WindowSpec]
+    # Extract cycle events
+    cycles: bool
+    statistics: Optional[StatsSpec]
+    simulation: Optional[SimulationGrid]
+
+
+def analyze_symbol_group(group):
+    """
+    Analyze a group of symbols in one worker task, prefetching their data.
+
+    While one symbol's pairs are analyzed, the reads of the next `read_ahead`
+    symbols run on the process-wide I/O pool, so disk and CPU work overlap.
+
+    Args:
+        group: (list of SymbolTask, io_workers, read_ahead, track_rss);
+            track_rss measures the task's own peak RSS (process executor only: on
+            threads, the process high-water mark is shared by concurrent groups)
+
+    Returns:
+        ResultBatch of all pairs of the group (columnar, see lib.results), with
+        the task's peak RSS and the RSS it started with (bytes) and worker_pid
+    """
+    tasks, io_workers, read_ahead, track_rss = group
+    pool = io_pool(io_workers)
+    start = current_rss() if track_rss else None
+    if track_rss:
+        reset_peak_rss()
+    # Pairs of all symbols in the group are analyzed together, in batches of bounded size
+    batch = PairBatch(tasks[0].thresholds, tasks[0].zero_threshold, statistics=tasks[0].statistics)
+    results = []
+    for task, loads in prefetch(tasks, lambda task: submit_symbol_loads(pool, task), read_ahead):
+        results.extend(analyze_symbol_batch(task, loads, batch))
+        if batch.full:
+            resolve_pending(batch, results)
+    resolve_pending(batch, results)
+
+    # The peak of this task (its process's high-water mark where it cannot be reset)
+    return pack_results(results, peak_rss=peak_rss() if track_rss else None, start_rss=start,
+                        worker_pid=os.getpid())
+
+
+def resolve_pending(batch, results):
+    """Analyze the batched pairs and fill in their PENDING results."""
+    metrics = batch.analyze()
+    for result in results:
+        if result['status'] == 'PENDING':
+            result['stats'] = metrics.get((result['symbol'], result['ex1'], result['ex2']))
+            result['status'] = 'SUCCESS' if result['stats'] is not None else 'SKIPPED'
+
+
+def submit_symbol_loads(pool, task):
+    """
+    Submit the loads of every exchange of a symbol task to the I/O pool.
+
+    Returns:
+        Dict of future -> exchange, or None for streaming tasks (they load chunk by chunk)
+    """
+    if task.stream_chunk is not None:
+        return None
+    files_by_exchange = task.files_by_exchange
+    return {
+        pool.submit(
+            load_exchange_symbol_data, task.data_path, exchange, task.symbol, task.start_date, task.end_date,
+            files_by_exchange.get(exchange, []) if files_by_exchange is not None else None,
+            task.cache, task.price_columns, task.compact, task.resample
+        ): exchange
+        for exchange in task.exchanges
+    }
+
+
+def analyze_symbol_batch(task, loads=None, batch=None):
     """
     Analyze ALL pairs for a single symbol in one go.
     Loads data once, analyzes multiple pairs.
 
     This is the key optimization - prevents re-loading same data.
+
+    Args:
+        task: SymbolTask
+        loads: Already submitted loads (see submit_symbol_loads); None = submit them now
+        batch: PairBatch shared with other symbols; the pairs added to it are
+            returned as PENDING (see resolve_pending). None = analyze them here.
     """
-    symbol, exchanges, data_path, start_date, end_date, thresholds, zero_threshold = args
+    if task.stream_chunk is not None:
+        return analyze_symbol_streaming(task)
+
+    if batch is None:
+        own = PairBatch(task.thresholds, task.zero_threshold, statistics=task.statistics)
+        results = analyze_symbol_batch(task, loads, own)
+        resolve_pending(own, results)
+        return results
+
+    symbol, exchanges, price_columns = task.symbol, task.exchanges, task.price_columns
+    thresholds, zero_threshold, metrics = task.thresholds, task.zero_threshold, task.metrics
+    sweep, windows, cycles, statistics, simulation = (task.sweep, task.windows, task.cycles, task.statistics,
+                                                      task.simulation)
 
     # OPTIMIZATION #12: Parallel loading of exchanges (1.5-2x faster)
-    # Load data for all exchanges in parallel using ThreadPoolExecutor
-    exchange_data = {}
+    # Exchanges are loaded in parallel on the process-wide I/O pool
+    if loads is None:
+        loads = submit_symbol_loads(io_pool(), task)
 
-    with ThreadPoolExecutor(max_workers=len(exchanges)) as executor:
-        # Submit all loading tasks
-        future_to_exchange = {
-            executor.submit(load_exchange_symbol_data, data_path, exchange, symbol, start_date, end_date): exchange
-            for exchange in exchanges
-        }
+    exchange_data = {}
+    for future in as_completed(loads):
+        exchange = loads[future]
+        try:
+            data = future.result()
+            if data is not None and not data.is_empty():
+                exchange_data[exchange] = data
+        except Exception:
+            pass
 
-        # Collect results as they complete
-        for future in as_completed(future_to_exchange):
-            exchange = future_to_exchange[future]
-            try:
-                data = future.result()
-                if data is not None and not data.is_empty():
-                    exchange_data[exchange] = data
-            except Exception:
-                pass
+    # Align all exchanges in one query; each pair is then a column ratio
+    aligned = None
+    if len(exchange_data) >= 2:
+        try:
+            aligned = align_exchanges(exchange_data, price_columns)
+        except Exception as e:
+            print(f"Error in align_exchanges ({symbol}): {e}")
 
     # Now analyze all pairs
     results = []
     exchange_pairs = list(combinations(sorted(exchanges), 2))
 
     for ex1, ex2 in exchange_pairs:
-        if ex1 not in exchange_data or ex2 not in exchange_data:
+        if aligned is None or ex1 not in exchange_data or ex2 not in exchange_data:
             results.append({
                 'symbol': symbol,
                 'ex1': ex1,
@@ -81,22 +250,40 @@ def analyze_symbol_batch(args):
             })
             continue
 
-        # Data already loaded - just analyze
-        stats = analyze_pair_fast(
-            symbol, ex1, ex2,
-            exchange_data[ex1],
-            exchange_data[ex2],
-            thresholds,
-            zero_threshold
-        )
+        # Data already aligned - just analyze
+        paths = pair_paths(aligned, ex1, ex2) if 'paths' in metrics or simulation is not None else None
+        if 'paths' in metrics:
+            # All four paths in one pass; bid_bid is the regular deviation
+            deviation = paths.select(['timestamp', pl.col('bid_bid').alias('deviation')])
+            stats = analyze_paths(paths, thresholds, zero_threshold)
+            if stats is not None and statistics is not None:
+                # Statistics from the batch's stacked regressions, with the other pairs
+                batch.add_statistics((symbol, ex1, ex2), deviation, stats)
+                stats, status = None, 'PENDING'
+            else:
+                status = 'SUCCESS' if stats is not None else 'SKIPPED'
+        else:
+            # Metrics come from the batched query (see resolve_pending)
+            deviation = pair_deviation(aligned, ex1, ex2)
+            batch.add((symbol, ex1, ex2), deviation)
+            stats, status = None, 'PENDING'
 
-        if stats is not None:
+        if status != 'SKIPPED':
             results.append({
                 'symbol': symbol,
                 'ex1': ex1,
                 'ex2': ex2,
-                'status': 'SUCCESS',
-                'stats': stats
+                'status': status,
+                'stats': stats,
+                # Grid sweep, window series and cycle events from the same deviation
+                # series as the pair metrics
+                'sweep': sweep_deviation(deviation, sweep) if sweep is not None else None,
+                'windows': window_metrics(deviation, windows, thresholds, zero_threshold)
+                if windows is not None else None,
+                'cycles': extract_cycles(deviation, thresholds, zero_threshold) if cycles else None,
+                # Trades priced at the executable bid/ask paths of the same rows
+                'simulation': simulate_pair(paths, ex1, ex2, simulation, zero_threshold)
+                if simulation is not None else None
             })
         else:
             results.append({
@@ -110,6 +297,149 @@ def analyze_symbol_batch(args):
     return results
 
 
+def analyze_symbol_streaming(task):
+    """
+    Analyze all pairs of a symbol in time chunks (bounded memory).
+
+    Each chunk loads every exchange for that slice only. Per pair, the chunk
+    is summarized as a head (rows before ex2's first quote in the chunk,
+    aligned with ex2's last quote of earlier chunks) and a body, and both are
+    merged into the running DeviationSummary, so the metrics are identical
+    to the in-memory path while peak memory depends on the chunk length, not
+    on the range length.
+
+    With a SummaryStore, day chunks of closed days are taken from the store
+    when their source files are unchanged; only new or changed days are
+    loaded and summarized.
+    """
+    symbol, exchanges, data_path, start_date, end_date = (task.symbol, task.exchanges, task.data_path,
+                                                          task.start_date, task.end_date)
+    thresholds, zero_threshold, files_by_exchange = task.thresholds, task.zero_threshold, task.files_by_exchange
+    cache, price_columns, compact, resample = task.cache, task.price_columns, task.compact, task.resample
+    stream_chunk, store = task.stream_chunk, task.store
+
+    if thresholds is None:
+        thresholds = [0.3, 0.5, 0.4]
+    if files_by_exchange is None:
+        files_by_exchange = {
+            exchange: list_source_files(data_path, exchange, symbol, start_date, end_date)
+            for exchange in exchanges
+        }
+
+    exchange_pairs = list(combinations(sorted(exchanges), 2))
+    summaries = {pair: DeviationSummary.empty(thresholds, zero_threshold) for pair in exchange_pairs}
+    carry = {}  # exchange -> (timestamp, bestBid) of its last quote in earlier chunks
+    days_reused = 0
+    days_computed = 0
+
+    dates = [f.date for files in files_by_exchange.values() for f in files if f.date is not None]
+    chunks = []
+    if dates:
+        chunks = TimeWindow.from_bounds(start_date, end_date).chunks(
+            stream_chunk,
+            datetime.strptime(min(dates), '%Y-%m-%d'),
+            datetime.strptime(max(dates), '%Y-%m-%d') + timedelta(days=1)
+        )
+
+    pool = io_pool()
+    for chunk in chunks:
+        chunk_files = {
+            exchange: [f for f in files_by_exchange.get(exchange, []) if f.date is None or chunk.contains_date(f.date)]
+            for exchange in exchanges
+        }
+
+        # Only whole, closed days with dated files are stored
+        day = None
+        fingerprints = {}
+        midnight = datetime(chunk.start.year, chunk.start.month, chunk.start.day)
+        if store is not None and chunk.start == midnight and chunk.end == midnight + timedelta(days=1) \
+                and all(f.date for files in chunk_files.values() for f in files):
+            day = chunk.start.strftime('%Y-%m-%d')
+            if is_closed_day(day):
+                fingerprints = {
+                    exchange: source_fingerprint(files) for exchange, files in chunk_files.items() if files
+                }
+            else:
+                day = None
+
+        record = store.get(symbol, day, fingerprints) if day is not None else None
+        # A head summarized with another carry quote has other values: recompute the day
+        if record is not None and any(
+            carry.get(ex2) is not None and part.carry != carry.get(ex2)
+            for (ex1, ex2), part in record.pairs.items()
+        ):
+            record = None
+
+        if record is not None:
+            days_reused += 1
+        else:
+            record = summarize_chunk(
+                pool, symbol, exchanges, exchange_pairs, data_path, chunk, chunk_files, carry,
+                thresholds, zero_threshold, cache, price_columns, compact, resample
+            )
+            record.fingerprints = fingerprints
+            if day is not None:
+                store.put(symbol, day, record)
+                days_computed += 1
+
+        for pair, part in record.pairs.items():
+            # Rows before the first ex2 quote of the range have no deviation
+            head = part.head if carry.get(pair[1]) is not None else part.head.without_values()
+            summaries[pair] = summaries[pair].merge(head).merge(part.body)
+        carry.update(record.last_quotes)
+
+    results = []
+    for ex1, ex2 in exchange_pairs:
+        # Same rule as the in-memory path: both exchanges need data in the range
+        stats = summaries[(ex1, ex2)].to_metrics() if ex1 in carry and ex2 in carry else None
+        results.append({
+            'symbol': symbol,
+            'ex1': ex1,
+            'ex2': ex2,
+            'status': 'SUCCESS' if stats is not None else 'SKIPPED',
+            'stats': stats
+        })
+    # Store statistics travel with the symbol's first pair
+    if results:
+        results[0].update(days_reused=days_reused, days_computed=days_computed)
+    return results
+
+
+def summarize_chunk(pool, symbol, exchanges, exchange_pairs, data_path, chunk, chunk_files, carry,
+                    thresholds, zero_threshold, cache, price_columns, compact, resample):
+    """
+    Load one chunk of every exchange and summarize each pair (see summarize_pair_chunk).
+
+    Returns:
+        DayRecord with the pair summaries and each exchange's last quote in the chunk
+    """
+    future_to_exchange = {
+        pool.submit(
+            load_exchange_symbol_data, data_path, exchange, symbol, chunk.start, chunk.end,
+            chunk_files[exchange], cache, price_columns, compact, resample
+        ): exchange
+        for exchange in exchanges
+    }
+    chunk_data = {}
+    for future in as_completed(future_to_exchange):
+        try:
+            data = future.result()
+            if data is not None and not data.is_empty():
+                chunk_data[future_to_exchange[future]] = data
+        except Exception:
+            pass
+
+    record = DayRecord(fingerprints={})
+    for ex1, ex2 in exchange_pairs:
+        data1 = chunk_data.get(ex1)
+        if data1 is None:
+            continue
+        head, body = summarize_pair_chunk(data1, chunk_data.get(ex2), carry.get(ex2), thresholds, zero_threshold)
+        record.pairs[(ex1, ex2)] = PairDay(carry.get(ex2), head, body)
+    record.last_quotes = {exchange: last_quote(data) for exchange, data in chunk_data.items()}
+    return record
+
+
 def run_ultra_fast_analysis(
     data_path,
     exchanges_filter=None,
@@ -117,7 +447,29 @@ def run_ultra_fast_analysis(
     start_date=None,
     end_date=None,
     thresholds=None,
-    zero_threshold=0.05
+    zero_threshold=0.05,
+    use_manifest=True,
+    manifest_dir=None,
+    cache_dir=None,
+    cache_max_bytes=None,
+    compact=False,
+    stream_chunk=None,
+    resample=None,
+    summary_dir=None,
+    io_workers=None,
+    read_ahead=None,
+    sweep=None,
+    metrics=None,
+    windows=None,
+    cycle_dir=None,
+    statistics=None,
+    simulation=None,
+    threads=None,
+    max_memory=None,
+    executor='process',
+    journal_dir=None,
+    resume=None,
+    journal_keep_runs=10
 ):
     """
     ULTRA-FAST analysis with batching and caching.
@@ -125,13 +477,67 @@ def run_ultra_fast_analysis(
     Args:
         data_path: Path to the market data directory.
         exchanges_filter: A list of exchanges to filter by.
-        n_workers: Number of parallel workers (default: 3x CPU cores)
-        start_date: Start date filter (YYYY-MM-DD format), inclusive. If None, no start filter.
-        end_date: End date filter (YYYY-MM-DD format), inclusive. If None, no end filter.
-        thresholds: List of analysis thresholds (default: [0.3, 0.5, 0.4])
+        n_workers: Number of worker processes (default: chosen with the thread budget)
+        start_date: Start bound, inclusive: YYYY-MM-DD or a full datetime. If None, no start filter.
+        end_date: End bound: YYYY-MM-DD (whole day, inclusive) or a datetime (exclusive).
+            If None, no end filter.
+        thresholds: List of analysis thresholds, any number (default: [0.3, 0.5, 0.4]);
+            the last one is the primary threshold of the console rankings
         zero_threshold: Neutral zone threshold (default: 0.05)
+        use_manifest: Answer discovery and file selection from the partition manifest
+        manifest_dir: Manifest location (default: <data_path>/_manifest)
+        cache_dir: Arrow IPC frame cache directory (None = cache disabled)
+        cache_max_bytes: Frame cache size budget in bytes
+        compact: Load Float32 prices and Int64 timestamps (about half the worker memory)
+        stream_chunk: Process each symbol in time chunks of this length (timedelta);
+            None = load the whole range at once
+        resample: Bucket length as a duration string (e.g. "1s"); each exchange is
+            reduced to its last quote per bucket before the pair join. None = tick level.
+        summary_dir: Summary store directory for incremental runs (requires a 1-day
+            stream_chunk); closed days with unchanged files are merged from stored
+            per-day pair summaries instead of being re-read. None = store disabled.
+        io_workers: Concurrent reads per worker process (process-wide I/O pool)
+        read_ahead: Symbols whose data is read ahead while the current one is analyzed
+        sweep: SweepGrid of thresholds x neutral-zone widths; every pair is also
+            evaluated at each grid point and written to sweep_<timestamp>.csv
+            (in-memory path only). None = no sweep.
+        metrics: Metric families (keys of METRIC_COLUMNS); 'paths' adds the ask/ask,
+            bid1/ask2 and bid2/ask1 metric sets as prefixed columns (in-memory path
+            only). The bid/bid 'deviation' metrics are always computed.
+        windows: WindowSpec; every pair's zero crossings, cycles and time above are
+            also reported per fixed or rolling window and written to
+            windows_<timestamp>.parquet (in-memory path only). None = no windows.
+        cycle_dir: CycleStore directory; every complete cycle of every pair is
+            extracted (entry, peak, exit, duration) and added to the store
+            (in-memory path only). None = cycles are only counted.
+        statistics: StatsSpec; adds ADF statistic, OU half-life, skewness, excess
+            kurtosis and Jarque-Bera p-value columns, computed for all pairs of a
+            batch together on a regular grid (in-memory path only). None = off.
+        simulation: SimulationGrid of entry thresholds x fee schedules; every pair's
+            cycles are replayed as trades at executable bid/ask prices and written
+            to simulation_<timestamp>.csv (loads asks; in-memory path only). None = off.
+        threads: Total thread budget split between worker processes and Polars
+            threads per process (default: CPU count)
+        max_memory: Memory budget in bytes; task groups are started only while
+            their estimated footprints fit, and a symbol too large to fit alone
+            is analyzed in streaming chunks (summary metrics only: the run is
+            refused if sweep, windows, cycles, statistics, simulation or paths
+            are requested). None = no budget.
+        executor: 'process' runs symbol groups on a spawned process pool (one
+            Polars pool per process, results pickled back); 'thread' runs them
+            on threads of this process, sharing its Polars thread pool - no
+            worker startup or result transfer, best for small runs
+        journal_dir: Run journal directory; every completed task group is written
+            to <journal_dir>/<run id> as it finishes and the report is read back
+            from it. None = results are kept in memory only.
+        resume: Run id to continue: symbols journaled with unchanged inputs and
+            settings are not analyzed again (requires journal_dir)
+        journal_keep_runs: Run journals kept in journal_dir (oldest deleted first)
     """
     DATA_PATH = data_path
+    if thresholds is None:
+        thresholds = [0.3, 0.5, 0.4]
+    primary = threshold_label(thresholds[-1])
 
     # Print date filter info
     if start_date or end_date:
@@ -144,8 +550,18 @@ def run_ultra_fast_analysis(
     else:
         print("\n>>> Analyzing ALL available data <<<")
 
+    # Refresh the partition manifest once; workers receive explicit file lists
+    manifest = None
+    if use_manifest and Path(DATA_PATH).exists():
+        manifest = load_manifest(DATA_PATH, manifest_dir)
+
+    cache = None
+    if cache_dir:
+        cache = FrameCache(cache_dir, cache_max_bytes or 10 * 1024 ** 3)
+        cache.evict()
+
     # Discover symbols
-    symbols_to_analyze = discover_data(DATA_PATH)
+    symbols_to_analyze = discover_data(DATA_PATH, manifest)
 
     # DEBUG: Print some symbols to check formats
     print("\n--- Sample symbols found ---")
@@ -178,64 +594,286 @@ def run_ultra_fast_analysis(
 
     print("\n--- Preparing Symbol Batches ---")
 
+    # Load only the price columns the computed metrics read
+    metrics = tuple(metrics or ('deviation',))
+    # The simulation prices trades at the executable paths: asks are loaded too
+    price_columns = required_price_columns(list(metrics) + (['paths'] if simulation is not None else []))
+    if 'paths' in metrics:
+        print("Paths: bid/bid, ask/ask, bid1/ask2, bid2/ask1 (prefixed columns)")
+    print(f"Loaded columns: timestamp, {', '.join(price_columns)}"
+          f"{' (compact: Float32/Int64)' if compact else ''}")
+    if stream_chunk is not None:
+        print(f"Streaming mode: chunks of {stream_chunk}")
+    resample_every = parse_duration(resample) if resample else None
+    resolution = resample if resample else 'tick'
+    print(f"Resolution: {resolution}")
+    if sweep is not None:
+        print(f"Sweep: {len(sweep.thresholds)} thresholds x {len(sweep.zero_thresholds)} neutral zones "
+              f"= {sweep.size} grid points per pair")
+    if windows is not None:
+        if windows.rolling:
+            print(f"Windows: rolling {windows.period}, every {windows.every}")
+        else:
+            print(f"Windows: fixed {windows.every}")
+    if cycle_dir is not None:
+        print(f"Cycle events: stored in {cycle_dir}")
+    if simulation is not None:
+        print(f"Simulation: {len(simulation.thresholds)} thresholds x {len(simulation.schedules)} fee schedules "
+              f"({', '.join(schedule.name for schedule in simulation.schedules)}), "
+              f"slippage {simulation.slippage_pct}% per fill")
+    if statistics is not None:
+        print(f"Statistics: ADF({statistics.lags} lags), half-life, skew/kurtosis on a {statistics.every} grid")
+
+    store = None
+    if summary_dir:
+        store = SummaryStore(summary_dir, settings_key(
+            thresholds=thresholds,
+            zero_threshold=zero_threshold,
+            price_columns=price_columns,
+            compact=compact,
+            resample=resample
+        ))
+        print(f"Incremental mode: per-day summaries in {store.root}")
+
     # Create tasks (one per SYMBOL, not per pair)
     tasks = []
+    costs = []
     total_pairs = 0
 
     for symbol, exchanges in symbols_to_analyze.items():
         n_pairs = len(list(combinations(exchanges, 2)))
         total_pairs += n_pairs
-        tasks.append((symbol, list(exchanges), DATA_PATH, start_date, end_date, thresholds, zero_threshold))
+        files_by_exchange = None
+        if manifest is not None:
+            files_by_exchange = {
+                exchange: manifest.select_sources(exchange, symbol, start_date, end_date)
+                for exchange in exchanges
+            }
+        tasks.append(SymbolTask(
+            symbol, list(exchanges), DATA_PATH, start_date, end_date, thresholds, zero_threshold,
+            files_by_exchange, cache, price_columns, compact, stream_chunk, resample_every, store, sweep,
+            metrics, windows, cycle_dir is not None, statistics, simulation
+        ))
+        # Without a manifest the input sizes are unknown: weigh by loads + pairs
+        cost = task_cost(files_by_exchange, n_pairs)
+        costs.append(cost if cost is not None else len(exchanges) + n_pairs)
 
     print(f"Total symbols: {len(tasks)}")
     print(f"Total pairs: {total_pairs}")
 
-    # Determine workers
-    if n_workers is None:
-        n_workers = cpu_count() * 3
-
-    print(f"Using {n_workers} parallel workers")
+    # Split the thread budget between processes and Polars threads, then hand
+    # the symbols out largest first, packing small ones into groups
+    budget = threads or cpu_count()
+    total_cost = sum(costs)
+    # Every worker process has its own baseline: a memory budget caps their number,
+    # and the thread split is made for the processes that fit
+    max_processes = None
+    if max_memory is not None and manifest is not None and executor == 'process':
+        max_processes = max(1, int(max_memory // (WORKER_BASE_BYTES * 2)))
+    if executor == 'thread':
+        # Polars is already running here: its one pool is shared by all groups,
+        # and as many groups run at once as the budget has threads
+        n_workers = n_workers or min(budget, len(tasks))
+        polars_threads = pl.thread_pool_size()
+        print(f"Using {n_workers} threads in this process, sharing {polars_threads} Polars threads")
+    else:
+        n_workers, polars_threads = split_threads(costs, budget, n_workers, max_processes)
+        if max_processes is not None and n_workers == max_processes < budget:
+            print(f"Memory budget: at most {max_processes} worker processes")
+        print(f"Using {n_workers} parallel workers x {polars_threads} Polars threads (budget {budget} threads)")
     print(f"Batch processing: {total_pairs / len(tasks):.1f} pairs per symbol (avg)")
+
+    io_workers = io_workers or DEFAULT_IO_WORKERS
+    read_ahead = DEFAULT_READ_AHEAD if read_ahead is None else read_ahead
+
+    # Memory footprints are estimated from the input (manifest row counts). With
+    # a budget, symbols that cannot fit even alone go to the streaming path in
+    # smaller chunks, and task groups wait until their footprints fit
+    memory_budget = None
+    task_budget = None
+    footprints = {}
+    routed, unrouted = [], []
+    # Stream chunks start at midnight: buckets stay whole only if they divide a day
+    routable = resample_every is None or timedelta(days=1) % resample_every == timedelta(0)
+    if max_memory is not None:
+        if manifest is None:
+            print("WARNING: --max-memory needs the partition manifest for input sizes; not enforced")
+        else:
+            # Every worker process has its own baseline (their number is already
+            # capped by the budget); threads share this one
+            processes = n_workers if executor == 'process' else 1
+            if executor == 'thread' and WORKER_BASE_BYTES * 2 > max_memory:
+                n_workers = 1
+                print("Memory budget: reduced to 1 thread")
+            task_budget = max_memory - processes * WORKER_BASE_BYTES
+            memory_budget = MemoryBudget(task_budget, n_workers)
+    if manifest is not None:
+        for i, task in enumerate(tasks):
+            files_by_exchange, task_chunk = task.files_by_exchange, task.stream_chunk
+            footprint = symbol_footprint(files_by_exchange, len(price_columns), compact)
+            loaded = loaded_bytes(files_by_exchange, len(price_columns), compact)
+            batched = batched_rows(files_by_exchange)
+            span = source_span(files_by_exchange)
+            if task_budget is not None and task_chunk is None and footprint > task_budget and span is not None:
+                if routable:
+                    task_chunk = low_memory_chunk(footprint, task_budget / n_workers, span, resample_every)
+                    tasks[i] = task._replace(stream_chunk=task_chunk)
+                    routed.append((task.symbol, footprint, task_chunk))
+                else:
+                    unrouted.append((task.symbol, footprint))
+            if task_chunk is not None:
+                # Streaming holds one chunk at a time, reads nothing ahead and batches nothing
+                footprint = footprint * min(1.0, task_chunk / span) if span else footprint
+                loaded = batched = 0.0
+            footprints[task.symbol] = (footprint, loaded, batched)
+    if memory_budget is not None:
+        print(f"Memory budget: {format_size(max_memory)} ({format_size(task_budget)} for tasks after "
+              f"{processes} worker baselines); largest symbol estimated at "
+              f"{format_size(max(footprint for footprint, _, _ in footprints.values()))}")
+        for symbol, footprint, task_chunk in routed:
+            print(f"  {symbol}: estimated {format_size(footprint)}, too large for the budget - "
+                  f"low-memory path (streaming chunks of {task_chunk})")
+        for symbol, footprint in unrouted:
+            print(f"WARNING: {symbol}: estimated {format_size(footprint)}, too large for the budget, but "
+                  f"--resample {resample} does not divide a day - analyzed in memory, alone")
+        if routed and (sweep or windows or cycle_dir or statistics or simulation or 'paths' in metrics):
+            # Streaming has no whole aligned series: these symbols would get partial rows
+            print("ERROR: the low-memory path computes the summary metrics only; --sweep, --window, "
+                  "--cycles, --stats, --simulate and --metrics paths cannot be combined with symbols "
+                  "too large for --max-memory. Raise the budget or drop these options")
+            return
+
+    # Completed task groups are journaled as they finish; a resumed run appends
+    # to the same journal and skips the symbols it already holds
+    journal = None
+    if journal_dir:
+        if resume:
+            journal = RunJournal(journal_dir, resume)
+            if not journal.exists():
+                print(f"ERROR: No run journal {resume} in {journal_dir}")
+                return
+        else:
+            journal = RunJournal.create(journal_dir)
+            prune_runs(journal_dir, journal_keep_runs, journal.run_id)
+        print(f"Run journal: {journal.root} (continue with --resume {journal.run_id})")
+
+    # A symbol's journal entry counts while its settings and source files are unchanged
+    symbol_keys = {}
+    resumed_pairs = 0
+    if journal is not None:
+        run_settings = settings_key(
+            journal=JOURNAL_FORMAT_VERSION, thresholds=thresholds, zero_threshold=zero_threshold,
+            price_columns=price_columns, compact=compact, resample=resample, start_date=start_date,
+            end_date=end_date, sweep=sweep, metrics=metrics, windows=windows, cycles=cycle_dir is not None,
+            statistics=statistics, simulation=simulation
+        )
+        for task in tasks:
+            files_by_exchange = task.files_by_exchange
+            if files_by_exchange is None:
+                files_by_exchange = {exchange: list_source_files(DATA_PATH, exchange, task.symbol, start_date, end_date)
+                                     for exchange in task.exchanges}
+            symbol_keys[task.symbol] = symbol_key(settings_key(settings=run_settings, stream_chunk=task.stream_chunk),
+                                              files_by_exchange)
+        if resume:
+            done = journal.completed(symbol_keys)
+            remaining = [i for i, task in enumerate(tasks) if task.symbol not in done]
+            resumed_pairs = total_pairs - sum(len(list(combinations(tasks[i].exchanges, 2))) for i in remaining)
+            print(f"Resume: {len(tasks) - len(remaining)} symbols ({resumed_pairs} pairs) already in the journal "
+                  f"with unchanged inputs, {len(remaining)} to analyze")
+            tasks = [tasks[i] for i in remaining]
+            costs = [costs[i] for i in remaining]
+
+    plan = plan_groups(costs, n_workers)
+    groups = [([tasks[i] for i in indices], io_workers, read_ahead, executor == 'process') for indices in plan]
+    print(f"I/O: {io_workers} reader threads per worker, read-ahead {read_ahead} symbols")
+    if groups:
+        print(f"Schedule: {len(groups)} tasks, largest first (largest symbol "
+              f"{max(costs) / total_cost * 100:.0f}% of the estimated work"
+              f"{'' if manifest is not None else ', sizes unknown without manifest'}), "
+              f"up to {max(len(indices) for indices in plan)} symbols per task")
     print(f"\n--- Starting ULTRA-FAST Analysis ---\n")
 
     # Process in parallel
     successful = 0
     skipped = 0
     errors = 0
-    all_stats = []
-
-    processed_pairs = 0
-
-    with Pool(processes=n_workers) as pool:
-        # Process by SYMBOL batches
-        results_batches = pool.imap_unordered(analyze_symbol_batch, tasks, chunksize=1)
-
-        for batch_results in results_batches:
-            for result in batch_results:
-                processed_pairs += 1
-                symbol = result['symbol']
-                ex1 = result['ex1']
-                ex2 = result['ex2']
-                status = result['status']
-
-                if status == "SUCCESS":
-                    print(f"[{processed_pairs}/{total_pairs}] OK {symbol} ({ex1} vs {ex2})")
-                    successful += 1
-
-                    if result['stats']:
-                        all_stats.append({
-                            'symbol': symbol,
-                            'exchange1': ex1,
-                            'exchange2': ex2,
-                            **result['stats']
-                        })
+    # Workers send columnar batches; the parent keeps frames, not per-pair objects
+    collected = ResultCollector()
+    processed_pairs = resumed_pairs
+    days_reused = 0
+    days_computed = 0
+
+    # Spawn (the Windows default) everywhere: the parent has already used Polars
+    # for the manifest, and forking a process with a live Polars thread pool deadlocks
+    if executor == 'thread' or not groups:
+        # Same Pool interface on threads: loaded data and results stay in this process
+        # (and nothing to spawn workers for when every symbol was resumed)
+        pool = ThreadPool(processes=n_workers)
+    else:
+        # Workers read POLARS_MAX_THREADS when they import Polars at spawn
+        previous_threads = os.environ.get('POLARS_MAX_THREADS')
+        os.environ['POLARS_MAX_THREADS'] = str(polars_threads)
+        try:
+            pool = get_context('spawn').Pool(processes=n_workers)
+        finally:
+            if previous_threads is None:
+                del os.environ['POLARS_MAX_THREADS']
+            else:
+                os.environ['POLARS_MAX_THREADS'] = previous_threads
+
+    # Estimated footprint of each group (keyed by its first symbol, for the summary)
+    group_footprints = []
+    group_estimates = {}
+    if footprints:
+        for group_tasks, _, _, _ in groups:
+            estimates = list(zip(*(footprints[task.symbol] for task in group_tasks)))
+            group_footprints.append(group_footprint(*estimates, read_ahead))
+            group_estimates[group_tasks[0].symbol] = group_footprints[-1]
+
+    task_peaks = []  # (worker pid, peak RSS, start RSS, symbols, estimated footprint) per task
+    try:
+        with pool:
+            # Groups are dispatched in order: the largest symbols start first
+            if memory_budget is not None:
+                results_batches = memory_budget.run(pool, analyze_symbol_group, groups, group_footprints)
+            else:
+                results_batches = pool.imap_unordered(analyze_symbol_group, groups, chunksize=1)
+
+            for batch in results_batches:
+                if batch.pairs.height:
+                    symbols = batch.symbols
+                    task_peaks.append((batch.worker_pid, batch.peak_rss, batch.start_rss, symbols,
+                                       group_estimates.get(symbols[0])))
+                if journal is not None:
+                    journal.record(batch, symbol_keys)
                 else:
-                    skipped += 1
+                    collected.add(batch)
+                days_reused += batch.pairs['days_reused'].sum()
+                days_computed += batch.pairs['days_computed'].sum()
+                for symbol, ex1, ex2, status in batch.pairs.select(PAIR_KEY + ['status']).iter_rows():
+                    processed_pairs += 1
+                    if status == "SUCCESS":
+                        print(f"[{processed_pairs}/{total_pairs}] OK {symbol} ({ex1} vs {ex2})")
+                        successful += 1
+                    else:
+                        skipped += 1
+    except BaseException:
+        # Crash or Ctrl-C: the groups that finished are already on disk
+        if journal is not None:
+            print(f"\nRun interrupted; completed symbols are journaled. Continue with: --resume {journal.run_id}")
+        raise
+
+    if journal is not None:
+        # The report covers this run and the resumed symbols, read back from the journal
+        collected = journal.collect(symbol_keys)
+        statuses = collected.pairs()['status']
+        successful = int((statuses == 'SUCCESS').sum())
+        skipped = statuses.len() - successful
 
     # Save statistics
-    if all_stats:
-        # Use Polars instead of pandas (faster, no extra dependency)
-        stats_df = pl.DataFrame(all_stats)
+    stats_df = collected.stats()
+    if stats_df is not None:
+        stats_df = stats_df.with_columns(pl.lit(resolution).alias('resolution'))
         # Sort by zero_crossings_per_minute (MOST IMPORTANT for mean reversion)
         stats_df = stats_df.sort('zero_crossings_per_minute', descending=True)
 
@@ -250,31 +888,77 @@ def run_ultra_fast_analysis(
 
         print(f"\n[OK] Summary statistics saved to: {stats_filename}")
 
+        sweep_df = collected.frame('sweep')
+        if sweep_df is not None:
+            # Long format: one row per pair and grid point (plot cycles vs threshold per neutral zone)
+            sweep_filename = save_dir / f"sweep_{timestamp}.csv"
+            sweep_df.with_columns(pl.lit(resolution).alias('resolution')).write_csv(sweep_filename)
+            print(f"[OK] Sweep ({collected.frame_pairs['sweep']} pairs x {sweep.size} grid points) saved to: {sweep_filename}")
+
+        windows_df = collected.frame('windows')
+        if windows_df is not None:
+            # Long format: one row per pair, window and threshold; joins with the summary
+            # on symbol, exchange1, exchange2
+            windows_filename = save_dir / f"windows_{timestamp}.parquet"
+            windows_df.with_columns(pl.lit(resolution).alias('resolution')).write_parquet(windows_filename)
+            print(f"[OK] Window metrics ({collected.frame_pairs['windows']} pairs) saved to: {windows_filename}")
+
+        simulation_df = collected.frame('simulation')
+        if simulation_df is not None:
+            # Long format: one row per pair, threshold and fee schedule
+            simulation_df = simulation_df.with_columns(pl.lit(resolution).alias('resolution'))
+            simulation_filename = save_dir / f"simulation_{timestamp}.csv"
+            simulation_df.write_csv(simulation_filename)
+            print(f"[OK] Simulation ({collected.frame_pairs['simulation']} pairs x {simulation.size} grid points) "
+                  f"saved to: {simulation_filename}")
+
+            print(f"\n  Top 10 pair configurations by total net PnL (after fees and slippage):")
+            print(f"  {'Symbol':<12} {'Ex1':<8} {'Ex2':<8} {'Thresh':<7} {'Fees':<10} {'Trades':<7} "
+                  f"{'Net/trade%':<11} {'Hit%':<6} {'Total%':<8}")
+            print(f"  {'-'*82}")
+            best = simulation_df.filter(pl.col('trades') > 0).sort('total_net_pnl_pct', descending=True)
+            for row in best.head(10).iter_rows(named=True):
+                print(f"  {row['symbol']:<12} {row['exchange1']:<8} {row['exchange2']:<8} "
+                      f"{row['threshold']:>6.2f} {row['fee_schedule']:<10} {row['trades']:>6} "
+                      f"{row['avg_net_pnl_pct']:>10.4f} {row['hit_rate_pct']:>5.1f} "
+                      f"{row['total_net_pnl_pct']:>7.2f}")
+
+        cycle_events = collected.frame('cycles')
+        if cycle_events is not None:
+            cycle_events = cycle_events.select([
+                *PAIR_KEY,
+                pl.lit(resolution).alias('resolution'),
+                pl.lit(zero_threshold, dtype=pl.Float64).alias('zero_threshold'),
+                pl.exclude(PAIR_KEY)
+            ])
+            days = CycleStore(cycle_dir).write(cycle_events)
+            print(f"[OK] Cycle events ({cycle_events.height} cycles, {days} days) stored in: {cycle_dir}")
+
         print(f"\n  Top 10 pairs by mean reversion frequency (zero crossings/min):")
-        print(f"  {'Symbol':<12} {'Ex1':<8} {'Ex2':<8} {'ZC/min':<8} {'Cycles':<7} {'40bp/hr':<9} {'Asymm':<7}")
+        print(f"  {'Symbol':<12} {'Ex1':<8} {'Ex2':<8} {'ZC/min':<8} {'Cycles':<7} {primary + '/hr':<9} {'Asymm':<7}")
         print(f"  {'-'*82}")
         for row in stats_df.head(10).iter_rows(named=True):
             asymmetry = row.get('deviation_asymmetry', 0)
-            cycles_040bp = row.get('opportunity_cycles_040bp', 0)
+            cycles_primary = row.get(f'opportunity_cycles_{primary}', 0)
 
             print(f"  {row['symbol']:<12} {row['exchange1']:<8} {row['exchange2']:<8} "
                   f"{row.get('zero_crossings_per_minute', 0):>7.2f} "
-                  f"{cycles_040bp:>6.0f} "
-                  f"{row.get('cycles_040bp_per_hour', 0):>8.1f} "
+                  f"{cycles_primary:>6.0f} "
+                  f"{row.get(f'cycles_{primary}_per_hour', 0):>8.1f} "
                   f"{abs(asymmetry):>6.2f}")
 
         # Sort by opportunity cycles (complete round-trips with return to neutral)
-        cycles_sorted = stats_df.sort('opportunity_cycles_040bp', descending=True)
-        print(f"\n  Top 10 pairs by COMPLETE cycles (most tradeable opportunities):")
+        cycles_sorted = stats_df.sort(f'opportunity_cycles_{primary}', descending=True)
+        print(f"\n  Top 10 pairs by COMPLETE {primary} cycles (most tradeable opportunities):")
         print(f"  {'Symbol':<12} {'Ex1':<8} {'Ex2':<8} {'Cycles':<7} {'Per hr':<8} {'ZC/min':<8} {'Asymm':<7}")
         print(f"  {'-'*82}")
         for row in cycles_sorted.head(10).iter_rows(named=True):
             asymmetry = row.get('deviation_asymmetry', 0)
-            cycles_040bp = row.get('opportunity_cycles_040bp', 0)
+            cycles_primary = row.get(f'opportunity_cycles_{primary}', 0)
 
             print(f"  {row['symbol']:<12} {row['exchange1']:<8} {row['exchange2']:<8} "
-                  f"{cycles_040bp:>6.0f} "
-                  f"{row.get('cycles_040bp_per_hour', 0):>7.1f} "
+                  f"{cycles_primary:>6.0f} "
+                  f"{row.get(f'cycles_{primary}_per_hour', 0):>7.1f} "
                   f"{row.get('zero_crossings_per_minute', 0):>7.2f} "
                   f"{abs(asymmetry):>6.2f}")
 
@@ -283,6 +967,33 @@ def run_ultra_fast_analysis(
     print(f"[OK] Successful: {successful}")
     print(f"[ -] Skipped (no data): {skipped}")
     print(f"[!!] Errors: {errors}")
+    if store is not None:
+        print(f"Summary store: {days_reused} symbol-days reused, {days_computed} computed")
+
+    measured = [task for task in task_peaks if task[1] is not None]
+    if measured:
+        # Peak RSS per worker process and per task, for sizing machines
+        worker_peaks = {}
+        for pid, peak, _, _, _ in measured:
+            worker_peaks[pid] = max(worker_peaks.get(pid, 0), peak)
+        print(f"Peak RSS: {len(worker_peaks)} workers, max {format_size(max(worker_peaks.values()))}, "
+              f"mean {format_size(sum(worker_peaks.values()) / len(worker_peaks))}; "
+              f"{len(measured)} tasks, mean {format_size(sum(task[1] for task in measured) / len(measured))}")
+        # Start RSS: what the worker held when the task began (retained from earlier tasks);
+        # the estimate includes the idle worker baseline
+        print(f"  {'Task (symbols)':<40} {'Peak RSS':>10} {'Start RSS':>10} {'Estimate':>10}")
+        for pid, peak, start, symbols, estimate in sorted(measured, key=lambda task: task[1], reverse=True)[:5]:
+            label = ', '.join(symbols[:3]) + (f" +{len(symbols) - 3}" if len(symbols) > 3 else '')
+            print(f"  {label:<40} {format_size(peak):>10} "
+                  f"{format_size(start) if start is not None else '-':>10} "
+                  f"{format_size(estimate + WORKER_BASE_BYTES) if estimate is not None else '-':>10}")
+    if executor == 'thread' and peak_rss() is not None:
+        # Groups share this process: only its overall peak is meaningful
+        print(f"Peak RSS: {format_size(peak_rss())} (single process, all threads)")
+    if memory_budget is not None:
+        print(f"Memory budget: peak reserved {format_size(memory_budget.peak_reserved)} of "
+              f"{format_size(memory_budget.budget)}; {memory_budget.held_back} task groups held back, "
+              f"{len(routed)} symbols on the low-memory path")
 
 
 if __name__ == "__main__":
@@ -291,7 +1002,6 @@ if __name__ == "__main__":
     multiprocessing.freeze_support()
 
     import argparse
-    from datetime import date
 
     parser = argparse.ArgumentParser(
         description="ULTRA-FAST parallel ratio analyzer with batching",
@@ -313,9 +1023,19 @@ Examples:
   # Analyze up to a specific date
   python run_all_ultra.py --end-date 2025-11-02
 
+  # Analyze an intraday window (end is exclusive for datetimes)
+  python run_all_ultra.py --start "2025-11-03 08:00" --end "2025-11-03 12:00"
+
+  # Analyze the last 6 hours
+  python run_all_ultra.py --last 6h
+
   # Use more workers for faster processing
   python run_all_ultra.py --workers 16 --date 2025-11-03
 
+  # Checkpoint a long run, then continue it if interrupted (run id printed at start)
+  python run_all_ultra.py --journal --start 2025-10-01
+  python run_all_ultra.py --resume 20251103_140512 --start 2025-10-01
+
   # Use config file
   python run_all_ultra.py --config config.yaml
         """
@@ -325,19 +1045,94 @@ Examples:
     parser.add_argument("--exchanges", type=str, nargs='+', default=None,
                         help="List of exchanges to analyze (e.g., Binance Bybit OKX)")
     parser.add_argument("--workers", type=int, default=None,
-                        help="Number of parallel workers (default: 3x CPU cores)")
+                        help="Number of worker processes (default: chosen with the thread budget)")
+    parser.add_argument("--max-memory", type=str, default=None,
+                        help="Memory budget, e.g. 8G or 512M: task groups start only while their estimated "
+                             "footprints fit, symbols too large to fit alone are streamed in chunks "
+                             "(default: from config, no budget)")
+    parser.add_argument("--executor", type=str, default=None, choices=['process', 'thread'],
+                        help="Run symbol groups on a spawned process pool or on threads of this process "
+                             "(shared Polars pool, no worker startup or result pickling; best for small "
+                             "runs such as --today). Default: from config, process")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Total thread budget, split between worker processes and Polars threads "
+                             "per process (default: from config, CPU count)")
     parser.add_argument("--date", type=str, default=None,
                         help="Analyze data for a specific date (YYYY-MM-DD). Shortcut for --start-date=DATE --end-date=DATE")
-    parser.add_argument("--start-date", type=str, default=None,
-                        help="Start date for analysis (YYYY-MM-DD), inclusive")
-    parser.add_argument("--end-date", type=str, default=None,
-                        help="End date for analysis (YYYY-MM-DD), inclusive")
-    parser.add_argument("--thresholds", type=float, nargs=3, default=None,
-                        help="Analysis thresholds as percentages (default from config: 0.3 0.5 0.4)")
+    parser.add_argument("--start-date", "--start", dest="start_date", type=str, default=None,
+                        help="Start of analysis (YYYY-MM-DD or 'YYYY-MM-DD HH:MM[:SS]'), inclusive")
+    parser.add_argument("--end-date", "--end", dest="end_date", type=str, default=None,
+                        help="End of analysis: YYYY-MM-DD (whole day, inclusive) "
+                             "or 'YYYY-MM-DD HH:MM[:SS]' (exclusive)")
+    parser.add_argument("--last", type=str, default=None,
+                        help="Analyze the most recent window, e.g. 30m, 6h, 2d (UTC clock)")
+    parser.add_argument("--thresholds", type=float, nargs='+', default=None,
+                        help="Analysis thresholds as percentages, any number; the last one ranks the "
+                             "console summary (default from config: 0.3 0.5 0.4)")
     parser.add_argument("--today", action="store_true",
-                        help="Analyze only today's data. Shortcut for --date=<today>")
+                        help="Analyze only today's data (UTC). Shortcut for --date=<today>")
     parser.add_argument("--config", type=str, default=None,
                         help="Path to config file (default: config.yaml in script directory)")
+    parser.add_argument("--no-manifest", action="store_true",
+                        help="Walk the data directory instead of using the partition manifest")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Do not read or write the Arrow IPC frame cache")
+    parser.add_argument("--compact", action="store_true",
+                        help="Load prices as Float32 and timestamps as Int64 (about half the memory; "
+                             "deviations within ~1.2e-5 percentage points)")
+    parser.add_argument("--resample", type=str, default=None,
+                        help="Reduce quotes to the last value per time bucket before the pair join, "
+                             "e.g. 100ms, 1s, 5s (default from config: tick level)")
+    parser.add_argument("--stream-chunk", type=str, default=None,
+                        help="Process long ranges in time chunks of this length, e.g. 6h or 1d "
+                             "(bounded memory, identical results)")
+    parser.add_argument("--sweep", action="store_true",
+                        help="Also evaluate every pair on a threshold x neutral-zone grid "
+                             "(one alignment per pair; long-format sweep_<timestamp>.csv)")
+    parser.add_argument("--sweep-thresholds", type=str, nargs='+', default=None,
+                        help="Sweep entry thresholds in %%: numbers and/or start:stop:step ranges "
+                             "(default from config)")
+    parser.add_argument("--sweep-zero", type=str, nargs='+', default=None,
+                        help="Sweep neutral-zone widths in %%: numbers and/or start:stop:step ranges "
+                             "(default from config)")
+    parser.add_argument("--metrics", type=str, nargs='+', default=None, choices=list(METRIC_COLUMNS),
+                        help="Metric families to compute; 'paths' adds ask/ask, bid1/ask2 and bid2/ask1 "
+                             "metrics (loads asks too; default from config: deviation)")
+    parser.add_argument("--window", type=str, default=None,
+                        help="Also report per-window metrics every this long, e.g. 1h "
+                             "(long-format windows_<timestamp>.parquet; default from config: off)")
+    parser.add_argument("--window-period", type=str, default=None,
+                        help="Window length for rolling windows, e.g. 4h with --window 1h "
+                             "(default: equal to --window, i.e. fixed windows)")
+    parser.add_argument("--cycles", action="store_true",
+                        help="Extract every complete cycle (entry, peak, exit, duration) into the cycle "
+                             "store; query it with query_cycles.py")
+    parser.add_argument("--stats", action="store_true",
+                        help="Add ADF statistic, OU half-life, skew, kurtosis and Jarque-Bera p-value "
+                             "columns (batched over all pairs)")
+    parser.add_argument("--stats-every", type=str, default=None,
+                        help="Grid step of the statistics, e.g. 1s or 5s (default from config: 1s)")
+    parser.add_argument("--adf-lags", type=int, default=None,
+                        help="Lagged differences in the ADF regression (default from config: 1)")
+    parser.add_argument("--simulate", action="store_true",
+                        help="Replay every pair's cycles as trades at executable bid/ask prices for each "
+                             "threshold x fee schedule (fee schedules from config; simulation_<timestamp>.csv)")
+    parser.add_argument("--sim-thresholds", type=str, nargs='+', default=None,
+                        help="Simulation entry thresholds in %%: numbers and/or start:stop:step ranges "
+                             "(default from config)")
+    parser.add_argument("--io-workers", type=int, default=None,
+                        help="Concurrent file reads per worker process (default from config: 4)")
+    parser.add_argument("--read-ahead", type=int, default=None,
+                        help="Symbols read ahead while the current one is analyzed (default from config: 2)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse stored per-day pair summaries of unchanged closed days "
+                             "(day chunks; only new or changed days are recomputed)")
+    parser.add_argument("--journal", action="store_true",
+                        help="Journal completed symbol groups so an interrupted run can be continued "
+                             "with --resume (default from config: off)")
+    parser.add_argument("--resume", type=str, default=None, metavar="RUN_ID",
+                        help="Continue a run from its journal: symbols journaled with unchanged files and "
+                             "settings are not analyzed again (pass the run's other options unchanged)")
 
     args = parser.parse_args()
 
@@ -358,9 +1153,20 @@ Examples:
     thresholds = args.thresholds if args.thresholds else config.thresholds
     zero_threshold = config.zero_threshold
 
+    # Handle --last window
+    if args.last:
+        try:
+            window = TimeWindow.last(args.last)
+        except ValueError as e:
+            print(f"ERROR: Invalid --last value. {e}")
+            exit(1)
+        start_date = window.start.strftime('%Y-%m-%d %H:%M:%S')
+        end_date = None
+        print(f">>> Using --last {args.last}: from {start_date} UTC <<<")
     # Handle --today flag
-    if args.today:
-        today_str = date.today().strftime('%Y-%m-%d')
+    elif args.today:
+        # The date= partitions are UTC days, as is_closed_day assumes
+        today_str = today_utc()
         start_date = today_str
         end_date = today_str
         print(f">>> Using --today: {today_str} <<<")
@@ -372,15 +1178,134 @@ Examples:
         start_date = args.start_date if args.start_date else config.start_date
         end_date = args.end_date if args.end_date else config.end_date
 
-    # Validate date format (basic check)
+    # Validate date/datetime format (basic check)
     for date_str, name in [(start_date, "start-date"), (end_date, "end-date")]:
         if date_str:
             try:
-                datetime.strptime(date_str, '%Y-%m-%d')
-            except ValueError:
-                print(f"ERROR: Invalid {name} format. Expected YYYY-MM-DD, got: {date_str}")
+                parse_time_bound(date_str)
+            except ValueError as e:
+                print(f"ERROR: Invalid {name} format. {e}")
                 exit(1)
 
+    stream_chunk = args.stream_chunk if args.stream_chunk else config.stream_chunk
+    if stream_chunk:
+        try:
+            stream_chunk = parse_duration(stream_chunk)
+        except ValueError as e:
+            print(f"ERROR: Invalid --stream-chunk value. {e}")
+            exit(1)
+
+    incremental = args.incremental or config.use_summary_store
+    if incremental:
+        # Stored summaries are per day: the range is processed in day chunks
+        if stream_chunk and stream_chunk != timedelta(days=1):
+            print("ERROR: --incremental works on day chunks; use --stream-chunk 1d or omit it")
+            exit(1)
+        stream_chunk = timedelta(days=1)
+
+    resample = args.resample if args.resample else config.resample
+    if resample:
+        try:
+            resample_every = parse_duration(resample)
+        except ValueError as e:
+            print(f"ERROR: Invalid --resample value. {e}")
+            exit(1)
+        # A bucket split between two chunks would be emitted twice
+        if stream_chunk and stream_chunk % resample_every:
+            print(f"ERROR: --stream-chunk must be a multiple of --resample ({resample})")
+            exit(1)
+
+    sweep = None
+    if args.sweep or args.sweep_thresholds or args.sweep_zero:
+        try:
+            sweep = SweepGrid(
+                parse_grid(args.sweep_thresholds or config.sweep_thresholds),
+                parse_grid(args.sweep_zero or config.sweep_zero_thresholds)
+            )
+        except ValueError as e:
+            print(f"ERROR: Invalid sweep grid. {e}")
+            exit(1)
+        if stream_chunk:
+            print("ERROR: --sweep needs the whole aligned series per pair; it cannot be combined "
+                  "with --stream-chunk or --incremental")
+            exit(1)
+
+    metrics = args.metrics or config.metrics
+    if 'paths' in metrics and stream_chunk:
+        print("ERROR: --metrics paths is computed on the in-memory path; it cannot be combined "
+              "with --stream-chunk or --incremental")
+        exit(1)
+
+    windows = None
+    window_every = args.window or config.window
+    window_period = args.window_period or config.window_period
+    if window_period and not window_every:
+        print("ERROR: --window-period needs --window (the step between windows)")
+        exit(1)
+    if window_every:
+        try:
+            windows = WindowSpec(parse_duration(window_every), parse_duration(window_period or window_every))
+        except ValueError as e:
+            print(f"ERROR: Invalid window. {e}")
+            exit(1)
+        if stream_chunk:
+            print("ERROR: --window needs the whole aligned series per pair; it cannot be combined "
+                  "with --stream-chunk or --incremental")
+            exit(1)
+
+    store_cycles = args.cycles or config.store_cycles
+    if store_cycles and stream_chunk:
+        print("ERROR: --cycles needs the whole aligned series per pair; it cannot be combined "
+              "with --stream-chunk or --incremental")
+        exit(1)
+
+    max_memory = None
+    if args.max_memory:
+        try:
+            max_memory = parse_size(args.max_memory)
+        except ValueError as e:
+            print(f"ERROR: Invalid --max-memory value. {e}")
+            exit(1)
+    elif config.max_memory_gb:
+        max_memory = int(config.max_memory_gb * 1024 ** 3)
+
+    simulation = None
+    if args.simulate or args.sim_thresholds:
+        try:
+            simulation = SimulationGrid(
+                parse_grid(args.sim_thresholds or config.simulation_thresholds),
+                parse_fee_schedules(config.fee_schedules),
+                config.simulation_slippage_pct
+            )
+        except ValueError as e:
+            print(f"ERROR: Invalid simulation settings. {e}")
+            exit(1)
+        if not simulation.schedules:
+            print("ERROR: --simulate needs at least one fee schedule (simulation.fee_schedules in config.yaml)")
+            exit(1)
+        if any(t < zero_threshold for t in simulation.thresholds):
+            print(f"WARNING: simulation thresholds below the neutral zone ({zero_threshold}%) are skipped")
+        if stream_chunk:
+            print("ERROR: --simulate needs the whole aligned series per pair; it cannot be combined "
+                  "with --stream-chunk or --incremental")
+            exit(1)
+
+    statistics = None
+    if args.stats or config.stats:
+        try:
+            statistics = StatsSpec(parse_duration(args.stats_every or config.stats_every),
+                                   args.adf_lags if args.adf_lags is not None else config.adf_lags)
+        except ValueError as e:
+            print(f"ERROR: Invalid --stats-every value. {e}")
+            exit(1)
+        if statistics.lags < 0:
+            print("ERROR: --adf-lags must be 0 or more")
+            exit(1)
+        if stream_chunk:
+            print("ERROR: --stats needs the whole aligned series per pair; it cannot be combined "
+                  "with --stream-chunk or --incremental")
+            exit(1)
+
     print(">>> ULTRA-FAST MODE <<<")
     print("Optimizations: Batch processing + No subprocess + Data caching\n")
 
@@ -388,8 +1313,34 @@ Examples:
         data_path=data_path,
         exchanges_filter=exchanges_filter,
         n_workers=n_workers,
+        threads=args.threads or config.threads,
+        max_memory=max_memory,
+        executor=args.executor or config.executor,
         start_date=start_date,
         end_date=end_date,
         thresholds=thresholds,
-        zero_threshold=zero_threshold
+        zero_threshold=zero_threshold,
+        use_manifest=config.use_manifest and not args.no_manifest,
+        manifest_dir=config.manifest_directory,
+        cache_dir=None if (args.no_cache or not config.use_cache) else
+        (config.cache_directory or str(Path(__file__).parent / ".cache" / "frames")),
+        cache_max_bytes=int(config.cache_max_size_gb * 1024 ** 3),
+        compact=args.compact or config.compact_mode,
+        stream_chunk=stream_chunk or None,
+        resample=resample or None,
+        summary_dir=(config.summary_directory or str(Path(__file__).parent / ".cache" / "summaries"))
+        if incremental else None,
+        io_workers=args.io_workers or config.io_workers,
+        read_ahead=args.read_ahead if args.read_ahead is not None else config.read_ahead,
+        sweep=sweep,
+        metrics=metrics,
+        windows=windows,
+        cycle_dir=(config.cycle_directory or str(Path(__file__).parent / "summary_stats" / "cycles"))
+        if store_cycles else None,
+        statistics=statistics,
+        simulation=simulation,
+        journal_dir=(config.journal_directory or str(Path(__file__).parent / "summary_stats" / "runs"))
+        if args.journal or args.resume or config.use_journal else None,
+        resume=args.resume,
+        journal_keep_runs=config.journal_keep_runs
     )
@@ -5,7 +5,11 @@ Unit tests for analysis module - critical calculations.
 import unittest
 import polars as pl
 import numpy as np
-from lib.analysis import count_complete_cycles, analyze_pair_fast
+from itertools import combinations
+from lib.analysis import (count_complete_cycles, analyze_pair_fast, required_price_columns,
+                          align_pair, align_exchanges, pair_deviation, pair_paths, analyze_paths,
+                          analyze_deviation, PATHS)
+from tests.test_summary import quotes
 
 
 class TestCountCompleteCycles(unittest.TestCase):
@@ -56,6 +60,26 @@ class TestCountCompleteCycles(unittest.TestCase):
         cycles = count_complete_cycles(above, neutral)
         self.assertEqual(cycles, 0, "Should be 0 when stuck above threshold")
 
+    def test_matches_state_machine(self):
+        """Test the vectorized count against the row-by-row state machine, nulls included"""
+        rng = np.random.default_rng(7)
+        for _ in range(20):
+            n = int(rng.integers(0, 300))
+            above = [None if x < 0.05 else bool(x > 0.6) for x in rng.random(n)]
+            neutral = [None if x < 0.05 else bool(x < 0.3) for x in rng.random(n)]
+
+            expected = 0
+            was_above = False
+            for a, z in zip(above, neutral):
+                if a:
+                    was_above = True
+                elif z and was_above:
+                    expected += 1
+                    was_above = False
+
+            cycles = count_complete_cycles(pl.Series(above, dtype=pl.Boolean), pl.Series(neutral, dtype=pl.Boolean))
+            self.assertEqual(cycles, expected)
+
 
 class TestAnalyzePairFast(unittest.TestCase):
     """Tests for analyze_pair_fast function."""
@@ -177,6 +201,25 @@ class TestAnalyzePairFast(unittest.TestCase):
         self.assertIsNotNone(result)
         self.assertIn('opportunity_cycles_030bp', result)
 
+    def test_any_number_of_thresholds(self):
+        """Test that every threshold gets metrics keyed by its own value"""
+        thresholds = [0.05 * k for k in range(1, 11)] + [0.125]
+        result = analyze_pair_fast(
+            "TEST/USDT",
+            "Exchange1",
+            "Exchange2",
+            self.data1,
+            self.data2,
+            thresholds=thresholds
+        )
+
+        for label in ('005bp', '025bp', '050bp', '012p5bp'):
+            self.assertIn(f'opportunity_cycles_{label}', result)
+        self.assertEqual(len([k for k in result if k.startswith('opportunity_cycles_')]), len(thresholds))
+
+        single = analyze_pair_fast("TEST/USDT", "Exchange1", "Exchange2", self.data1, self.data2, thresholds=[0.25])
+        self.assertEqual(single['opportunity_cycles_025bp'], result['opportunity_cycles_025bp'])
+
     def test_empty_data(self):
         """Test handling of empty data"""
         empty_data = pl.DataFrame({
@@ -214,5 +257,112 @@ class TestAnalyzePairFast(unittest.TestCase):
         )
 
 
+    def test_compact_frames_match_float64(self):
+        """Test Float32 prices / Int64 timestamps against the Float64 path"""
+        def compact(df):
+            return df.select([
+                pl.col('timestamp').dt.epoch('us'),
+                pl.col('bestBid').cast(pl.Float32)
+            ])
+
+        expected = analyze_pair_fast("TEST/USDT", "Exchange1", "Exchange2", self.data1, self.data2)
+        result = analyze_pair_fast("TEST/USDT", "Exchange1", "Exchange2",
+                                   compact(self.data1), compact(self.data2))
+
+        self.assertEqual(result['data_points'], expected['data_points'])
+        self.assertEqual(result['zero_crossings'], expected['zero_crossings'])
+        self.assertAlmostEqual(result['duration_hours'], expected['duration_hours'])
+        # Documented bound: ~1.2e-5 percentage points on the deviation
+        self.assertAlmostEqual(result['max_deviation_pct'], expected['max_deviation_pct'], delta=1.2e-5)
+        self.assertAlmostEqual(result['min_deviation_pct'], expected['min_deviation_pct'], delta=1.2e-5)
+
+
+class TestAlignExchanges(unittest.TestCase):
+    """Tests for the all-exchange alignment."""
+
+    def setUp(self):
+        # Exchange C repeats timestamps of A, and has several quotes per timestamp
+        a = quotes(3000, 1, 100)
+        c = pl.concat([a[::7], a[::7], quotes(500, 3, 600)]).sort('timestamp', maintain_order=True)
+        self.data = {'C': c, 'A': a, 'B': quotes(2000, 2, 150), 'D': quotes(40, 4, 9000)}
+
+    def assert_matches_pairwise(self, data):
+        aligned = align_exchanges(data)
+        for ex1, ex2 in combinations(sorted(data), 2):
+            self.assertTrue(pair_deviation(aligned, ex1, ex2).equals(align_pair(data[ex1], data[ex2])),
+                            f"{ex1}/{ex2} differs from align_pair")
+
+    def test_matches_align_pair(self):
+        """Test that every pair equals its own as-of join, ties included"""
+        self.assert_matches_pairwise(self.data)
+
+    def test_short_slices_and_compact_frames(self):
+        """Test exact ratios on short slices and Float32 / Int64 frames"""
+        self.assert_matches_pairwise({name: df.slice(0, 3) for name, df in self.data.items()})
+        self.assert_matches_pairwise({
+            name: df.select([pl.col('timestamp').dt.epoch('us'), pl.col('bestBid').cast(pl.Float32)])
+            for name, df in self.data.items()
+        })
+
+    def test_one_row_exchange_divides_exactly(self):
+        """Test exact ratios against a single ex2 quote (the carry of chunked analysis)"""
+        data = {'A': self.data['A'].slice(100, 50), 'B': self.data['B'].slice(0, 1)}
+        quote = data['B']['bestBid'][0]
+        expected = [(bid / quote - 1) * 100 for bid in data['A']['bestBid']]
+        self.assertEqual(align_pair(data['A'], data['B'])['deviation'].to_list(), expected)
+        self.assertEqual(pair_deviation(align_exchanges(data), 'A', 'B')['deviation'].to_list(), expected)
+
+
+class TestAnalyzePaths(unittest.TestCase):
+    """Tests for the four directional paths."""
+
+    def setUp(self):
+        self.data = {'A': quotes(3000, 1, 100), 'B': quotes(2000, 2, 150)}
+        self.paths = pair_paths(align_exchanges(self.data, ['bestBid', 'bestAsk']), 'A', 'B')
+
+    def test_each_path_matches_a_separate_analysis(self):
+        """Test every path's metrics against an analysis of its own deviation series"""
+        metrics = analyze_paths(self.paths, [0.1, 0.4], 0.05)
+        joined = self.data['A'].join_asof(self.data['B'], on='timestamp', suffix='_2')
+        prices = {(1, 'bestBid'): 'bestBid', (1, 'bestAsk'): 'bestAsk',
+                  (2, 'bestBid'): 'bestBid_2', (2, 'bestAsk'): 'bestAsk_2'}
+
+        for path, (numerator, denominator) in PATHS.items():
+            ratio = pl.col(prices[numerator]) / pl.col(prices[denominator])
+            deviation = joined.select(['timestamp', ((ratio - 1.0) * 100).alias('deviation')])
+            expected = analyze_deviation(deviation, [0.1, 0.4], 0.05)
+            prefix = '' if path == 'bid_bid' else f'{path}_'
+            for key, value in expected.items():
+                if key not in ('data_points', 'duration_hours'):
+                    self.assertAlmostEqual(metrics[prefix + key], value, 9, f"{path}: {key}")
+        self.assertEqual(metrics['data_points'], 3000)
+
+    def test_bid_bid_is_the_regular_analysis(self):
+        """Test that the unprefixed metrics equal the bid/bid analysis exactly"""
+        metrics = analyze_paths(self.paths, [0.1, 0.4], 0.05)
+        expected = analyze_deviation(align_pair(self.data['A'], self.data['B']), [0.1, 0.4], 0.05)
+        self.assertEqual({key: metrics[key] for key in expected}, expected)
+        self.assertEqual(required_price_columns(['paths']), ['bestBid', 'bestAsk'])
+
+    def test_executable_paths_cross_the_spread(self):
+        """Test that buying at the ask lowers each direction's deviation"""
+        bid_bid = self.paths['bid_bid']
+        self.assertTrue((self.paths['bid1_ask2'] < bid_bid).all())
+        self.assertTrue((self.paths['bid2_ask1'] < 100 / (bid_bid / 100 + 1) - 100).all())
+
+
+class TestRequiredPriceColumns(unittest.TestCase):
+    """Tests for required_price_columns function."""
+
+    def test_default_metrics_need_bids_only(self):
+        """Test that the bid ratio metrics do not load asks"""
+        self.assertEqual(required_price_columns(), ['bestBid'])
+
+    def test_unknown_metric(self):
+        """Test that an unknown metric family is rejected"""
+        with self.assertRaises(ValueError):
+            required_price_columns(['spread'])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,114 @@
+"""
+Unit tests for batch module.
+"""
+
+import math
+import unittest
+from datetime import datetime, timedelta
+
+import polars as pl
+
+from lib.analysis import align_pair, analyze_deviation
+from lib.batch import PairBatch, analyze_pairs, stack_pairs
+from lib.stationarity import STAT_COLUMNS, StatsSpec, deviation_statistics
+from tests.test_summary import quotes
+
+
+def pairs():
+    """Aligned pairs of different lengths, including edge cases."""
+    aligned = [align_pair(quotes(n, seed, 150), quotes(max(n // 3, 2), seed + 50, 400))
+               for seed, n in enumerate((40, 700, 3, 1500, 90))]
+    # NaN deviation inside a pair, a pair without any ex2 quote, a single-row pair
+    aligned[1] = aligned[1].with_columns(
+        pl.when(pl.int_range(pl.len()) == 300).then(float('nan')).otherwise(pl.col('deviation')).alias('deviation')
+    )
+    aligned.append(aligned[0].with_columns(pl.lit(None, dtype=pl.Float64).alias('deviation')))
+    aligned.append(pl.DataFrame({'timestamp': [datetime(2025, 1, 1)], 'deviation': [0.7]},
+                                schema={'timestamp': pl.Datetime('us'), 'deviation': pl.Float64}))
+    return aligned
+
+
+def comparable(metrics):
+    """Metrics with NaN replaced by a marker (NaN != NaN)."""
+    if metrics is None:
+        return None
+    return {key: 'NaN' if isinstance(value, float) and math.isnan(value) else value
+            for key, value in metrics.items()}
+
+
+class TestAnalyzePairs(unittest.TestCase):
+    """Tests for the batched kernel."""
+
+    def test_matches_per_pair_analysis(self):
+        """Test that every pair's row equals analyze_deviation of that pair alone"""
+        aligned = pairs()
+        thresholds = [0.1, 0.45, 0.3]
+        results = analyze_pairs(stack_pairs(aligned), thresholds, 0.05)
+        by_pair = {row.pop('pair_id'): row for row in results.iter_rows(named=True)}
+
+        skipped = 0
+        for pair_id, deviation in enumerate(aligned):
+            expected = analyze_deviation(deviation, thresholds, 0.05)
+            if expected is None:
+                self.assertNotIn(pair_id, by_pair)
+                skipped += 1
+            else:
+                self.assertEqual(comparable(by_pair[pair_id]), comparable(expected), f"pair {pair_id}")
+        self.assertEqual(skipped, 2)  # the all-null pair and the one ending before ex2's first quote
+
+    def test_compact_timestamps(self):
+        """Test Int64 epoch-microsecond timestamps (compact mode)"""
+        aligned = [df.with_columns(pl.col('timestamp').dt.epoch('us')) for df in pairs()[:2]]
+        results = analyze_pairs(stack_pairs(aligned))
+        for row, deviation in zip(results.iter_rows(named=True), aligned):
+            row.pop('pair_id')
+            self.assertEqual(comparable(row), comparable(analyze_deviation(deviation)))
+
+    def test_time_units(self):
+        """Test nanosecond (with sub-microsecond parts) and millisecond timestamps"""
+        for unit, offset in (('ns', 789), ('ms', 0)):
+            aligned = [df.with_columns(pl.col('timestamp').dt.cast_time_unit(unit) + pl.duration(nanoseconds=offset))
+                       for df in pairs()[:2]]
+            results = analyze_pairs(stack_pairs(aligned))
+            for row, deviation in zip(results.iter_rows(named=True), aligned):
+                row.pop('pair_id')
+                self.assertEqual(comparable(row), comparable(analyze_deviation(deviation)), unit)
+
+
+class TestPairBatch(unittest.TestCase):
+    """Tests for PairBatch."""
+
+    def test_keys_budget_and_long_pairs(self):
+        """Test that results come back by key, long pairs included, and the batch resets"""
+        aligned = pairs()
+        batch = PairBatch([0.3], 0.05, max_rows=2000, max_pair_rows=1000)
+        for i, deviation in enumerate(aligned):
+            batch.add(('SYM', i), deviation)
+        self.assertEqual(batch.rows, sum(df.height for df in aligned) - aligned[3].height)
+        self.assertFalse(batch.full)
+
+        metrics = batch.analyze()
+        self.assertEqual(list(metrics), [('SYM', i) for i in (3, 0, 1, 2, 4, 5, 6)])
+        for i, deviation in enumerate(aligned):
+            self.assertEqual(comparable(metrics[('SYM', i)]), comparable(analyze_deviation(deviation, [0.3], 0.05)))
+        self.assertEqual((batch.rows, batch.analyze()), (0, {}))
+
+    def test_statistics_of_known_pairs(self):
+        """Test that pairs added with their own metrics get the per-pair statistics from the stack"""
+        aligned = pairs()
+        spec = StatsSpec(timedelta(milliseconds=100))
+        batch = PairBatch([0.3], 0.05, max_pair_rows=1000, statistics=spec)
+        batch.add('metric', aligned[4])
+        for i, deviation in enumerate(aligned):
+            batch.add_statistics(i, deviation, {'own': i})
+
+        metrics = batch.analyze()
+        self.assertEqual(comparable(metrics['metric']), comparable(
+            {**analyze_deviation(aligned[4], [0.3], 0.05), **deviation_statistics(aligned[4], spec)}))
+        for i, deviation in enumerate(aligned):
+            expected = deviation_statistics(deviation, spec) or dict.fromkeys(STAT_COLUMNS)
+            self.assertEqual(comparable(metrics[i]), comparable({'own': i, **expected}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Unit tests for compaction module.
+"""
+
+import os
+import unittest
+import tempfile
+import shutil
+import polars as pl
+import pyarrow.parquet as pq
+from pathlib import Path
+from lib.compaction import compact_tree
+from lib.timerange import is_closed_day
+from lib.manifest import load_manifest
+from lib.data_loader import load_exchange_symbol_data, COMPACTED_FILENAME
+
+
+class TestCompaction(unittest.TestCase):
+    """Tests for daily compaction."""
+
+    def setUp(self):
+        """Create a closed day with two unsorted hourly Decimal files, and an open day"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_path = Path(self.temp_dir)
+        self.symbol_dir = self.data_path / "exchange=ExA" / "symbol=BTC_USDT"
+
+        for date, hour in (("2025-01-01", 1), ("2025-01-01", 0), ("2999-01-01", 0)):
+            hour_dir = self.symbol_dir / f"date={date}" / f"hour={hour:02d}"
+            hour_dir.mkdir(parents=True, exist_ok=True)
+            start = pl.datetime(int(date[:4]), 1, 1, hour, 0, 0)
+            pl.DataFrame({
+                'Timestamp': pl.datetime_range(start, start + pl.duration(minutes=9), "1m", eager=True).reverse(),
+                'BestBid': [100.0 + i for i in range(10)],
+                'BestAsk': [100.5 + i for i in range(10)]
+            }).with_columns(
+                pl.col('BestBid').cast(pl.Decimal(18, 8)),
+                pl.col('BestAsk').cast(pl.Decimal(18, 8))
+            ).write_parquet(hour_dir / "data.parquet")
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_compacts_closed_days_only(self):
+        """Test that one sorted Float64 zstd file is written per closed day"""
+        summary = compact_tree(str(self.data_path), before_date="2025-06-01")
+
+        self.assertEqual(summary['days_compacted'], 1)
+        self.assertEqual(summary['files_merged'], 2)
+        self.assertFalse((self.symbol_dir / "date=2999-01-01" / COMPACTED_FILENAME).exists())
+
+        path = self.symbol_dir / "date=2025-01-01" / COMPACTED_FILENAME
+        df = pl.read_parquet(path)
+        self.assertEqual(df.height, 20)
+        self.assertTrue(df['Timestamp'].is_sorted())
+        self.assertEqual(df['BestBid'].dtype, pl.Float64)
+
+        metadata = pq.read_metadata(path)
+        column = metadata.row_group(0).column(0)
+        self.assertEqual(column.compression, 'ZSTD')
+        self.assertTrue(column.statistics.has_min_max)
+        self.assertIsNotNone(metadata.row_group(0).sorting_columns)
+
+    def test_loader_prefers_fresh_compacted_file(self):
+        """Test that manifest selection and the directory walk use the compacted file"""
+        compact_tree(str(self.data_path), before_date="2025-06-01")
+        manifest = load_manifest(str(self.data_path))
+
+        files = manifest.select_files("ExA", "BTC/USDT", "2025-01-01", "2025-01-01")
+        self.assertEqual([Path(f).name for f in files], [COMPACTED_FILENAME])
+        self.assertEqual(len(manifest.select_files("ExA", "BTC/USDT", "2999-01-01", "2999-01-01")), 1)
+
+        from_manifest = load_exchange_symbol_data(str(self.data_path), "ExA", "BTC/USDT", files=files)
+        from_walk = load_exchange_symbol_data(str(self.data_path), "ExA", "BTC/USDT", "2025-01-01", "2025-01-01")
+        self.assertTrue(from_manifest.equals(from_walk))
+        self.assertEqual(from_manifest.height, 20)
+
+    def test_stale_compacted_file_falls_back_to_raw(self):
+        """Test that a raw file newer than the compacted one wins"""
+        compact_tree(str(self.data_path), before_date="2025-06-01")
+        compacted = self.symbol_dir / "date=2025-01-01" / COMPACTED_FILENAME
+        stat = os.stat(compacted)
+        os.utime(compacted, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10_000_000_000))
+
+        manifest = load_manifest(str(self.data_path))
+        files = manifest.select_files("ExA", "BTC/USDT", "2025-01-01", "2025-01-01")
+        self.assertEqual(len(files), 2)
+
+        summary = compact_tree(str(self.data_path), manifest, before_date="2025-06-01")
+        self.assertEqual(summary['days_compacted'], 1, "Stale day should be re-compacted")
+
+    def test_is_closed_day(self):
+        """Test closed-day cutoff"""
+        self.assertTrue(is_closed_day("2025-01-01", today="2025-01-02"))
+        self.assertFalse(is_closed_day("2025-01-02", today="2025-01-02"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Unit tests for cycle_store module.
+"""
+
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import polars as pl
+
+from lib.cycle_store import CycleStore
+
+
+def cycle_rows(symbol, day, durations, threshold=0.5):
+    """Stored-cycle rows of one pair on one day, one cycle per hour."""
+    entries = [datetime(2025, 1, day, hour) for hour in range(len(durations))]
+    return pl.DataFrame({
+        'symbol': symbol,
+        'exchange1': 'Binance',
+        'exchange2': 'Bybit',
+        'resolution': 'tick',
+        'zero_threshold': 0.05,
+        'threshold': threshold,
+        'entry_ts': entries,
+        'peak_deviation': 0.6,
+        'peak_ts': entries,
+        'exit_ts': [e + timedelta(seconds=d) for e, d in zip(entries, durations)],
+        'duration_sec': [float(d) for d in durations],
+    })
+
+
+class TestCycleStore(unittest.TestCase):
+    """Tests for CycleStore."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = CycleStore(self.temp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_day_partitions_and_filters(self):
+        """Test that cycles are stored per entry day and every filter applies"""
+        written = self.store.write(pl.concat([
+            cycle_rows('BTC/USDT', 1, [5, 30, 8]),
+            cycle_rows('ETH/USDT', 2, [3, 60]),
+            cycle_rows('ETH/USDT', 2, [4], threshold=0.3),
+        ]))
+        self.assertEqual(written, 2)
+        self.assertEqual(self.store.dates(), ['2025-01-01', '2025-01-02'])
+
+        short = self.store.query(threshold=0.5, max_duration=10)
+        self.assertEqual(short['duration_sec'].to_list(), [5.0, 8.0, 3.0])
+        self.assertEqual(self.store.query(start='2025-01-02').height, 3)
+        self.assertEqual(self.store.query(end='2025-01-01', symbol='BTC/USDT', min_duration=8).height, 2)
+        self.assertEqual(self.store.query(start='2025-01-02 00:30', end='2025-01-02 01:30').height, 1)
+        self.assertEqual(self.store.query(exchanges=['Binance', 'OKX']).height, 0)
+        self.assertTrue(self.store.query(start='2025-02-01').is_empty())
+
+    def test_rewrite_replaces_rows(self):
+        """Test that writing the same cycles again replaces them instead of duplicating"""
+        self.store.write(cycle_rows('BTC/USDT', 1, [5, 30]))
+        self.store.write(cycle_rows('BTC/USDT', 1, [6, 30, 9]))
+        self.assertEqual(self.store.query()['duration_sec'].to_list(), [6.0, 30.0, 9.0])
+
+    def test_time_zones_normalized(self):
+        """Test that zone-aware timestamps are stored as naive UTC"""
+        rows = cycle_rows('BTC/USDT', 1, [5]).with_columns(
+            pl.col(c).dt.replace_time_zone('UTC').dt.convert_time_zone('Asia/Tokyo')
+            for c in ('entry_ts', 'peak_ts', 'exit_ts')
+        )
+        self.store.write(rows)
+        self.assertEqual(self.store.query()['entry_ts'].to_list(), [datetime(2025, 1, 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+Unit tests for cycles module.
+"""
+
+import unittest
+from datetime import datetime, timedelta
+
+import polars as pl
+
+from lib.analysis import align_pair
+from lib.cycles import CYCLE_COLUMNS, extract_cycles
+from lib.summary import summarize_deviation
+from tests.test_summary import quotes
+
+
+def series(deviations):
+    """Aligned frame with one row per second."""
+    return pl.DataFrame({
+        'timestamp': [datetime(2025, 1, 1) + timedelta(seconds=i) for i in range(len(deviations))],
+        'deviation': deviations
+    }, schema={'timestamp': pl.Datetime('us'), 'deviation': pl.Float64})
+
+
+class TestExtractCycles(unittest.TestCase):
+    """Tests for cycle event extraction."""
+
+    def test_cycle_rows(self):
+        """Test entry, peak, exit and duration of each cycle; an open excursion is not a cycle"""
+        aligned = series([0.0, 0.35, 0.2, -0.6, 0.1, 0.01, 0.4, 0.0, 0.7])
+        cycles = extract_cycles(aligned, [0.3], 0.05)
+        self.assertEqual(cycles.columns, list(CYCLE_COLUMNS))
+        self.assertEqual(cycles.rows(), [
+            (0.3, datetime(2025, 1, 1, 0, 0, 1), -0.6, datetime(2025, 1, 1, 0, 0, 3),
+             datetime(2025, 1, 1, 0, 0, 5), 4.0),
+            (0.3, datetime(2025, 1, 1, 0, 0, 6), 0.4, datetime(2025, 1, 1, 0, 0, 6),
+             datetime(2025, 1, 1, 0, 0, 7), 1.0),
+        ])
+
+    def test_counts_match_summary(self):
+        """Test that each threshold has as many cycles as opportunity_cycles counts"""
+        aligned = align_pair(quotes(6000, 3, 100), quotes(900, 4, 700))
+        aligned = aligned.with_columns(
+            pl.when(pl.int_range(pl.len()) == 2000).then(float('nan')).otherwise(pl.col('deviation')).alias('deviation')
+        )
+        thresholds = [0.1, 0.3, 0.6]
+        cycles = extract_cycles(aligned, thresholds, 0.05)
+        summary = summarize_deviation(aligned, thresholds, 0.05)
+        for threshold, level in zip(thresholds, summary.levels):
+            self.assertEqual(cycles.filter(pl.col('threshold') == threshold).height, level.cycles)
+        self.assertTrue((cycles['exit_ts'] > cycles['entry_ts']).all())
+        self.assertTrue((cycles['peak_ts'] < cycles['exit_ts']).all())
+
+    def test_compact_timestamps(self):
+        """Test Int64 epoch-microsecond timestamps (compact mode)"""
+        aligned = series([0.0, 0.5, 0.0, -0.5, 0.0])
+        compact = aligned.with_columns(pl.col('timestamp').dt.epoch('us'))
+        self.assertTrue(extract_cycles(compact, [0.3]).equals(extract_cycles(aligned, [0.3])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,7 +6,8 @@ import unittest
 import tempfile
 import polars as pl
 from pathlib import Path
-from lib.data_loader import load_exchange_symbol_data
+from datetime import datetime, timedelta
+from lib.data_loader import load_exchange_symbol_data, merge_ordered, resample_quotes
 
 
 class TestDataLoader(unittest.TestCase):
@@ -105,6 +106,42 @@ class TestDataLoader(unittest.TestCase):
 
         self.assertIsNone(df, "Should not find data for different date")
 
+    def test_sub_day_window(self):
+        """Test datetime bounds: hour partitions pruned, rows filtered in the scan"""
+        hour_dir = self.data_path / "exchange=TestExchange" / "symbol=BTC#USDT" / "date=2025-01-01" / "hour=05"
+        hour_dir.mkdir(parents=True, exist_ok=True)
+        pl.DataFrame({
+            'Timestamp': pl.datetime_range(
+                start=pl.datetime(2025, 1, 1, 5, 0, 0),
+                end=pl.datetime(2025, 1, 1, 5, 59, 0),
+                interval="1m",
+                eager=True
+            ),
+            'BestBid': [100.0] * 60,
+            'BestAsk': [100.1] * 60
+        }).write_parquet(hour_dir / "data.parquet", row_group_size=10)
+
+        df = load_exchange_symbol_data(
+            str(self.data_path),
+            "TestExchange",
+            "BTC/USDT",
+            start_date="2025-01-01 05:15",
+            end_date="2025-01-01 05:30"
+        )
+
+        self.assertEqual(len(df), 15, "Should keep [05:15, 05:30) only")
+        self.assertEqual(df['timestamp'].min().minute, 15)
+        self.assertEqual(df['timestamp'].max().minute, 29)
+
+        df = load_exchange_symbol_data(
+            str(self.data_path),
+            "TestExchange",
+            "BTC/USDT",
+            start_date="2025-01-01 00:05",
+            end_date="2025-01-01 01:00"
+        )
+        self.assertEqual(len(df), 6, "Should keep 00:05-00:10 from hour=00 only")
+
     def test_data_types(self):
         """Test that data is loaded with correct types"""
         df = load_exchange_symbol_data(
@@ -139,6 +176,122 @@ class TestDataLoader(unittest.TestCase):
             "Data should be sorted by timestamp"
         )
 
+    def test_interleaved_and_unsorted_files(self):
+        """Test that overlapping files are merged and an unsorted file is sorted"""
+        hour_dir = self.data_path / "exchange=TestExchange" / "symbol=BTC#USDT" / "date=2025-01-01" / "hour=00"
+        # Second collector file in the same hour, interleaving with data.parquet
+        pl.DataFrame({
+            'Timestamp': [datetime(2025, 1, 1, 0, m, 30) for m in range(5)],
+            'BestBid': [101.0] * 5,
+            'BestAsk': [101.1] * 5
+        }).write_parquet(hour_dir / "data_2.parquet")
+        # Later hour written out of order
+        later_dir = hour_dir.parent / "hour=03"
+        later_dir.mkdir()
+        pl.DataFrame({
+            'Timestamp': [datetime(2025, 1, 1, 3, m) for m in (7, 2, 5)],
+            'BestBid': [102.0] * 3,
+            'BestAsk': [102.1] * 3
+        }).write_parquet(later_dir / "data.parquet")
+
+        df = load_exchange_symbol_data(str(self.data_path), "TestExchange", "BTC/USDT")
+
+        self.assertEqual(len(df), 19)
+        timestamps = df['timestamp'].to_list()
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertEqual(df.filter(pl.col('bestBid') == 101.0).height, 5)
+
+
+    def test_column_projection_and_compact_mode(self):
+        """Test loading only the requested price columns, optionally as Float32/Int64"""
+        df = load_exchange_symbol_data(
+            str(self.data_path), "TestExchange", "BTC/USDT", columns=['bestBid']
+        )
+        self.assertEqual(df.columns, ['timestamp', 'bestBid'])
+        self.assertEqual(df['bestBid'].dtype, pl.Float64)
+
+        compact = load_exchange_symbol_data(
+            str(self.data_path), "TestExchange", "BTC/USDT", columns=['bestBid'], compact=True
+        )
+        self.assertEqual(compact['timestamp'].dtype, pl.Int64)
+        self.assertEqual(compact['bestBid'].dtype, pl.Float32)
+        self.assertEqual(compact['timestamp'].to_list(), df['timestamp'].dt.epoch('us').to_list())
+        self.assertLess(compact.estimated_size(), df.estimated_size())
+
+
+    def test_resample_on_load(self):
+        """Test reducing the loaded quotes to one row per bucket"""
+        df = load_exchange_symbol_data(
+            str(self.data_path), "TestExchange", "BTC/USDT", resample=timedelta(minutes=5)
+        )
+
+        # 00:00-00:10 at 1m -> buckets [00:00, 00:05), [00:05, 00:10), [00:10, 00:15)
+        self.assertEqual(len(df), 3)
+        self.assertEqual([t.minute for t in df['timestamp']], [5, 10, 15])
+
+
+class TestMergeOrdered(unittest.TestCase):
+    """Tests for merge_ordered."""
+
+    @staticmethod
+    def frame(start_minute: int, count: int, step: int = 1) -> pl.DataFrame:
+        base = datetime(2025, 1, 1)
+        return pl.DataFrame({
+            'timestamp': [base + timedelta(minutes=start_minute + i * step) for i in range(count)],
+            'value': [start_minute] * count
+        })
+
+    def test_disjoint_frames_are_concatenated_in_order(self):
+        """Test that non-overlapping frames come out in time order"""
+        df = merge_ordered([self.frame(20, 5), self.frame(0, 5), self.frame(10, 5)])
+
+        self.assertEqual(df['value'].to_list(), [0] * 5 + [10] * 5 + [20] * 5)
+        self.assertTrue(df['timestamp'].flags['SORTED_ASC'])
+
+    def test_overlapping_frames_are_merged(self):
+        """Test that interleaving frames are merged, matching a full sort"""
+        frames = [self.frame(0, 10, 2), self.frame(1, 10, 2), self.frame(30, 3), self.frame(5, 2)]
+
+        df = merge_ordered(frames)
+        expected = pl.concat(frames).sort('timestamp')
+
+        self.assertEqual(df['timestamp'].to_list(), expected['timestamp'].to_list())
+        self.assertEqual(len(df), 25)
+
+    def test_empty_frames_ignored(self):
+        """Test that empty inputs do not break the merge"""
+        df = merge_ordered([self.frame(0, 0), self.frame(3, 2)])
+        self.assertEqual(len(df), 2)
+
+
+class TestResampleQuotes(unittest.TestCase):
+    """Tests for resample_quotes."""
+
+    def setUp(self):
+        base = datetime(2025, 1, 1)
+        self.df = pl.DataFrame({
+            'timestamp': [base + timedelta(milliseconds=ms) for ms in (100, 900, 1000, 2500, 2600)],
+            'bestBid': [1.0, 2.0, 3.0, 4.0, 5.0]
+        })
+
+    def test_last_value_labelled_at_bucket_end(self):
+        """Test last quote per bucket, stamped with the bucket end (no look-ahead)"""
+        df = resample_quotes(self.df, timedelta(seconds=1))
+
+        self.assertEqual(df['bestBid'].to_list(), [2.0, 3.0, 5.0])
+        self.assertEqual([t.second for t in df['timestamp']], [1, 2, 3])
+        self.assertTrue(df['timestamp'].flags['SORTED_ASC'])
+
+    def test_epoch_timestamps(self):
+        """Test Int64 epoch-microsecond timestamps (compact mode)"""
+        compact = self.df.with_columns(pl.col('timestamp').dt.epoch('us'))
+        expected = resample_quotes(self.df, timedelta(milliseconds=500))
+
+        df = resample_quotes(compact, timedelta(milliseconds=500))
+
+        self.assertEqual(df['bestBid'].to_list(), expected['bestBid'].to_list())
+        self.assertEqual(df['timestamp'].to_list(), expected['timestamp'].dt.epoch('us').to_list())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,127 @@
+"""
+Unit tests for frame_cache module.
+"""
+
+import os
+import pickle
+import unittest
+import tempfile
+import shutil
+import polars as pl
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from lib.frame_cache import FrameCache
+from lib.data_loader import load_exchange_symbol_data, source_file
+
+
+class TestFrameCache(unittest.TestCase):
+    """Tests for the Arrow IPC frame cache."""
+
+    def setUp(self):
+        """Create a closed day with two hourly files and an empty cache"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_path = Path(self.temp_dir) / "data"
+        self.cache = FrameCache(str(Path(self.temp_dir) / "cache"), max_bytes=10 * 1024 ** 2)
+
+        for hour in (0, 1):
+            hour_dir = self.data_path / "exchange=ExA" / "symbol=BTC_USDT" / "date=2025-01-01" / f"hour={hour:02d}"
+            hour_dir.mkdir(parents=True, exist_ok=True)
+            start = pl.datetime(2025, 1, 1, hour, 0, 0)
+            pl.DataFrame({
+                'Timestamp': pl.datetime_range(start, start + pl.duration(minutes=9), "1m", eager=True),
+                'BestBid': [100.0 + i for i in range(10)],
+                'BestAsk': [100.5 + i for i in range(10)]
+            }).write_parquet(hour_dir / "data.parquet")
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def load(self, **kwargs):
+        return load_exchange_symbol_data(str(self.data_path), "ExA", "BTC/USDT", cache=self.cache, **kwargs)
+
+    def test_hit_returns_identical_frame(self):
+        """Test that a second load is served from the cache with the same content"""
+        first = self.load()
+        self.assertEqual(self.cache.misses, 1)
+
+        second = self.load()
+        self.assertEqual(self.cache.hits, 1)
+        self.assertTrue(first.equals(second))
+        self.assertTrue(first.equals(load_exchange_symbol_data(str(self.data_path), "ExA", "BTC/USDT")))
+
+    def test_source_change_invalidates(self):
+        """Test that touching a source file changes the fingerprint"""
+        self.load()
+        path = next(self.data_path.rglob("*.parquet"))
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        self.load()
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_partial_day_bypasses_cache(self):
+        """Test that a sub-day window does not read or populate the cache"""
+        df = self.load(start_date="2025-01-01 01:00", end_date="2025-01-01 02:00")
+
+        self.assertEqual(len(df), 10)
+        self.assertEqual(self.cache.hits + self.cache.misses, 0)
+
+    def test_lru_eviction(self):
+        """Test that eviction keeps the most recently used entries within budget"""
+        frame = pl.DataFrame({'x': list(range(1000))})
+        for i, key in enumerate(('old', 'mid', 'new')):
+            self.cache.put(key, frame)
+            path = self.cache.cache_dir / f"{key}.arrow"
+            os.utime(path, ns=(0, (i + 1) * 1_000_000_000))
+
+        entry_size = (self.cache.cache_dir / "new.arrow").stat().st_size
+        self.cache.max_bytes = entry_size * 2
+        self.cache.evict()
+
+        self.assertIsNone(self.cache.get('old'))
+        self.assertIsNotNone(self.cache.get('mid'))
+        self.assertIsNotNone(self.cache.get('new'))
+
+    def test_shared_between_threads(self):
+        """Test that threads sharing one cache keep its counters and budget"""
+        frame = pl.DataFrame({'x': list(range(1000))})
+        self.cache.put('probe', frame)
+        self.cache.max_bytes = (self.cache.cache_dir / "probe.arrow").stat().st_size * 4
+
+        def work(i):
+            self.cache.put(f"k{i}", frame)
+            return self.cache.get(f"k{i}") is not None
+
+        with ThreadPoolExecutor(8) as pool:
+            found = sum(pool.map(work, range(64)))
+        self.cache.evict()
+
+        self.assertEqual(self.cache.hits + self.cache.misses, 64)
+        self.assertEqual(self.cache.hits, found)
+        self.assertLessEqual(len(list(self.cache.cache_dir.glob("*.arrow"))), 4)
+
+    def test_pickles(self):
+        """Test that a copy sent to a worker process gets its own lock"""
+        self.cache.put('k', pl.DataFrame({'x': [1]}))
+        restored = pickle.loads(pickle.dumps(self.cache))
+        self.assertIsNotNone(restored.get('k'))
+        self.assertIsNot(restored._lock, self.cache._lock)
+
+    def test_key_uses_source_stats(self):
+        """Test that recorded size/mtime and a fresh stat give the same key"""
+        path = str(next(self.data_path.rglob("*.parquet")))
+        stat = os.stat(path)
+        bare = source_file(path)
+        recorded = bare._replace(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+        self.assertEqual(bare.date, "2025-01-01")
+        self.assertEqual(
+            self.cache.key("ExA", "BTC/USDT", "2025-01-01", [bare]),
+            self.cache.key("ExA", "BTC/USDT", "2025-01-01", [recorded])
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
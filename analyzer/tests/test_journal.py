@@ -0,0 +1,98 @@
+"""
+Unit tests for journal module.
+"""
+
+import os
+import tempfile
+import unittest
+
+import polars as pl
+
+from lib.data_loader import SourceFile
+from lib.journal import ENTRIES_FILE, RunJournal, symbol_key, prune_runs
+from lib.results import pack_results
+
+
+def pair(symbol, ex1, ex2, value):
+    return {'symbol': symbol, 'ex1': ex1, 'ex2': ex2, 'status': 'SUCCESS', 'stats': {'x': value},
+            'sweep': pl.DataFrame({'threshold': [0.3], 'cycles': [int(value)]})}
+
+
+def files(mtime_ns):
+    return [SourceFile('/data/2025-01-01.parquet', '2025-01-01', 100, mtime_ns)]
+
+
+class TestSymbolKey(unittest.TestCase):
+    """Tests for symbol_key."""
+
+    def test_changes_with_settings_and_files(self):
+        key = symbol_key('s1', {'A': files(1), 'B': files(1)})
+        self.assertEqual(key, symbol_key('s1', {'B': files(1), 'A': files(1)}))
+        self.assertNotEqual(key, symbol_key('s2', {'A': files(1), 'B': files(1)}))
+        self.assertNotEqual(key, symbol_key('s1', {'A': files(1), 'B': files(2)}))
+
+
+class TestRunJournal(unittest.TestCase):
+    """Tests for RunJournal."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.keys = {'BTC': 'k1', 'ETH': 'k2', 'SOL': 'k3'}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_record_and_collect(self):
+        """Test that journaled groups are read back for the report"""
+        journal = RunJournal.create(self.dir)
+        journal.record(pack_results([pair('BTC', 'A', 'B', 1.0), pair('ETH', 'A', 'B', 2.0)]), self.keys)
+        journal.record(pack_results([pair('SOL', 'A', 'B', 3.0)]), self.keys)
+
+        collected = RunJournal(self.dir, journal.run_id).collect(self.keys)
+        self.assertEqual(sorted(collected.stats()['symbol'].to_list()), ['BTC', 'ETH', 'SOL'])
+        self.assertEqual(collected.frame('sweep').height, 3)
+        self.assertEqual(collected.frame_pairs['sweep'], 3)
+        self.assertEqual(collected.pairs().height, 3)
+
+    def test_changed_inputs_are_not_completed(self):
+        """Test that a symbol counts as done only with its journaled key"""
+        journal = RunJournal.create(self.dir)
+        journal.record(pack_results([pair('BTC', 'A', 'B', 1.0), pair('ETH', 'A', 'B', 2.0)]), self.keys)
+        self.assertEqual(journal.completed(self.keys), {'BTC': 0, 'ETH': 0})
+        self.assertEqual(journal.completed({**self.keys, 'ETH': 'changed'}), {'BTC': 0})
+
+    def test_latest_entry_wins(self):
+        """Test that a re-analyzed symbol is reported from its latest entry only"""
+        journal = RunJournal.create(self.dir)
+        journal.record(pack_results([pair('BTC', 'A', 'B', 1.0), pair('ETH', 'A', 'B', 2.0)]), self.keys)
+        keys = {**self.keys, 'ETH': 'changed'}
+        resumed = RunJournal(self.dir, journal.run_id)
+        resumed.record(pack_results([pair('ETH', 'A', 'B', 5.0)]), keys)
+
+        collected = resumed.collect(keys)
+        stats = collected.stats().sort('symbol')
+        self.assertEqual(stats['x'].to_list(), [1.0, 5.0])
+        self.assertEqual(collected.frame('sweep').height, 2)
+        self.assertEqual(collected.frame_pairs['sweep'], 2)
+
+    def test_torn_line(self):
+        """Test that a line torn by a crash is skipped and later entries stay readable"""
+        journal = RunJournal.create(self.dir)
+        journal.record(pack_results([pair('BTC', 'A', 'B', 1.0)]), self.keys)
+        with open(journal.root / ENTRIES_FILE, 'a', encoding='utf-8') as f:
+            f.write('{"version": 1, "name": "batch_0000')
+        resumed = RunJournal(self.dir, journal.run_id)
+        self.assertEqual(len(resumed.entries()), 1)
+        resumed.record(pack_results([pair('ETH', 'A', 'B', 2.0)]), self.keys)
+        self.assertEqual(resumed.completed(self.keys), {'BTC': 0, 'ETH': 1})
+
+    def test_prune_runs(self):
+        for run_id in ('20250101_000000', '20250102_000000', '20250103_000000', 'notes'):
+            os.makedirs(os.path.join(self.dir, run_id))
+        self.assertEqual(prune_runs(self.dir, 2, '20250101_000000'), ['20250102_000000'])
+        self.assertEqual(sorted(os.listdir(self.dir)), ['20250101_000000', '20250103_000000', 'notes'])
+
+
+if __name__ == '__main__':
+    unittest.main()
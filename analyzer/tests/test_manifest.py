@@ -0,0 +1,124 @@
+"""
+Unit tests for manifest module.
+"""
+
+import os
+import unittest
+import tempfile
+import shutil
+import polars as pl
+from datetime import datetime
+from pathlib import Path
+from lib.manifest import PartitionManifest, load_manifest
+from lib.discovery import discover_data
+from lib.data_loader import load_exchange_symbol_data
+
+
+def write_hour_file(data_path: Path, exchange: str, symbol_dir: str, date: str, hour: int,
+                    name: str = "data.parquet", rows: int = 10) -> Path:
+    """Write a small collector-style parquet file into the partition tree."""
+    hour_dir = data_path / f"exchange={exchange}" / f"symbol={symbol_dir}" / f"date={date}" / f"hour={hour:02d}"
+    hour_dir.mkdir(parents=True, exist_ok=True)
+    start = datetime.strptime(date, '%Y-%m-%d').replace(hour=hour)
+    pl.DataFrame({
+        'Timestamp': pl.datetime_range(
+            start=start,
+            end=start.replace(minute=rows - 1),
+            interval="1m",
+            eager=True
+        ),
+        'BestBid': [100.0] * rows,
+        'BestAsk': [100.1] * rows
+    }).write_parquet(hour_dir / name)
+    return hour_dir / name
+
+
+class TestPartitionManifest(unittest.TestCase):
+    """Tests for PartitionManifest."""
+
+    def setUp(self):
+        """Create a two-exchange partition tree"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_path = Path(self.temp_dir)
+
+        write_hour_file(self.data_path, "ExA", "BTC_USDT", "2025-01-01", 0)
+        write_hour_file(self.data_path, "ExA", "BTC_USDT", "2025-01-02", 5)
+        write_hour_file(self.data_path, "ExB", "BTC_USDT", "2025-01-01", 0)
+        write_hour_file(self.data_path, "ExB", "ETH_USDT", "2025-01-01", 0)
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_records_footer_metadata(self):
+        """Test that each file row carries partitions, row count and time range"""
+        manifest = load_manifest(str(self.data_path))
+
+        self.assertEqual(manifest.files.height, 4)
+        row = manifest.files.filter(
+            (pl.col('exchange') == 'ExA') & (pl.col('date') == '2025-01-02')
+        ).row(0, named=True)
+
+        self.assertEqual(row['symbol'], 'BTC/USDT')
+        self.assertEqual(row['hour'], '05')
+        self.assertEqual(row['rows'], 10)
+        self.assertEqual(row['ts_min'], datetime(2025, 1, 2, 5, 0))
+        self.assertEqual(row['ts_max'], datetime(2025, 1, 2, 5, 9))
+        self.assertGreater(row['size'], 0)
+
+    def test_discovery_from_manifest(self):
+        """Test that discovery answered from the manifest matches the tree walk"""
+        manifest = load_manifest(str(self.data_path))
+
+        self.assertEqual(
+            discover_data(str(self.data_path), manifest),
+            discover_data(str(self.data_path))
+        )
+
+    def test_select_files_date_filter(self):
+        """Test file selection with inclusive date bounds"""
+        manifest = load_manifest(str(self.data_path))
+
+        all_files = manifest.select_files("ExA", "BTC/USDT")
+        first_day = manifest.select_files("ExA", "BTC/USDT", "2025-01-01", "2025-01-01")
+        missing = manifest.select_files("ExA", "ETH/USDT")
+
+        self.assertEqual(len(all_files), 2)
+        self.assertEqual(len(first_day), 1)
+        self.assertEqual(missing, [])
+
+        df = load_exchange_symbol_data(str(self.data_path), "ExA", "BTC/USDT", files=all_files)
+        self.assertEqual(len(df), 20)
+
+    def test_select_files_time_window(self):
+        """Test hour/footer pruning for datetime bounds"""
+        manifest = load_manifest(str(self.data_path))
+
+        self.assertEqual(len(manifest.select_files("ExA", "BTC/USDT", "2025-01-02 05:00", "2025-01-02 06:00")), 1)
+        self.assertEqual(len(manifest.select_files("ExA", "BTC/USDT", "2025-01-02 05:30", "2025-01-02 06:00")), 0,
+                         "Footer range 05:00-05:09 lies before the window")
+        self.assertEqual(len(manifest.select_files("ExA", "BTC/USDT", "2025-01-02 06:00")), 0)
+
+    def test_incremental_refresh(self):
+        """Test that unchanged directories are reused and new files are picked up"""
+        load_manifest(str(self.data_path))
+        # Second pass settles the root mtime changed by creating _manifest/
+        load_manifest(str(self.data_path))
+
+        reloaded = PartitionManifest(str(self.data_path)).refresh()
+        self.assertEqual(reloaded.footers_read, 0)
+        self.assertEqual(reloaded.dirs_listed, 0)
+
+        write_hour_file(self.data_path, "ExA", "BTC_USDT", "2025-01-02", 6)
+        # Make sure the new directory gets a distinct mtime on coarse filesystems
+        date_dir = self.data_path / "exchange=ExA" / "symbol=BTC_USDT" / "date=2025-01-02"
+        stat = os.stat(date_dir)
+        os.utime(date_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        refreshed = PartitionManifest(str(self.data_path)).refresh()
+        self.assertEqual(refreshed.footers_read, 1)
+        self.assertEqual(len(refreshed.select_files("ExA", "BTC/USDT")), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Unit tests for memory module.
+"""
+
+import time
+import unittest
+from datetime import timedelta
+from multiprocessing.pool import ThreadPool
+
+from lib.batch import DEFAULT_BATCH_ROWS, DEFAULT_MAX_PAIR_ROWS
+from lib.data_loader import SourceFile
+from lib.memory import (BATCH_ROW_BYTES, PAIR_ROW_BYTES, TASK_OVERHEAD_BYTES, MemoryBudget, parse_size,
+                        format_size, symbol_footprint, loaded_bytes, batched_rows, group_footprint,
+                        source_span, low_memory_chunk, reset_peak_rss, current_rss, peak_rss)
+
+
+def files(rows, date='2025-01-01'):
+    return [SourceFile(f'/data/{date}.parquet', date, None, None, False, rows)]
+
+
+def sleep_task(item):
+    """Sleep for the item's duration and return its name."""
+    name, seconds = item
+    if seconds < 0:
+        raise RuntimeError(name)
+    time.sleep(seconds)
+    return name
+
+
+class TestSizes(unittest.TestCase):
+    """Tests for parse_size and format_size."""
+
+    def test_parse(self):
+        self.assertEqual(parse_size("8G"), 8 * 1024 ** 3)
+        self.assertEqual(parse_size("512m"), 512 * 1024 ** 2)
+        self.assertEqual(parse_size("1.5GB"), int(1.5 * 1024 ** 3))
+        self.assertEqual(parse_size("2GiB"), 2 * 1024 ** 3)
+        self.assertEqual(parse_size("4096"), 4096)
+        for value in ("", "lots", "8X", "-1G"):
+            with self.assertRaises(ValueError):
+                parse_size(value)
+
+    def test_format(self):
+        self.assertEqual(format_size(512), "512 B")
+        self.assertEqual(format_size(1.5 * 1024 ** 3), "1.5 GB")
+
+
+class TestFootprints(unittest.TestCase):
+    """Tests for the footprint estimates."""
+
+    def setUp(self):
+        self.files = {'A': files(1000), 'B': files(3000), 'C': files(0)}
+
+    def test_symbol_footprint(self):
+        """Test loaded, aligned and pair frames per row: 3 exchanges, bid only"""
+        self.assertEqual(symbol_footprint(self.files, 1), TASK_OVERHEAD_BYTES + 4000 * (16 + 32 + PAIR_ROW_BYTES))
+        self.assertEqual(symbol_footprint(self.files, 1, compact=True),
+                         TASK_OVERHEAD_BYTES + 4000 * (12 + 20 + PAIR_ROW_BYTES))
+        self.assertEqual(loaded_bytes(self.files, 2), 4000 * 24)
+        self.assertIsNone(symbol_footprint(None, 1))
+
+    def test_batched_rows(self):
+        """Test that pairs have their first exchange's rows and large pairs are not batched"""
+        self.assertEqual(batched_rows(self.files), 1000 + 1000 + 3000)
+        self.assertEqual(batched_rows({'A': files(DEFAULT_MAX_PAIR_ROWS + 1), 'B': files(10)}), 0)
+
+    def test_group_footprint(self):
+        """Test that a symbol's peak includes the next read_ahead symbols' frames and the batch"""
+        self.assertEqual(group_footprint([100.0, 10.0, 10.0], [1.0, 5.0, 7.0], [0, 0, 0], 1), 105.0)
+        self.assertEqual(group_footprint([100.0, 10.0, 10.0], [1.0, 5.0, 7.0], [0, 0, 0], 2), 112.0)
+        self.assertEqual(group_footprint([100.0], [50.0], [10, 20], 0), 100.0 + 30 * BATCH_ROW_BYTES)
+        self.assertEqual(group_footprint([0.0], [0.0], [DEFAULT_BATCH_ROWS], 0), DEFAULT_BATCH_ROWS * BATCH_ROW_BYTES)
+
+    def test_low_memory_chunk(self):
+        """Test that the chunk scales the footprint down to the target, in whole hours and resample buckets"""
+        span = source_span({'A': files(1, '2025-01-01') + files(1, '2025-01-04')})
+        self.assertEqual(span, timedelta(days=4))
+        self.assertEqual(low_memory_chunk(4000.0, 1000.0, span), timedelta(hours=24))
+        self.assertEqual(low_memory_chunk(1e12, 1.0, span), timedelta(hours=1))
+        # Whole resample buckets: 7s does not divide an hour
+        self.assertEqual(low_memory_chunk(1e12, 1.0, span, timedelta(seconds=7)), timedelta(seconds=3598))
+        self.assertEqual(low_memory_chunk(4000.0, 1000.0, span, timedelta(minutes=5)), timedelta(hours=24))
+        self.assertEqual(low_memory_chunk(1e12, 1.0, span, timedelta(hours=2)), timedelta(hours=2))
+
+    def test_rss(self):
+        """Test that RSS readings are available on this platform"""
+        reset_peak_rss()
+        self.assertGreater(peak_rss(), 0)
+        if current_rss() is not None:
+            self.assertGreaterEqual(peak_rss(), current_rss() // 2)
+
+
+class TestMemoryBudget(unittest.TestCase):
+    """Tests for admission control."""
+
+    def test_holds_back_groups_that_do_not_fit(self):
+        """Test that a later group that fits goes first and the budget is never exceeded"""
+        items = [('big', 0.2), ('medium', 0.05), ('small', 0.05), ('tiny', 0.05)]
+        budget = MemoryBudget(10.0, slots=2)
+        with ThreadPool(2) as pool:
+            results = list(budget.run(pool, sleep_task, items, [8.0, 6.0, 2.0, 1.0]))
+        self.assertEqual(sorted(results), ['big', 'medium', 'small', 'tiny'])
+        self.assertEqual(results[-1], 'medium')  # waits for 'big' to finish
+        self.assertEqual(budget.held_back, 1)
+        self.assertLessEqual(budget.peak_reserved, 10.0)
+
+    def test_oversized_group_runs_alone(self):
+        """Test that a group larger than the budget still runs, when nothing else does"""
+        budget = MemoryBudget(10.0, slots=2)
+        with ThreadPool(2) as pool:
+            self.assertEqual(list(budget.run(pool, sleep_task, [('huge', 0.0)], [20.0])), ['huge'])
+        self.assertEqual(budget.peak_reserved, 20.0)
+
+    def test_task_error(self):
+        budget = MemoryBudget(10.0, slots=1)
+        with ThreadPool(1) as pool:
+            with self.assertRaises(RuntimeError):
+                list(budget.run(pool, sleep_task, [('ok', 0.0), ('failed', -1)], [1.0, 1.0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
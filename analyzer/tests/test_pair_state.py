@@ -0,0 +1,71 @@
+"""
+Unit tests for pair_state module.
+"""
+
+import unittest
+
+import polars as pl
+
+from lib.analysis import analyze_pair_fast
+from lib.pair_state import PairState
+from tests.test_summary import quotes
+
+
+class TestPairState(unittest.TestCase):
+    """Tests for the incremental pair analyzer."""
+
+    def setUp(self):
+        ex1 = quotes(2500, 1, 100)
+        # ex2 starts later and shares some timestamps with ex1
+        ex2 = pl.concat([quotes(900, 2, 300), ex1[1200:1260].with_columns(pl.col('bestBid') * 1.002)])
+        self.ex1 = ex1.select(['timestamp', 'bestBid'])
+        self.ex2 = ex2.select(['timestamp', 'bestBid']).sort('timestamp', maintain_order=True)
+        self.ex2 = self.ex2.filter(pl.col('timestamp') > ex1['timestamp'][30])
+        # Arrival order: by time; at equal times ex2 first for some ties, ex1 first for others
+        self.stream = pl.concat([
+            self.ex1.with_columns(pl.lit(1).alias('side'), (pl.int_range(pl.len()) % 2).cast(pl.Int32).alias('order')),
+            self.ex2.with_columns(pl.lit(2).alias('side'), pl.lit(1).alias('order')),
+        ]).sort(['timestamp', 'order']).rows()
+
+    def test_snapshot_equals_batch_analysis(self):
+        """Test snapshots at many points of the stream against analyze_pair_fast on the same quotes"""
+        thresholds = [0.2, 0.5, 0.35]
+        state = PairState(thresholds, 0.05)
+        checkpoints = {10, 40, 41, 777, 3000, len(self.stream)}
+        # Inside ties: an ex1 quote whose same-time ex2 quote has not arrived yet
+        ties = [i for i in range(1, len(self.stream))
+                if self.stream[i - 1][2] == 1 and self.stream[i][2] == 2
+                and self.stream[i - 1][0] == self.stream[i][0]]
+        self.assertGreater(len(ties), 5)
+        checkpoints.update(ties[:5])
+        seen = {1: [], 2: []}
+        for i, (timestamp, bid, side, _) in enumerate(self.stream, start=1):
+            state.update(side, timestamp, bid)
+            seen[side].append((timestamp, bid))
+            if i in checkpoints:
+                frames = [pl.DataFrame(seen[s], schema={'timestamp': pl.Datetime('us'), 'bestBid': pl.Float64},
+                                       orient='row') for s in (1, 2)]
+                expected = analyze_pair_fast("TEST/USDT", "A", "B", frames[0], frames[1], thresholds, 0.05)
+                self.assertEqual(state.snapshot(), expected, f"after {i} quotes")
+
+    def test_summary_merges_with_batch_summaries(self):
+        """Test that the running summary is a regular, mergeable DeviationSummary"""
+        state = PairState()
+        for timestamp, bid, side, _ in self.stream:
+            state.update(side, timestamp, bid)
+        summary = state.summary()
+        self.assertEqual(summary.merge(summary.empty([0.3, 0.5, 0.4], 0.05)), summary)
+        self.assertEqual(summary.rows, self.ex1.height)
+
+    def test_rejects_out_of_order_quotes(self):
+        """Test that quotes must arrive in time order and name a side"""
+        state = PairState()
+        state.update(1, 100, 1.0)
+        with self.assertRaises(ValueError):
+            state.update(2, 99, 1.0)
+        with self.assertRaises(ValueError):
+            state.update(3, 101, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
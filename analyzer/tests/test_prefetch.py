@@ -0,0 +1,52 @@
+"""
+Unit tests for prefetch module.
+"""
+
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from lib.prefetch import io_pool, prefetch
+
+
+class TestPrefetch(unittest.TestCase):
+    """Tests for the bounded read-ahead iterator and the I/O pool."""
+
+    def test_order_and_read_ahead_bound(self):
+        """Test that items come back in order with at most read_ahead later items started"""
+        started = []
+        for read_ahead in (0, 1, 3):
+            started.clear()
+            seen = []
+            for item, handle in prefetch(range(6), lambda i: started.append(i) or i * 10, read_ahead):
+                self.assertEqual(handle, item * 10)
+                self.assertLessEqual(max(started), item + read_ahead)
+                seen.append(item)
+            self.assertEqual(seen, list(range(6)))
+            self.assertEqual(started, list(range(6)))
+
+    def test_read_ahead_overlaps_processing(self):
+        """Test that the next item's reads are already submitted while one is processed"""
+        pool = io_pool(2)
+        for item, future in prefetch([1, 2, 3], lambda i: pool.submit(pow, i, 2), read_ahead=1):
+            self.assertEqual(future.result(), item ** 2)
+
+    def test_pool_is_process_wide(self):
+        """Test that the pool is reused, and replaced only for a different size"""
+        pool = io_pool(3)
+        self.assertIs(io_pool(3), pool)
+        self.assertIs(io_pool(), pool)
+        resized = io_pool(2)
+        self.assertIsNot(resized, pool)
+        self.assertEqual(resized._max_workers, 2)
+
+    def test_pool_shared_by_threads(self):
+        """Test that symbol groups on threads (thread executor) all get the same pool"""
+        io_pool(2)
+        with ThreadPoolExecutor(8) as threads:
+            pools = list(threads.map(lambda _: io_pool(5), range(32)))
+        self.assertEqual(len({id(pool) for pool in pools}), 1)
+        self.assertEqual(pools[0]._max_workers, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Unit tests for results module.
+"""
+
+import pickle
+import unittest
+
+import polars as pl
+
+from lib.results import PAIR_SCHEMA, ResultBatch, ResultCollector, pack_results
+
+
+def pair(symbol, ex1, ex2, stats=None, **frames):
+    result = {'symbol': symbol, 'ex1': ex1, 'ex2': ex2,
+              'status': 'SUCCESS' if stats is not None else 'SKIPPED', 'stats': stats}
+    result.update(frames)
+    return result
+
+
+class TestPackResults(unittest.TestCase):
+    """Tests for pack_results."""
+
+    def test_pairs_and_stats(self):
+        """Test that every pair has an outcome row and successful pairs a metrics row"""
+        batch = pack_results([
+            pair('BTC', 'A', 'B', {'zero_crossings': 3, 'adf_pvalue': None}),
+            pair('BTC', 'A', 'C'),
+            pair('ETH', 'A', 'B', {'zero_crossings': 5, 'adf_pvalue': 0.01}),
+        ], worker_pid=7)
+        self.assertEqual(batch.pairs.schema, pl.Schema(PAIR_SCHEMA))
+        self.assertEqual(batch.pairs['status'].to_list(), ['SUCCESS', 'SKIPPED', 'SUCCESS'])
+        self.assertEqual(batch.symbols, ['BTC', 'ETH'])
+        self.assertEqual(batch.stats.columns, ['symbol', 'exchange1', 'exchange2', 'zero_crossings', 'adf_pvalue'])
+        self.assertEqual(batch.stats['adf_pvalue'].to_list(), [None, 0.01])
+        self.assertEqual(batch.worker_pid, 7)
+
+    def test_frames_carry_pair_columns(self):
+        """Test that per-pair frames are concatenated with their pair, empty cycle frames dropped"""
+        sweep = pl.DataFrame({'threshold': [0.3, 0.5], 'cycles': [2, 1]})
+        batch = pack_results([
+            pair('BTC', 'A', 'B', {'x': 1.0}, sweep=sweep, cycles=pl.DataFrame({'duration': [1.0]})),
+            pair('BTC', 'A', 'C', {'x': 2.0}, sweep=sweep, cycles=pl.DataFrame({'duration': []})),
+        ])
+        self.assertEqual(batch.frames['sweep'].columns, ['symbol', 'exchange1', 'exchange2', 'threshold', 'cycles'])
+        self.assertEqual(batch.frames['sweep']['exchange2'].to_list(), ['B', 'B', 'C', 'C'])
+        self.assertEqual(batch.frame_pairs, {'sweep': 2, 'cycles': 1})
+        self.assertNotIn('windows', batch.frames)
+
+    def test_no_success(self):
+        batch = pack_results([pair('BTC', 'A', 'B')])
+        self.assertIsNone(batch.stats)
+        self.assertEqual(batch.frames, {})
+
+    def test_pickles(self):
+        batch = pack_results([pair('BTC', 'A', 'B', {'x': 1.0})], peak_rss=1024)
+        restored = pickle.loads(pickle.dumps(batch))
+        self.assertIsInstance(restored, ResultBatch)
+        self.assertTrue(restored.stats.equals(batch.stats))
+        self.assertEqual(restored.peak_rss, 1024)
+
+
+class TestResultCollector(unittest.TestCase):
+    """Tests for ResultCollector."""
+
+    def test_merge(self):
+        """Test that groups merge by column name and all-null metrics take the other groups' type"""
+        collector = ResultCollector()
+        sweep = pl.DataFrame({'threshold': [0.3]})
+        collector.add(pack_results([pair('BTC', 'A', 'B', {'x': 1.0, 'adf_pvalue': None}, sweep=sweep)]))
+        collector.add(pack_results([pair('ETH', 'A', 'B')]))
+        collector.add(pack_results([pair('SOL', 'A', 'B', {'x': 2.0, 'adf_pvalue': 0.5}, sweep=sweep)]))
+        stats = collector.stats()
+        self.assertEqual(stats['symbol'].to_list(), ['BTC', 'SOL'])
+        self.assertEqual(stats['adf_pvalue'].dtype, pl.Float64)
+        self.assertEqual(collector.frame('sweep').height, 2)
+        self.assertEqual(collector.frame_pairs['sweep'], 2)
+        self.assertIsNone(collector.frame('simulation'))
+
+    def test_empty(self):
+        self.assertIsNone(ResultCollector().stats())
+
+
+if __name__ == '__main__':
+    unittest.main()
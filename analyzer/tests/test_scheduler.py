@@ -0,0 +1,79 @@
+"""
+Unit tests for scheduler module.
+"""
+
+import unittest
+
+from lib.data_loader import SourceFile
+from lib.scheduler import BYTES_PER_ROW, MAX_GROUP_SIZE, task_cost, plan_groups, split_threads, lpt_makespan
+
+
+def source(rows=None, size=None):
+    return SourceFile('/data/x.parquet', '2025-01-01', size, 0, False, rows)
+
+
+class TestTaskCost(unittest.TestCase):
+    """Tests for task_cost."""
+
+    def test_rows_weighted_by_loads_and_pairs(self):
+        """Test that rows come from footers, or from file sizes where unknown"""
+        files = {'A': [source(rows=1000), source(size=160 * BYTES_PER_ROW)], 'B': [source(rows=840)]}
+        # 2000 rows, loaded once and scanned by one pair of two exchanges
+        self.assertEqual(task_cost(files, 1), 2000 * 1.5)
+
+    def test_unknown_and_empty(self):
+        """Test that unknown files have no cost and an empty symbol a minimal one"""
+        self.assertIsNone(task_cost(None, 3))
+        self.assertEqual(task_cost({'A': [], 'B': []}, 1), 1.5)
+
+
+class TestPlanGroups(unittest.TestCase):
+    """Tests for plan_groups."""
+
+    def test_large_tasks_alone_and_first(self):
+        """Test that large tasks run alone, small ones are packed, largest groups first"""
+        costs = [1.0] * 100 + [500.0, 90.0]
+        plan = plan_groups(costs, 2)
+        self.assertEqual(sorted(i for group in plan for i in group), list(range(102)))
+        self.assertEqual(plan[0], [100])
+        self.assertEqual(plan[1], [101])
+        group_costs = [sum(costs[i] for i in group) for group in plan]
+        self.assertEqual(group_costs, sorted(group_costs, reverse=True))
+        self.assertTrue(all(len(group) <= MAX_GROUP_SIZE for group in plan))
+        self.assertLess(len(plan), 10)
+
+    def test_empty(self):
+        self.assertEqual(plan_groups([], 4), [])
+
+
+class TestSplitThreads(unittest.TestCase):
+    """Tests for split_threads."""
+
+    def test_many_similar_tasks_use_processes(self):
+        """Test that many similar tasks get one single-threaded process per thread"""
+        self.assertEqual(split_threads([10.0] * 64, 8), (8, 1))
+
+    def test_dominant_task_gets_threads(self):
+        """Test that a symbol dominating the work runs with more Polars threads"""
+        processes, threads = split_threads([1000.0] + [1.0] * 20, 8)
+        self.assertLess(processes, 8)
+        self.assertGreater(threads, 1)
+        self.assertLessEqual(processes * threads, 8)
+
+    def test_fixed_processes(self):
+        """Test that a fixed process count gets the rest of the budget as threads"""
+        self.assertEqual(split_threads([1.0] * 10, 8, 2), (2, 4))
+        self.assertEqual(split_threads([1.0] * 10, 2, 4), (4, 1))
+
+    def test_process_cap(self):
+        """Test that processes capped by memory get the whole thread budget between them"""
+        self.assertEqual(split_threads([10.0] * 64, 8, max_processes=2), (2, 4))
+        self.assertEqual(split_threads([1.0] * 10, 8, 8, max_processes=2), (2, 4))
+
+    def test_lpt_makespan(self):
+        self.assertEqual(lpt_makespan([3.0, 3.0, 2.0, 2.0, 2.0], 2), 7.0)  # greedy, not optimal (6)
+        self.assertEqual(lpt_makespan([4.0], 3, speed=2.0), 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
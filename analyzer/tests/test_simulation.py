@@ -0,0 +1,116 @@
+"""
+Unit tests for simulation module.
+"""
+
+import unittest
+from datetime import datetime, timedelta
+
+import polars as pl
+
+from lib.analysis import align_exchanges, pair_paths
+from lib.simulation import FeeSchedule, SimulationGrid, parse_fee_schedules, simulate_pair
+from lib.summary import summarize_deviation, threshold_label
+from tests.test_summary import quotes
+
+
+def paths_frame(bid_bid):
+    """Paths with a 0.02% spread on both executable paths, one row per second."""
+    return pl.DataFrame({
+        'timestamp': [datetime(2025, 1, 1) + timedelta(seconds=i) for i in range(len(bid_bid))],
+        'bid_bid': bid_bid,
+        'bid1_ask2': [d - 0.02 for d in bid_bid],
+        'bid2_ask1': [-d - 0.02 for d in bid_bid],
+    }, schema={'timestamp': pl.Datetime('us'), 'bid_bid': pl.Float64,
+               'bid1_ask2': pl.Float64, 'bid2_ask1': pl.Float64})
+
+
+class TestParseFeeSchedules(unittest.TestCase):
+    """Tests for parse_fee_schedules."""
+
+    def test_per_exchange_fees(self):
+        """Test that exchanges without their own fee pay the default"""
+        (taker,) = parse_fee_schedules({'taker': {'default': 0.1, 'OKX': 0.08}})
+        self.assertEqual(taker, FeeSchedule('taker', 0.1, {'OKX': 0.08}))
+        self.assertEqual(taker.fee('OKX'), 0.08)
+        self.assertEqual(taker.fee('Binance'), 0.1)
+
+    def test_invalid(self):
+        """Test that a schedule without default or with a non-numeric fee is rejected"""
+        for config in ({'taker': {'OKX': 0.08}}, {'taker': None}, {'taker': {'default': 'cheap'}}):
+            with self.assertRaises(ValueError):
+                parse_fee_schedules(config)
+
+
+class TestSimulatePair(unittest.TestCase):
+    """Tests for the grid trade simulation."""
+
+    def test_trade_pnl(self):
+        """Test entry and exit prices of each trade; an open trade is not counted"""
+        paths = paths_frame([0.0, 0.4, 0.6, 0.01, -0.5, 0.0, 0.3])
+        grid = SimulationGrid((0.3, 0.5), (FeeSchedule('free', 0.0), FeeSchedule('taker', 0.1)))
+        result = simulate_pair(paths, 'A', 'B', grid, 0.05)
+        self.assertEqual(result.height, grid.size)
+
+        # ex1 rich: sell the ratio at bid1/ask2, buy it back at ask1/bid2 (and mirrored)
+        first = ((1 + 0.38 / 100) * (1 + -0.03 / 100) - 1) * 100
+        second = ((1 + 0.48 / 100) * (1 + -0.02 / 100) - 1) * 100
+        free = result.filter(pl.col('fee_schedule') == 'free')
+        low, high = free.rows(named=True)
+        self.assertEqual((low['threshold'], low['trades']), (0.3, 2))
+        self.assertAlmostEqual(low['avg_gross_pnl_pct'], (first + second) / 2, places=12)
+        self.assertAlmostEqual(low['avg_hold_sec'], 1.5)
+        self.assertEqual(low['hit_rate_pct'], 100.0)
+        # 0.5 is not above 0.5: only the 0.6 row enters
+        self.assertEqual((high['threshold'], high['trades']), (0.5, 1))
+        self.assertAlmostEqual(high['avg_gross_pnl_pct'], ((1 + 0.58 / 100) * (1 - 0.03 / 100) - 1) * 100, places=12)
+
+        # Four fills of 0.1% each
+        taker = result.filter(pl.col('fee_schedule') == 'taker').row(0, named=True)
+        self.assertAlmostEqual(taker['avg_net_pnl_pct'], (first + second) / 2 - 0.4, places=12)
+        self.assertAlmostEqual(taker['total_net_pnl_pct'], first + second - 0.8, places=12)
+        self.assertEqual(taker['hit_rate_pct'], 50.0)  # only the second trade clears the fees
+
+    def test_fees_by_exchange_and_slippage(self):
+        """Test that each exchange's fills pay its own fee plus the slippage allowance"""
+        paths = paths_frame([0.0, 0.4, 0.0])
+        schedule = FeeSchedule('mixed', 0.1, {'B': 0.02})
+        gross = simulate_pair(paths, 'A', 'B', SimulationGrid((0.3,), (FeeSchedule('free', 0.0),)))
+        net = simulate_pair(paths, 'A', 'B', SimulationGrid((0.3,), (schedule,), slippage_pct=0.01))
+        self.assertAlmostEqual(net['avg_net_pnl_pct'][0],
+                               gross['avg_net_pnl_pct'][0] - (2 * 0.1 + 2 * 0.02 + 4 * 0.01), places=12)
+
+    def test_trades_match_cycles(self):
+        """Test that every threshold has as many trades as complete cycles"""
+        data = {'A': quotes(6000, 3, 100), 'B': quotes(900, 4, 700)}
+        paths = pair_paths(align_exchanges(data, ['bestBid', 'bestAsk']), 'A', 'B')
+        thresholds = (0.05, 0.1, 0.2, 0.3, 0.5)
+        result = simulate_pair(paths, 'A', 'B', SimulationGrid(thresholds, (FeeSchedule('taker', 0.1),)), 0.05)
+        metrics = summarize_deviation(paths.select(['timestamp', pl.col('bid_bid').alias('deviation')]),
+                                      list(thresholds), 0.05).to_metrics()
+        for row in result.iter_rows(named=True):
+            self.assertEqual(row['trades'], metrics[f"opportunity_cycles_{threshold_label(row['threshold'])}"])
+        self.assertGreater(result['trades'].sum(), 0)
+
+    def test_thresholds_in_neutral_zone_skipped(self):
+        """Test that thresholds below the neutral zone are not simulated; empty levels have no averages"""
+        paths = paths_frame([0.0, 0.4, 0.0])
+        result = simulate_pair(paths, 'A', 'B', SimulationGrid((0.01, 0.3, 0.9), (FeeSchedule('taker', 0.1),)), 0.05)
+        self.assertEqual(result['threshold'].to_list(), [0.3, 0.9])
+        self.assertEqual(result['trades'].to_list(), [1, 0])
+        self.assertIsNone(result['avg_net_pnl_pct'][1])
+
+    def test_compact_timestamps(self):
+        """Test that epoch-microsecond timestamps give the same holding times"""
+        paths = paths_frame([0.0, 0.4, 0.6, 0.01, -0.5, 0.0])
+        grid = SimulationGrid((0.3,), (FeeSchedule('taker', 0.1),))
+        compact = paths.with_columns(pl.col('timestamp').dt.epoch('us'))
+        self.assertTrue(simulate_pair(compact, 'A', 'B', grid).equals(simulate_pair(paths, 'A', 'B', grid)))
+
+    def test_no_valid_deviation(self):
+        """Test that a series without any ex2 quote has no simulation"""
+        paths = paths_frame([0.0, 0.0]).with_columns(pl.lit(None, dtype=pl.Float64).alias('bid_bid'))
+        self.assertIsNone(simulate_pair(paths, 'A', 'B', SimulationGrid((0.3,), (FeeSchedule('taker', 0.1),))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Unit tests for stationarity module.
+"""
+
+import math
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+import polars as pl
+
+from lib.batch import PairBatch, stack_pairs
+from lib.stationarity import StatsSpec, pair_statistics, deviation_statistics
+
+
+def series(values, step_ms=1000, start=datetime(2025, 1, 1)):
+    """Aligned frame with one row every step_ms."""
+    return pl.DataFrame({
+        'timestamp': [start + timedelta(milliseconds=i * step_ms) for i in range(len(values))],
+        'deviation': values
+    }, schema={'timestamp': pl.Datetime('us'), 'deviation': pl.Float64})
+
+
+def ar1(n, phi, seed):
+    """AR(1) series x_t = phi * x_{t-1} + e_t."""
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(0, 0.1, n)
+    x = np.zeros(n)
+    for t in range(1, n):
+        x[t] = phi * x[t - 1] + noise[t]
+    return x
+
+
+def reference_adf(x, lags):
+    """ADF t-statistic from an explicit least-squares fit."""
+    dx = np.diff(x)
+    rows = range(lags, len(dx))
+    design = np.array([[1.0, x[t]] + [dx[t - j] for j in range(1, lags + 1)] for t in rows])
+    target = dx[lags:]
+    coef = np.linalg.lstsq(design, target, rcond=None)[0]
+    residual = target - design @ coef
+    covariance = residual @ residual / (len(target) - design.shape[1]) * np.linalg.inv(design.T @ design)
+    return coef[1] / math.sqrt(covariance[1, 1])
+
+
+class TestPairStatistics(unittest.TestCase):
+    """Tests for the batched statistics stage."""
+
+    def test_matches_explicit_regression(self):
+        """Test that each stacked pair equals its own least-squares fit"""
+        values = [ar1(3000, phi, seed) for seed, phi in enumerate((0.9, 0.99, 0.5))]
+        stats = pair_statistics(stack_pairs([series(v) for v in values]), StatsSpec(timedelta(seconds=1), 2))
+        self.assertEqual(stats['pair_id'].to_list(), [0, 1, 2])
+
+        for row, x in zip(stats.iter_rows(named=True), values):
+            self.assertAlmostEqual(row['adf_stat'], reference_adf(x, 2), places=8)
+            centered = x - x.mean()
+            variance = (centered ** 2).mean()
+            self.assertAlmostEqual(row['deviation_skew'], (centered ** 3).mean() / variance ** 1.5, places=10)
+            self.assertAlmostEqual(row['deviation_kurtosis'], (centered ** 4).mean() / variance ** 2 - 3, places=10)
+            self.assertEqual(row['stat_samples'], 3000)
+
+    def test_mean_reversion(self):
+        """Test half-life of an AR(1) series and ADF of a random walk"""
+        stats = deviation_statistics(series(ar1(20000, 0.9, 7), step_ms=500), StatsSpec(timedelta(milliseconds=500)))
+        # -ln 2 / ln 0.9 = 6.58 steps of 0.5 s
+        self.assertAlmostEqual(stats['half_life_sec'], 6.58 * 0.5, delta=0.4)
+        self.assertLess(stats['adf_stat'], -2.86)
+
+        walk = deviation_statistics(series(ar1(20000, 1.0, 8)))
+        self.assertGreater(walk['adf_stat'], -2.86)
+
+    def test_grid_and_gaps(self):
+        """Test last value per bucket, and no regression row across a gap"""
+        x = ar1(400, 0.8, 3)
+        ticks = series(np.repeat(x, 4), step_ms=250)  # four ticks per second, last one counts
+        self.assertAlmostEqual(deviation_statistics(ticks)['adf_stat'], reference_adf(x, 1), places=8)
+
+        gap = pl.concat([series(x[:200]), series(x[200:], start=datetime(2025, 1, 2))])
+        expected = stack_pairs([series(x[:200]), series(x[200:])])
+        merged = pair_statistics(stack_pairs([gap]))
+        # Same regression rows as two separate runs, but one set of sums
+        self.assertEqual(merged['stat_samples'][0], pair_statistics(expected)['stat_samples'].sum())
+
+    def test_degenerate_series(self):
+        """Test that flat, short and empty series give nulls rather than errors"""
+        flat = deviation_statistics(series([0.1] * 100))
+        self.assertIsNone(flat['adf_stat'])
+        self.assertIsNone(flat['deviation_skew'])
+        self.assertIsNone(deviation_statistics(series(ar1(10, 0.5, 1)))['adf_stat'])
+        self.assertIsNone(deviation_statistics(series([None, float('nan')])))
+
+
+class TestBatchStatistics(unittest.TestCase):
+    """Tests for the statistics stage in PairBatch."""
+
+    def test_columns_added_to_batched_and_long_pairs(self):
+        """Test that batched and directly analyzed pairs get the same statistics"""
+        aligned = [series(ar1(n, 0.9, n)) for n in (500, 3000, 800)]
+        batch = PairBatch([0.3], 0.05, max_pair_rows=1000, statistics=StatsSpec())
+        for i, deviation in enumerate(aligned):
+            batch.add(i, deviation)
+        metrics = batch.analyze()
+        for i, deviation in enumerate(aligned):
+            expected = deviation_statistics(deviation)
+            self.assertEqual({key: metrics[i][key] for key in expected}, expected)
+            self.assertIn('opportunity_cycles_030bp', metrics[i])
+
+
+if __name__ == '__main__':
+    unittest.main()
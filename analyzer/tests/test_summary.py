@@ -0,0 +1,107 @@
+"""
+Unit tests for summary module - mergeable pair summaries.
+"""
+
+import math
+import unittest
+import numpy as np
+import polars as pl
+from datetime import datetime, timedelta
+from lib.summary import DeviationSummary, summarize_deviation, exact_sum, exact_sum_to_float
+from lib.analysis import analyze_pair_fast, summarize_pair_stream, align_pair
+
+
+THRESHOLDS = [0.3, 0.5, 0.4]
+ZERO = 0.05
+
+
+def quotes(n: int, seed: int, step_ms: int) -> pl.DataFrame:
+    """Oscillating bid series with irregular timestamps."""
+    rng = np.random.default_rng(seed)
+    offsets = np.cumsum(rng.integers(1, step_ms * 2, n))
+    prices = 100 * (1 + 0.006 * np.sin(np.arange(n) / 9.0)) + rng.normal(0, 0.05, n)
+    return pl.DataFrame({
+        'timestamp': [datetime(2025, 1, 1) + timedelta(milliseconds=int(o)) for o in offsets],
+        'bestBid': prices,
+        'bestAsk': prices + 0.01
+    })
+
+
+class TestExactSum(unittest.TestCase):
+    """Tests for exact_sum."""
+
+    def test_matches_fsum_and_is_associative(self):
+        """Test that chunked exact sums add up to the correctly rounded total"""
+        values = np.random.default_rng(0).normal(0, 0.3, 10_000) * 10.0 ** np.random.default_rng(1).integers(-8, 3, 10_000)
+
+        total = exact_sum(values)
+        self.assertEqual(exact_sum_to_float(total), math.fsum(values))
+        self.assertEqual(exact_sum(values[:3333]) + exact_sum(values[3333:]), total)
+        self.assertEqual(exact_sum(np.array([])), 0)
+
+
+class TestDeviationSummary(unittest.TestCase):
+    """Tests for DeviationSummary merging."""
+
+    def setUp(self):
+        """Aligned deviation series with a null prefix"""
+        self.data1 = quotes(3000, 1, 500)
+        self.data2 = quotes(2500, 2, 600).with_columns(pl.col('timestamp') + timedelta(seconds=5))
+        self.aligned = align_pair(self.data1, self.data2)
+
+    def test_merge_equals_whole_series(self):
+        """Test that merging summaries of consecutive pieces is exact"""
+        whole = summarize_deviation(self.aligned, THRESHOLDS, ZERO)
+
+        for cuts in ([1500], [1, 2], [7, 400, 401, 2999], list(range(100, 3000, 100))):
+            merged = DeviationSummary.empty(THRESHOLDS, ZERO)
+            bounds = [0] + cuts + [self.aligned.height]
+            for lo, hi in zip(bounds, bounds[1:]):
+                merged = merged.merge(summarize_deviation(self.aligned[lo:hi], THRESHOLDS, ZERO))
+            self.assertEqual(merged, whole, f"cuts={cuts}")
+
+    def test_cycle_completed_across_boundary(self):
+        """Test a cycle whose above and neutral rows fall into different pieces"""
+        aligned = pl.DataFrame({
+            'timestamp': [datetime(2025, 1, 1, 0, m) for m in range(4)],
+            'deviation': [0.0, 0.6, 0.2, 0.01]
+        })
+        first = summarize_deviation(aligned[:2], THRESHOLDS, ZERO)
+        second = summarize_deviation(aligned[2:], THRESHOLDS, ZERO)
+
+        self.assertEqual(first.levels[0].cycles + second.levels[0].cycles, 0)
+        self.assertEqual(first.merge(second).levels[0].cycles, 1)
+
+    def test_metrics_match_in_memory(self):
+        """Test that to_metrics reproduces analyze_pair_fast"""
+        expected = analyze_pair_fast("T/USDT", "A", "B", self.data1, self.data2, THRESHOLDS, ZERO)
+        self.assertEqual(summarize_deviation(self.aligned, THRESHOLDS, ZERO).to_metrics(), expected)
+
+    def test_merge_rejects_different_thresholds(self):
+        """Test that summaries of different configurations do not merge"""
+        with self.assertRaises(ValueError):
+            DeviationSummary.empty(THRESHOLDS, ZERO).merge(DeviationSummary.empty([0.1, 0.2, 0.3], ZERO))
+
+
+class TestSummarizePairStream(unittest.TestCase):
+    """Tests for chunked pair analysis."""
+
+    def test_streaming_identical_to_in_memory(self):
+        """Test time chunks with carried-over ex2 quote against the one-shot path"""
+        data1 = quotes(4000, 3, 400)
+        data2 = quotes(300, 4, 5000)  # sparse: many chunks without an ex2 quote
+        expected = analyze_pair_fast("T/USDT", "A", "B", data1, data2, THRESHOLDS, ZERO)
+
+        edges = pl.datetime_range(datetime(2025, 1, 1), datetime(2025, 1, 1, 1), "2m", eager=True).to_list()
+        chunks = [
+            (data1.filter(pl.col('timestamp').is_between(lo, hi, closed='left')),
+             data2.filter(pl.col('timestamp').is_between(lo, hi, closed='left')))
+            for lo, hi in zip(edges, edges[1:])
+        ]
+        result = summarize_pair_stream(chunks, THRESHOLDS, ZERO).to_metrics()
+
+        self.assertEqual(result, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Unit tests for summary_store module.
+"""
+
+import json
+import unittest
+import tempfile
+import shutil
+from datetime import datetime
+
+import polars as pl
+
+from lib.analysis import align_pair, summarize_pair_chunk, last_quote
+from lib.summary import summarize_deviation
+from lib.summary_store import SummaryStore, DayRecord, PairDay, settings_key
+from tests.test_summary import quotes
+
+THRESHOLDS = [0.3, 0.5, 0.4]
+
+
+def summarize_days(data1: pl.DataFrame, data2: pl.DataFrame, edges):
+    """DayRecords of consecutive slices, as the streaming runner builds them."""
+    records = []
+    carry = None
+    for lo, hi in zip(edges, edges[1:]):
+        day1 = data1.filter(pl.col('timestamp').is_between(lo, hi, closed='left'))
+        day2 = data2.filter(pl.col('timestamp').is_between(lo, hi, closed='left'))
+        head, body = summarize_pair_chunk(day1, day2 if day2.height else None, carry, THRESHOLDS, 0.05)
+        last_quotes = {'ExA': last_quote(day1)}
+        if day2.height:
+            last_quotes['ExB'] = last_quote(day2)
+        records.append(DayRecord({'ExA': 'a', 'ExB': 'b'}, last_quotes, {('ExA', 'ExB'): PairDay(carry, head, body)}))
+        carry = last_quotes.get('ExB', carry)
+    return records
+
+
+class TestSummaryStore(unittest.TestCase):
+    """Tests for the per-day summary store."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = SummaryStore(self.temp_dir, settings_key(thresholds=THRESHOLDS, zero_threshold=0.05))
+        self.data1 = quotes(4000, 3, 400)
+        self.data2 = quotes(300, 4, 5000)
+        self.edges = [datetime(2025, 1, 1, 0, m) for m in (0, 10, 20, 30)]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_round_trip_merges_to_whole_series(self):
+        """Test that stored day records merge into the in-memory summary"""
+        for i, record in enumerate(summarize_days(self.data1, self.data2, self.edges)):
+            self.store.put('BTC/USDT', f"2025-01-0{i + 1}", record)
+        self.assertEqual(self.store.dates('BTC/USDT'), ['2025-01-01', '2025-01-02', '2025-01-03'])
+
+        merged = None
+        for date in self.store.dates('BTC/USDT'):
+            part = self.store.get('BTC/USDT', date, {'ExA': 'a', 'ExB': 'b'}).pairs[('ExA', 'ExB')]
+            merged = part.head.merge(part.body) if merged is None else merged.merge(part.head).merge(part.body)
+
+        whole = summarize_deviation(align_pair(self.data1, self.data2), THRESHOLDS, 0.05)
+        self.assertEqual(merged, whole)
+        self.assertEqual(merged.to_metrics(), whole.to_metrics())
+
+    def test_head_without_values_matches_window_start(self):
+        """Test that a stored day read without its carry equals an analysis starting that day"""
+        record = summarize_days(self.data1, self.data2, self.edges)[1]
+        part = record.pairs[('ExA', 'ExB')]
+        self.assertIsNotNone(part.carry)
+
+        day1 = self.data1.filter(pl.col('timestamp').is_between(self.edges[1], self.edges[2], closed='left'))
+        day2 = self.data2.filter(pl.col('timestamp').is_between(self.edges[1], self.edges[2], closed='left'))
+        expected = summarize_deviation(align_pair(day1, day2), THRESHOLDS, 0.05)
+        self.assertEqual(part.head.without_values().merge(part.body), expected)
+
+    def test_changed_fingerprint_is_stale(self):
+        """Test that a record is not returned when the day's files changed"""
+        record = summarize_days(self.data1, self.data2, self.edges)[0]
+        self.store.put('BTC/USDT', '2025-01-01', record)
+
+        self.assertIsNotNone(self.store.get('BTC/USDT', '2025-01-01', {'ExA': 'a', 'ExB': 'b'}))
+        self.assertIsNone(self.store.get('BTC/USDT', '2025-01-01', {'ExA': 'a', 'ExB': 'changed'}))
+        self.assertIsNone(self.store.get('BTC/USDT', '2025-01-01', {'ExA': 'a'}))
+        self.assertIsNone(self.store.get('BTC/USDT', '2025-01-02', {'ExA': 'a', 'ExB': 'b'}))
+
+    def test_unreadable_or_old_record_is_a_miss(self):
+        """Test that corrupt records and other format versions are ignored"""
+        record = summarize_days(self.data1, self.data2, self.edges)[0]
+        self.store.put('BTC/USDT', '2025-01-01', record)
+        path = self.store.root / 'BTC_USDT' / '2025-01-01.json'
+
+        data = json.loads(path.read_text())
+        data['version'] = 0
+        path.write_text(json.dumps(data))
+        self.assertIsNone(self.store.get('BTC/USDT', '2025-01-01', {'ExA': 'a', 'ExB': 'b'}))
+
+        path.write_text('{"version": 1, "finger')
+        self.assertIsNone(self.store.get('BTC/USDT', '2025-01-01', {'ExA': 'a', 'ExB': 'b'}))
+
+    def test_settings_key(self):
+        """Test that every summary-relevant setting changes the key"""
+        base = settings_key(thresholds=THRESHOLDS, zero_threshold=0.05, resample=None)
+        self.assertEqual(base, settings_key(resample=None, zero_threshold=0.05, thresholds=THRESHOLDS))
+        self.assertNotEqual(base, settings_key(thresholds=[0.3, 0.5, 0.45], zero_threshold=0.05, resample=None))
+        self.assertNotEqual(base, settings_key(thresholds=THRESHOLDS, zero_threshold=0.05, resample='1s'))
+
+
+if __name__ == '__main__':
+    unittest.main()
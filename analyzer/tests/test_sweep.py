@@ -0,0 +1,67 @@
+"""
+Unit tests for sweep module.
+"""
+
+import unittest
+from datetime import datetime
+
+import polars as pl
+
+from lib.analysis import align_pair
+from lib.summary import summarize_deviation, threshold_label
+from lib.sweep import SweepGrid, parse_grid, sweep_deviation
+from tests.test_summary import quotes
+
+
+class TestParseGrid(unittest.TestCase):
+    """Tests for parse_grid."""
+
+    def test_numbers_and_ranges(self):
+        """Test that ranges are inclusive and merged with plain values"""
+        self.assertEqual(parse_grid(["0.1:0.5:0.1", "0.75", "0.3"]), (0.1, 0.2, 0.3, 0.4, 0.5, 0.75))
+        self.assertEqual(len(parse_grid(["0.1:1.0:0.05"])), 19)
+
+    def test_invalid(self):
+        """Test that malformed values are rejected"""
+        for value in ("abc", "0.1:0.5", "0.5:0.1:0.1", "0.1:0.5:0"):
+            with self.assertRaises(ValueError):
+                parse_grid([value])
+
+
+class TestSweepDeviation(unittest.TestCase):
+    """Tests for the single-pass grid sweep."""
+
+    def setUp(self):
+        self.aligned = align_pair(quotes(6000, 3, 100), quotes(900, 4, 700))
+        # A NaN deviation counts as above every threshold, never as neutral
+        self.aligned = self.aligned.with_columns(
+            pl.when(pl.int_range(pl.len()) == 2000).then(float('nan')).otherwise(pl.col('deviation')).alias('deviation')
+        )
+        self.grid = SweepGrid(parse_grid(["0.01:0.6:0.01"]), (0.02, 0.05, 0.1))
+
+    def test_matches_analysis_at_every_grid_point(self):
+        """Test that each grid point equals a full analysis run with that configuration"""
+        sweep = sweep_deviation(self.aligned, self.grid)
+        self.assertEqual(sweep.height, self.grid.size)
+        self.assertEqual(self.aligned['deviation'][0], None)  # leading rows without ex2 quote
+
+        for zero in self.grid.zero_thresholds:
+            metrics = summarize_deviation(self.aligned, list(self.grid.thresholds), zero).to_metrics()
+            for row in sweep.filter(pl.col('zero_threshold') == zero).iter_rows(named=True):
+                label = threshold_label(row['threshold'])
+                self.assertEqual(row['cycles'], metrics[f'opportunity_cycles_{label}'])
+                self.assertEqual(row['pct_time_above'], metrics[f'pct_time_above_{label}'])
+                self.assertEqual(row['cycles_per_hour'], metrics[f'cycles_{label}_per_hour'])
+                self.assertEqual(row['avg_cycle_duration_sec'], metrics[f'avg_cycle_duration_{label}_sec'])
+
+    def test_no_valid_deviation(self):
+        """Test that a series without any ex2 quote has no sweep"""
+        aligned = pl.DataFrame({
+            'timestamp': [datetime(2025, 1, 1, 0, i) for i in range(3)],
+            'deviation': [None, None, None]
+        }, schema={'timestamp': pl.Datetime('us'), 'deviation': pl.Float64})
+        self.assertIsNone(sweep_deviation(aligned, self.grid))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Unit tests for timerange module.
+"""
+
+import unittest
+import polars as pl
+from datetime import datetime, timedelta
+from lib.timerange import TimeWindow, parse_time_bound, parse_duration
+
+
+class TestParseTimeBound(unittest.TestCase):
+    """Tests for bound parsing."""
+
+    def test_date_bounds_cover_whole_day(self):
+        """Test that a date end bound is inclusive of the whole day"""
+        self.assertEqual(parse_time_bound('2025-11-03'), datetime(2025, 11, 3))
+        self.assertEqual(parse_time_bound('2025-11-03', is_end=True), datetime(2025, 11, 4))
+
+    def test_datetime_bounds(self):
+        """Test full datetime formats"""
+        self.assertEqual(parse_time_bound('2025-11-03 08:00'), datetime(2025, 11, 3, 8))
+        self.assertEqual(parse_time_bound('2025-11-03T08:30:15', is_end=True), datetime(2025, 11, 3, 8, 30, 15))
+        self.assertIsNone(parse_time_bound(None))
+
+    def test_invalid_bound(self):
+        """Test that garbage is rejected"""
+        with self.assertRaises(ValueError):
+            parse_time_bound('2025/11/03')
+
+    def test_parse_duration(self):
+        """Test relative durations"""
+        self.assertEqual(parse_duration('6h'), timedelta(hours=6))
+        self.assertEqual(parse_duration('30m'), timedelta(minutes=30))
+        self.assertEqual(parse_duration('100ms'), timedelta(milliseconds=100))
+        with self.assertRaises(ValueError):
+            parse_duration('6 hours ago')
+
+
+class TestTimeWindow(unittest.TestCase):
+    """Tests for TimeWindow pruning helpers."""
+
+    def setUp(self):
+        self.window = TimeWindow.from_bounds('2025-11-03 08:00', '2025-11-03 12:00')
+
+    def test_date_range(self):
+        """Test date partition range for an intraday window"""
+        self.assertEqual(self.window.date_range(), ('2025-11-03', '2025-11-03'))
+        self.assertEqual(TimeWindow.from_bounds('2025-11-01', '2025-11-03').date_range(),
+                         ('2025-11-01', '2025-11-03'))
+
+    def test_hour_pruning(self):
+        """Test that only hours 08-11 overlap [08:00, 12:00)"""
+        hours = [h for h in range(24) if self.window.contains_hour('2025-11-03', f"{h:02d}")]
+        self.assertEqual(hours, [8, 9, 10, 11])
+
+    def test_last(self):
+        """Test the 'last N' window"""
+        window = TimeWindow.last('6h', now=datetime(2025, 11, 3, 12))
+        self.assertEqual(window.start, datetime(2025, 11, 3, 6))
+        self.assertIsNone(window.end)
+
+    def test_predicate(self):
+        """Test the filter expression, including timezone-aware columns"""
+        df = pl.DataFrame({
+            'ts': pl.datetime_range(datetime(2025, 11, 3, 7), datetime(2025, 11, 3, 13), "1h", eager=True)
+        })
+        filtered = df.filter(self.window.predicate('ts', df.schema['ts']))
+        self.assertEqual(filtered['ts'].dt.hour().to_list(), [8, 9, 10, 11])
+
+        df_utc = df.with_columns(pl.col('ts').dt.replace_time_zone('UTC'))
+        filtered = df_utc.filter(self.window.predicate('ts', df_utc.schema['ts']))
+        self.assertEqual(filtered.height, 4)
+
+
+    def test_chunks(self):
+        """Test splitting a window into midnight-aligned chunks"""
+        window = TimeWindow.from_bounds('2025-11-03 08:00', '2025-11-04 00:00')
+        chunks = window.chunks(timedelta(hours=6), datetime(2025, 11, 1), datetime(2025, 11, 10))
+
+        self.assertEqual([c.start.hour for c in chunks], [8, 12, 18])
+        self.assertEqual(chunks[0].end, datetime(2025, 11, 3, 12))
+        self.assertEqual(chunks[-1].end, datetime(2025, 11, 4))
+
+        unbounded = TimeWindow().chunks(timedelta(days=1), datetime(2025, 11, 1), datetime(2025, 11, 3))
+        self.assertEqual(len(unbounded), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
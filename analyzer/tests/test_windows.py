@@ -0,0 +1,67 @@
+"""
+Unit tests for windows module.
+"""
+
+import unittest
+from datetime import datetime, timedelta
+
+import polars as pl
+
+from lib.analysis import align_pair
+from lib.summary import summarize_deviation
+from lib.windows import WindowSpec, window_metrics
+from tests.test_summary import quotes
+
+
+class TestWindowMetrics(unittest.TestCase):
+    """Tests for windowed metrics."""
+
+    def setUp(self):
+        self.aligned = align_pair(quotes(6000, 3, 100), quotes(900, 4, 700))
+        self.thresholds = [0.1, 0.3]
+
+    def test_fixed_windows_add_up_to_summary(self):
+        """Test that the counts of fixed windows sum to the whole-series summary"""
+        windows = window_metrics(self.aligned, WindowSpec.fixed(timedelta(minutes=2)), self.thresholds, 0.05)
+        summary = summarize_deviation(self.aligned, self.thresholds, 0.05)
+        self.assertEqual(windows['window_start'].n_unique(), 5)
+
+        for i, threshold in enumerate(self.thresholds):
+            rows = windows.filter(pl.col('threshold') == threshold)
+            self.assertEqual(rows['zero_crossings'].sum(), summary.crossings)
+            self.assertEqual(rows['cycles'].sum(), summary.levels[i].cycles)
+            self.assertEqual(rows['data_points'].sum(), summary.rows)
+            self.assertEqual((rows['window_end'] - rows['window_start']).unique().to_list(),
+                             [timedelta(minutes=2)])
+
+    def test_window_equals_analysis_of_its_rows(self):
+        """Test that a window's time above equals a separate analysis of its rows"""
+        spec = WindowSpec(timedelta(minutes=1), timedelta(minutes=4))
+        self.assertTrue(spec.rolling)
+        windows = window_metrics(self.aligned, spec, self.thresholds, 0.05)
+        row = windows.filter(pl.col('threshold') == 0.3).row(2, named=True)
+        piece = self.aligned.filter(
+            (pl.col('timestamp') >= row['window_start']) & (pl.col('timestamp') < row['window_end'])
+        )
+        summary = summarize_deviation(piece, self.thresholds, 0.05)
+        self.assertEqual(row['data_points'], piece.height)
+        self.assertEqual(row['pct_time_above'], summary.levels[1].above / summary.valid * 100)
+        self.assertEqual(row['zero_crossings_per_hour'], row['zero_crossings'] / (4 / 60))
+
+    def test_compact_timestamps(self):
+        """Test Int64 epoch-microsecond timestamps (compact mode)"""
+        spec = WindowSpec.fixed(timedelta(minutes=3))
+        compact = self.aligned.with_columns(pl.col('timestamp').dt.epoch('us'))
+        self.assertTrue(window_metrics(compact, spec).equals(window_metrics(self.aligned, spec)))
+
+    def test_no_valid_deviation(self):
+        """Test that a series without any ex2 quote has no windows"""
+        aligned = pl.DataFrame({
+            'timestamp': [datetime(2025, 1, 1, 0, i) for i in range(3)],
+            'deviation': [None, None, None]
+        }, schema={'timestamp': pl.Datetime('us'), 'deviation': pl.Float64})
+        self.assertIsNone(window_metrics(aligned, WindowSpec.fixed(timedelta(hours=1))))
+
+
+if __name__ == '__main__':
+    unittest.main()